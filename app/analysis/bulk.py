@@ -0,0 +1,68 @@
+from typing import Dict, Iterator, List
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models import ContentItem
+
+# Analysis outputs that batch jobs rewrite for many rows at once
+UPDATABLE_COLUMNS = ("cluster_id", "controversy_score", "controversy_reason", "final_score")
+
+
+def stream_items(db: Session, *columns, where=None, batch_size: int = 1000) -> Iterator[List[Row]]:
+    """
+    Yields ContentItem column rows in id order, `batch_size` at a time, without
+    materializing the table (yield_per / server-side cursor where supported).
+    """
+    stmt = select(*columns)
+    if where is not None:
+        stmt = stmt.where(where)
+    stmt = stmt.order_by(ContentItem.id).execution_options(yield_per=batch_size)
+    yield from db.execute(stmt).partitions()
+
+
+class BulkItemUpdater:
+    """
+    Buffers per-item column values and writes them as chunked executemany
+    UPDATE ... WHERE id = ? statements, bypassing ORM dirty tracking. Runs in
+    the caller's transaction; use as a context manager or call `flush`.
+    """
+    def __init__(self, db: Session, chunk_size: int = 1000):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.updated = 0
+        self._pending: Dict[frozenset, List[Dict]] = {}
+        table = ContentItem.__table__
+        self._table = table
+        self._where = table.c.id == bindparam("item_id")
+
+    def add(self, item_id: int, **values):
+        unknown = set(values) - set(UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Not a bulk-updatable column: {', '.join(sorted(unknown))}")
+        if not values:
+            return
+        batch = self._pending.setdefault(frozenset(values), [])
+        batch.append({"item_id": item_id, **values})
+        if len(batch) >= self.chunk_size:
+            self._write(batch)
+            batch.clear()
+
+    def flush(self) -> int:
+        for batch in self._pending.values():
+            self._write(batch)
+        self._pending.clear()
+        return self.updated
+
+    def _write(self, batch: List[Dict]):
+        if batch:
+            self.db.execute(update(self._table).where(self._where), batch)
+            self.updated += len(batch)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._pending.clear()
@@ -1,35 +1,13 @@
-import re
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from config import CLUSTER_KEYWORDS
+from app.analysis.keywords import get_keyword_matcher, CLUSTER_PREFIX
+from app.analysis.bulk import BulkItemUpdater
 
 class TopicClusterer:
     def __init__(self):
-        self.clusters = {
-            "immigration": [
-                "immigration", "border", "migrant", "refugee", "asylum", "visa", 
-                "citizenship", "deportation", "undocumented", "h-1b", "pr cards", "citizens", "immigrants"
-            ],
-            "foreign interference": [
-                "interference", "foreign influence", "election meddling", "hacking",
-                "disinformation", "propaganda", "espionage", "spying", "cyberattack", "allegations"
-            ],
-            "religious conflict": [
-                "religion", "religious", "faith", "church", "mosque", "temple",
-                "sectarian", "blasphemy", "extremism", "fundamentalism", "hindu", "muslim", "sikh", "christian", "jewish", "catholic"
-            ],
-            "student visas": [
-                "student visa", "international student", "study permit", "education visa",
-                "university enrollment", "college intake", "study in canada", "student intake"
-            ],
-            "crime": [
-                "crime", "criminal", "violence", "theft", "murder", "assault",
-                "policing", "law enforcement", "jail", "prison", "safety", "arrest", "police", "guilty", "suspect"
-            ],
-            "geopolitics": [
-                "geopolitics", "foreign policy", "diplomacy", "international relations",
-                "summit", "treaty", "alliance", "sanctions", "conflict", "war",
-                "military", "strategic", "modi", "trudeau", "biden", "trump", "china", "russia", "india", "israel", "palestine", "gaza", "ukraine", "nato"
-            ]
-        }
+        self.clusters = CLUSTER_KEYWORDS
+        self.matcher = get_keyword_matcher(*(f"{CLUSTER_PREFIX}{name}" for name in CLUSTER_KEYWORDS))
 
     def categorize(self, title: str, summary: Optional[str] = "") -> str:
         """
@@ -39,12 +17,10 @@ class TopicClusterer:
         text = f"{title} {summary or ''}".lower()
         
         # Count matches for each cluster
+        hits = self.matcher.match(text)
         matches = {}
-        for cluster, keywords in self.clusters.items():
-            count = 0
-            for keyword in keywords:
-                if re.search(rf'\b{re.escape(keyword)}\b', text):
-                    count += 1
+        for cluster in self.clusters:
+            count = len(hits.get(f"{CLUSTER_PREFIX}{cluster}", []))
             if count > 0:
                 matches[cluster] = count
         
@@ -62,16 +38,36 @@ class TopicClusterer:
             item.cluster_id = self.categorize(item.title, item.summary)
         return items
 
-    def select_top_clusters(self, items: List, n: int = 2) -> List[str]:
+    def assign_clusters(self, db: Session, rows: List, updater: Optional[BulkItemUpdater] = None) -> Dict[int, str]:
+        """
+        Categorizes (id, title, summary, cluster_id) rows and bulk-writes cluster_id
+        for the ones whose cluster changed, without loading ORM objects.
+        Returns id -> cluster for every row. Does not commit.
+        """
+        own_updater = updater is None
+        updater = updater or BulkItemUpdater(db)
+        assignments = {}
+        for row in rows:
+            cluster = self.categorize(row.title, row.summary)
+            assignments[row.id] = cluster
+            if cluster != row.cluster_id:
+                updater.add(row.id, cluster_id=cluster)
+        if own_updater:
+            updater.flush()
+        return assignments
+
+    def select_top_clusters(self, items: List, n: int = 2, assignments: Optional[Dict[int, str]] = None) -> List[str]:
         """
         Selects the top N clusters based on aggregate final_score of their items.
         Suitable for Facebook debate (generally higher controversy + engagement).
+        `assignments` (from assign_clusters) overrides the items' cluster_id.
         """
         cluster_scores = {}
         for item in items:
-            if not item.cluster_id or item.cluster_id == "other":
+            cluster_id = assignments.get(item.id, item.cluster_id) if assignments else item.cluster_id
+            if not cluster_id or cluster_id == "other":
                 continue
-            cluster_scores[item.cluster_id] = cluster_scores.get(item.cluster_id, 0.0) + (item.final_score or 0.0)
+            cluster_scores[cluster_id] = cluster_scores.get(cluster_id, 0.0) + (item.final_score or 0.0)
         
         # Sort by total score and return top n
         sorted_clusters = sorted(cluster_scores.items(), key=lambda x: x[1], reverse=True)
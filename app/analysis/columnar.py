@@ -0,0 +1,48 @@
+from typing import Dict, Sequence
+import numpy as np
+
+
+def coverage_counts(fingerprints: Sequence[str], sources: Sequence[str]) -> np.ndarray:
+    """
+    Per row, the number of distinct sources sharing the row's fingerprint.
+    """
+    fp_codes = _codes(fingerprints)
+    source_codes = _codes(sources)
+    base = int(source_codes.max(initial=0)) + 1
+    pairs = np.unique(fp_codes * base + source_codes)
+    per_fingerprint = np.bincount(pairs // base, minlength=int(fp_codes.max(initial=-1)) + 1)
+    return per_fingerprint[fp_codes]
+
+
+def controversy_scores(topic_match: np.ndarray, charged_count: np.ndarray, intense: np.ndarray) -> np.ndarray:
+    """
+    0-100 controversy score, same terms and order as ContentRanker._calculate_controversy_details.
+    """
+    score = np.zeros(len(topic_match))
+    score += np.where(topic_match, 40.0, 0.0)
+    score += np.where(charged_count > 0, np.minimum(charged_count * 10, 30), 0)
+    score += np.where(intense, 30.0, 0.0)
+    return np.minimum(score, 100.0)
+
+
+def engagement_scores(
+    is_reddit: np.ndarray, ups: np.ndarray, comments: np.ndarray, title_intensity: np.ndarray,
+    coverage: np.ndarray, max_metrics: Dict[str, float]
+) -> np.ndarray:
+    """
+    40/20/20/20 engagement score, same terms and order as
+    ContentRanker._calculate_weighted_engagement.
+    """
+    score = np.zeros(len(is_reddit))
+    if max_metrics['ups'] > 0:
+        score += np.where(is_reddit, np.minimum(ups / max_metrics['ups'], 1.0) * 40, 0.0)
+    if max_metrics['comments'] > 0:
+        score += np.where(is_reddit, np.minimum(comments / max_metrics['comments'], 1.0) * 20, 0.0)
+    score += title_intensity * 20
+    score += np.select([coverage == 2, coverage >= 3], [10.0, 20.0], 0.0)
+    return score
+
+
+def _codes(values: Sequence[str]) -> np.ndarray:
+    index: Dict[str, int] = {}
+    return np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
@@ -1,19 +1,140 @@
 import os
 import json
-from typing import List, Dict, Optional
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional
 from sqlalchemy.orm import Session
 from app.models import ContentItem, TopicCommentary, TopicPackage
+from app.analysis.llm import SHARED_CACHE, create_llm_client
+from app.analysis.json_stream import JSONSectionParser
+from app.response_cache import ITEMS, PACKAGES, bump_versions
+from app.events import ANGLES, PACKAGE, publish
+
+# Package JSON sections and the TopicPackage column each of their fields fills.
+PACKAGE_SECTIONS = {
+    # 1. Canonical
+    "canonical": {"secondary_topic": "secondary_topic", "core_thesis": "core_thesis"},
+    # 2. Facebook Page
+    "facebook_page_post": {
+        "facebook_post_body": "post_body", "facebook_headlines": "headlines", "facebook_cta": "cta",
+        "facebook_pinned_comment": "pinned_comment",
+        "facebook_distribution_safe_version": "distribution_safe_version", "facebook_metadata": "metadata",
+    },
+    # 3. Facebook Groups
+    "facebook_group_post": {
+        "facebook_group_post_body": "post_body", "facebook_group_discussion_prompt": "discussion_prompt",
+        "facebook_group_safety_notes": "safety_notes", "facebook_group_metadata": "metadata",
+    },
+    # 4. Instagram
+    "instagram_reel": {
+        "ig_reel_script": "reel_script", "ig_on_screen_text": "on_screen_text", "ig_caption": "caption",
+        "ig_seed_comment": "seed_comment", "ig_hashtags": "hashtags", "ig_metadata": "metadata",
+    },
+    # 5. YouTube
+    "youtube_short": {
+        "yt_shorts_script": "shorts_script", "yt_title": "title", "yt_description": "description",
+        "yt_pinned_comment": "pinned_comment", "yt_metadata": "metadata",
+    },
+    # 6. X
+    "x_post": {
+        "x_primary_post": "primary_post", "x_thread_replies": "thread_replies",
+        "x_engagement_question": "engagement_question", "x_metadata": "metadata",
+    },
+    # 7. Comment Seeding
+    "comment_seeding_pack": {
+        "seeding_yt_comments": "yt_seed_comments", "seeding_ig_comments": "ig_seed_comments",
+        "seeding_pin_recommendation": "pin_recommendation", "seeding_follow_up_timing": "follow_up_timing",
+        "seeding_creator_reply_templates": "creator_reply_templates",
+    },
+    # 8. Carousel
+    "carousel_asset": {
+        "carousel_slides": "slides", "carousel_caption": "caption", "carousel_metadata": "metadata",
+    },
+}
+
+COLUMN_DEFAULTS = {
+    "secondary_topic": "General Politics",
+    "core_thesis": "Accountability matters.",
+    "ig_hashtags": [],
+}
+
+
+# Prompt instructions per package section, in package order.
+SECTION_INSTRUCTIONS = {
+    "canonical": [
+        "- secondary_topic: A related sub-category.",
+        "- core_thesis: One sentence summary of the stance.",
+    ],
+    "facebook_page_post": [
+        "- post_body: 300-400 words, clear stance, conversational, strong hook. mobile-formatted (1-2 line paragraphs).",
+        "- headlines: 3 scroll-stopping options (<=12 words each).",
+        "- cta: 1-2 engagement-oriented sentences.",
+        "- pinned_comment: 1-2 open-ended sentences inviting debate.",
+        "- distribution_safe_version: Final, softened-claim version of the post_body.",
+        '- metadata: { "recommended_post_time": "ISO string", "timezone": "America/Toronto", "post_intent": "accountability", "status": "generated" }',
+    ],
+    "facebook_group_post": [
+        "- post_body: 150-250 words, conversational, question-forward.",
+        "- discussion_prompt: Explicit question for members.",
+        "- safety_notes: Note on why phrasing is group-safe.",
+        '- metadata: { "group_safe_score": 0.9, "recommended_delay": "+45 min", "status": "generated" }',
+    ],
+    "instagram_reel": [
+        "- reel_script: 20-35s script with visual beats.",
+        "- on_screen_text: Array of 5-8 short text bursts (<=10 words each).",
+        "- caption: 2 short paragraphs, ends with 3-5 hashtags.",
+        "- seed_comment: 1 open-ended question.",
+        '- metadata: { "audio_guidance": "voiceover", "recommended_post_time": "ISO string", "status": "generated" }',
+    ],
+    "youtube_short": [
+        "- shorts_script: 20-40s timestamped script (Hook, Build, CTA).",
+        "- title: <=70 characters, curiosity-driven.",
+        "- description: 1-2 sentence summary.",
+        "- pinned_comment: Accountability or clarification question.",
+        '- metadata: { "retention_hook_used": true, "recommended_post_time": "ISO string", "status": "generated" }',
+    ],
+    "x_post": [
+        "- primary_post: Main post <= 280 chars.",
+        "- thread_replies: 2-4 follow-up replies (each <= 280 chars).",
+        "- engagement_question: Short, pointed question.",
+        '- metadata: { "post_type": "thread", "recommended_post_time": "ISO string", "status": "generated" }',
+    ],
+    "comment_seeding_pack": [
+        "- yt_seed_comments: Array of 3 comments.",
+        "- ig_seed_comments: Array of 3 comments.",
+        "- pin_recommendation: Which comment to pin and why.",
+        '- follow_up_timing: "+10 min"',
+        '- creator_reply_templates: { "agree": "template text", "neutral": "template text", "calm_disagreement": "template text" }',
+    ],
+    "carousel_asset": [
+        "- slides: 6-8 slides with text (<=12 words), visual_direction, and text_style per slide.",
+        "- caption: Summary for the post.",
+        '- metadata: { "status": "generated" }',
+    ],
+}
+
+def _section_block(number: int, section: str) -> str:
+    lines = "\n".join(f"           {line}" for line in SECTION_INSTRUCTIONS[section])
+    return f"        {number}. {section}:\n{lines}"
+
+
+def package_columns(section: str, value) -> Dict:
+    """
+    TopicPackage column values for one section of the package JSON.
+    """
+    value = value if isinstance(value, dict) else {}
+    return {
+        column: value.get(field, COLUMN_DEFAULTS.get(column))
+        for column, field in PACKAGE_SECTIONS[section].items()
+    }
 
 class ContentEngine:
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 cache=SHARED_CACHE):
+        self.llm = create_llm_client(api_key, base_url, cache=cache)
+        self.client = self.llm.client if self.llm else None
+        self.parallel_sections = os.getenv("PACKAGE_PARALLEL_SECTIONS", "0") == "1"
 
-    def generate_commentary_angles(self, db: Session, cluster_id: str) -> Optional[TopicCommentary]:
+    def generate_commentary_angles(self, db: Session, cluster_id: str, use_cache: bool = True) -> Optional[TopicCommentary]:
         """
         Step 5: Angle Generation (3 angles + strongest)
         """
@@ -27,18 +148,19 @@ class ContentEngine:
         context = "\n".join([f"- {item.title}: {item.summary}" for item in items])
         
         data = None
-        if self.client:
+        if self.llm:
             try:
                 prompt = self._get_angle_prompt(cluster_id, context)
-                response = self.client.chat.completions.create(
+                content = self.llm.complete(
                     model="gpt-4o",
                     messages=[
                         {"role": "system", "content": "You are a sharp, conversational political analyst."},
                         {"role": "user", "content": prompt}
                     ],
-                    response_format={ "type": "json_object" }
+                    response_format={ "type": "json_object" },
+                    use_cache=use_cache
                 )
-                data = json.loads(response.choices[0].message.content)
+                data = json.loads(content)
             except Exception as e:
                 print(f"Error calling LLM for angles: {e}")
 
@@ -53,27 +175,184 @@ class ContentEngine:
         
         db.add(commentary)
         db.commit()
+        bump_versions(PACKAGES)
         db.refresh(commentary)
+        publish(ANGLES, {"cluster_id": cluster_id, "commentary_id": commentary.id})
         return commentary
 
-    def generate_full_package(self, db: Session, cluster_id: str) -> Optional[TopicPackage]:
+    def generate_full_package(self, db: Session, cluster_id: str, use_cache: bool = True,
+                              parallel: Optional[bool] = None) -> Optional[TopicPackage]:
         """
         Steps 6-15: Generates the full 'Final Output Package'.
         Multi-stage pass: Tone -> Article -> Readability -> Voice -> Safety -> Media.
+        An unchanged cluster (same top items and angle) is answered from the
+        LLM response cache unless use_cache=False. With `parallel` (default
+        PACKAGE_PARALLEL_SECTIONS) each section is its own concurrent request.
         """
-        items = db.query(ContentItem).filter(
+        prepared = self._prepare_package(db, cluster_id, use_cache)
+        if not prepared:
+            return None
+        items, strongest_angle, context = prepared
+
+        if parallel is None:
+            parallel = self.parallel_sections
+        if parallel and self.llm:
+            data = self._generate_sections(cluster_id, context, strongest_angle, list(PACKAGE_SECTIONS), use_cache)
+            return self._save_package(db, cluster_id, items, strongest_angle, data)
+
+        data = None
+        if self.llm:
+            try:
+                content = self.llm.complete(
+                    model="gpt-4o",
+                    messages=self._package_messages(self._get_package_prompt(cluster_id, context, strongest_angle)),
+                    response_format={ "type": "json_object" },
+                    use_cache=use_cache
+                )
+                data = json.loads(content)
+            except Exception as e:
+                print(f"Error calling LLM for full package: {e}")
+
+        if not data:
+            data = self._get_mock_package_data(cluster_id)
+
+        return self._save_package(db, cluster_id, items, strongest_angle, data)
+
+    def stream_full_package(self, db: Session, cluster_id: str, use_cache: bool = True) -> Iterator[Dict]:
+        """
+        Streaming variant of generate_full_package. Yields events as dicts:
+        {"event": "token", "text"} for each LLM delta, {"event": "section",
+        "section", "fields"} as soon as a platform section has parsed complete
+        (fields are TopicPackage columns), then {"event": "done", "package_id"}
+        once the package is persisted, or {"event": "error", "message"}.
+        """
+        prepared = self._prepare_package(db, cluster_id, use_cache)
+        if not prepared:
+            yield {"event": "error", "message": "No items found for this topic"}
+            return
+        items, strongest_angle, context = prepared
+
+        data = {}
+        if self.llm:
+            parser = JSONSectionParser()
+            try:
+                for delta in self.llm.stream_complete(
+                    model="gpt-4o",
+                    messages=self._package_messages(self._get_package_prompt(cluster_id, context, strongest_angle)),
+                    response_format={ "type": "json_object" },
+                    use_cache=use_cache
+                ):
+                    yield {"event": "token", "text": delta}
+                    for section, value in parser.feed(delta):
+                        if section in PACKAGE_SECTIONS:
+                            data[section] = value
+                            yield {"event": "section", "section": section, "fields": package_columns(section, value)}
+            except Exception as e:
+                print(f"Error streaming LLM full package: {e}")
+
+        if not data:
+            data = self._get_mock_package_data(cluster_id)
+            for section, value in data.items():
+                yield {"event": "section", "section": section, "fields": package_columns(section, value)}
+
+        try:
+            package = self._save_package(db, cluster_id, items, strongest_angle, data)
+        except Exception as e:
+            print(f"Error saving streamed package for {cluster_id}: {e}")
+            db.rollback()
+            yield {"event": "error", "message": "Failed to save package"}
+            return
+        yield {"event": "done", "package_id": package.id}
+
+    def regenerate_section(self, db: Session, cluster_id: str, section: str) -> Optional[TopicPackage]:
+        """
+        Regenerates one section (e.g. "x_post") of the latest package for the
+        cluster in place, leaving the other sections untouched. Returns None if
+        there is no package or the section could not be generated.
+        """
+        package = db.query(TopicPackage).filter(
+            TopicPackage.cluster_id == cluster_id
+        ).order_by(TopicPackage.date.desc()).first()
+        if not package or not self.llm:
+            return None
+
+        context = self._format_context(self._package_items(db, cluster_id))
+        value = self._generate_section(cluster_id, context, package.editorial_angle, section, use_cache=False)
+        if value is None:
+            return None
+
+        for column, column_value in package_columns(section, value).items():
+            setattr(package, column, column_value)
+        db.commit()
+        bump_versions(PACKAGES)
+        db.refresh(package)
+        publish(PACKAGE, {"cluster_id": cluster_id, "package_id": package.id, "section": section})
+        return package
+
+    def _generate_sections(self, cluster_id: str, context: str, strongest_angle: str, sections: List[str],
+                           use_cache: bool = True) -> Dict:
+        """
+        Package data from one concurrent request per section. A section that
+        fails even after a retry falls back to its mock content, so a bad
+        section never costs the others.
+        """
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            results = executor.map(
+                lambda section: self._generate_section(cluster_id, context, strongest_angle, section, use_cache),
+                sections
+            )
+            data = dict(zip(sections, results))
+
+        mock = None
+        for section, value in data.items():
+            if value is None:
+                mock = mock or self._get_mock_package_data(cluster_id)
+                data[section] = mock[section]
+        return data
+
+    def _generate_section(self, cluster_id: str, context: str, strongest_angle: str, section: str,
+                          use_cache: bool = True, attempts: int = 2) -> Optional[Dict]:
+        messages = self._package_messages(self._get_section_prompt(cluster_id, context, strongest_angle, section))
+        for attempt in range(attempts):
+            try:
+                content = self.llm.complete(
+                    model="gpt-4o",
+                    messages=messages,
+                    response_format={ "type": "json_object" },
+                    use_cache=use_cache
+                )
+                data = json.loads(content)
+                value = data.get(section, data)
+                if isinstance(value, dict):
+                    return value
+                print(f"LLM returned no {section} object for {cluster_id}")
+            except Exception as e:
+                print(f"Error calling LLM for {section}: {e}")
+        return None
+
+    def _package_items(self, db: Session, cluster_id: str) -> List[ContentItem]:
+        return db.query(ContentItem).filter(
             ContentItem.cluster_id == cluster_id
         ).order_by(ContentItem.final_score.desc()).limit(15).all()
 
+    def _format_context(self, items: List[ContentItem]) -> str:
+        return "\n".join([f"- {item.title}: {item.summary}" for item in items])
+
+    def _prepare_package(self, db: Session, cluster_id: str, use_cache: bool = True):
+        """
+        (items, strongest_angle, context) for the package prompts, or None if
+        the cluster has no items.
+        """
+        items = self._package_items(db, cluster_id)
         if not items:
             return None
 
-        context = "\n".join([f"- {item.title}: {item.summary}" for item in items])
+        context = self._format_context(items)
         
         # We need the strongest angle first
         commentary = db.query(TopicCommentary).filter(TopicCommentary.cluster_id == cluster_id).order_by(TopicCommentary.generated_at.desc()).first()
         if not commentary:
-            commentary = self.generate_commentary_angles(db, cluster_id)
+            commentary = self.generate_commentary_angles(db, cluster_id, use_cache=use_cache)
 
         if not commentary:
             print(f"Warning: Failed to generate commentary for {cluster_id}")
@@ -81,84 +360,28 @@ class ContentEngine:
         else:
             strongest_angle = commentary.strongest_angle_html or "No specific angle refined."
 
-        data = None
-        if self.client:
-            try:
-                prompt = self._get_package_prompt(cluster_id, context, strongest_angle)
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are HANS SAYS, a blunt, Canadian, accountability-focused political analyst."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={ "type": "json_object" }
-                )
-                data = json.loads(response.choices[0].message.content)
-            except Exception as e:
-                print(f"Error calling LLM for full package: {e}")
+        return items, strongest_angle, context
 
-        if not data:
-            data = self._get_mock_package_data(cluster_id)
+    def _package_messages(self, prompt: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": "You are HANS SAYS, a blunt, Canadian, accountability-focused political analyst."},
+            {"role": "user", "content": prompt}
+        ]
 
+    def _save_package(self, db: Session, cluster_id: str, items: List[ContentItem], strongest_angle: str,
+                      data: Dict) -> TopicPackage:
         # Step 16: Auto-Scheduling (Canada)
         scheduling = self._calculate_scheduling(cluster_id, data)
 
+        columns = {}
+        for section in PACKAGE_SECTIONS:
+            columns.update(package_columns(section, data.get(section)))
+
         package = TopicPackage(
             cluster_id=cluster_id,
-            # 1. Canonical
             primary_topic=cluster_id,
-            secondary_topic=data.get("canonical", {}).get("secondary_topic", "General Politics"),
-            core_thesis=data.get("canonical", {}).get("core_thesis", "Accountability matters."),
             editorial_angle=strongest_angle,
-            
-            # 2. Facebook Page
-            facebook_post_body=data.get("facebook_page_post", {}).get("post_body"),
-            facebook_headlines=data.get("facebook_page_post", {}).get("headlines"),
-            facebook_cta=data.get("facebook_page_post", {}).get("cta"),
-            facebook_pinned_comment=data.get("facebook_page_post", {}).get("pinned_comment"),
-            facebook_distribution_safe_version=data.get("facebook_page_post", {}).get("distribution_safe_version"),
-            facebook_metadata=data.get("facebook_page_post", {}).get("metadata"),
-            
-            # 3. Facebook Groups
-            facebook_group_post_body=data.get("facebook_group_post", {}).get("post_body"),
-            facebook_group_discussion_prompt=data.get("facebook_group_post", {}).get("discussion_prompt"),
-            facebook_group_safety_notes=data.get("facebook_group_post", {}).get("safety_notes"),
-            facebook_group_metadata=data.get("facebook_group_post", {}).get("metadata"),
-            
-            # 4. Instagram
-            ig_reel_script=data.get("instagram_reel", {}).get("reel_script"),
-            ig_on_screen_text=data.get("instagram_reel", {}).get("on_screen_text"),
-            ig_caption=data.get("instagram_reel", {}).get("caption"),
-            ig_seed_comment=data.get("instagram_reel", {}).get("seed_comment"),
-            ig_hashtags=data.get("instagram_reel", {}).get("hashtags", []),
-            ig_metadata=data.get("instagram_reel", {}).get("metadata"),
-            
-            # 5. YouTube
-            yt_shorts_script=data.get("youtube_short", {}).get("shorts_script"),
-            yt_title=data.get("youtube_short", {}).get("title"),
-            yt_description=data.get("youtube_short", {}).get("description"),
-            yt_pinned_comment=data.get("youtube_short", {}).get("pinned_comment"),
-            yt_metadata=data.get("youtube_short", {}).get("metadata"),
-            
-            # 6. X
-            x_primary_post=data.get("x_post", {}).get("primary_post"),
-            x_thread_replies=data.get("x_post", {}).get("thread_replies"),
-            x_engagement_question=data.get("x_post", {}).get("engagement_question"),
-            x_metadata=data.get("x_post", {}).get("metadata"),
-            
-            # 7. Comment Seeding
-            seeding_yt_comments=data.get("comment_seeding_pack", {}).get("yt_seed_comments"),
-            seeding_ig_comments=data.get("comment_seeding_pack", {}).get("ig_seed_comments"),
-            seeding_pin_recommendation=data.get("comment_seeding_pack", {}).get("pin_recommendation"),
-            seeding_follow_up_timing=data.get("comment_seeding_pack", {}).get("follow_up_timing"),
-            seeding_creator_reply_templates=data.get("comment_seeding_pack", {}).get("creator_reply_templates"),
-            
-            # 8. Carousel
-            carousel_slides=data.get("carousel_asset", {}).get("slides"),
-            carousel_caption=data.get("carousel_asset", {}).get("caption"),
-            carousel_metadata=data.get("carousel_asset", {}).get("metadata"),
-            
-            # 9. Operator
+            **columns,
             status_flags={"generated": True, "copied": False, "scheduled": False, "posted": False},
             today_queue_position=1,
             next_action="wait"
@@ -171,7 +394,9 @@ class ContentEngine:
             item.used_for_content = True
             
         db.commit()
+        bump_versions(ITEMS, PACKAGES)
         db.refresh(package)
+        publish(PACKAGE, {"cluster_id": cluster_id, "package_id": package.id, "section": None})
         return package
 
     def _calculate_scheduling(self, cluster_id, data):
@@ -215,6 +440,9 @@ class ContentEngine:
         }
 
     def _get_package_prompt(self, cluster_id, context, strongest_angle):
+        sections = "\n\n".join(
+            _section_block(number, section) for number, section in enumerate(SECTION_INSTRUCTIONS, 1)
+        )
         return f"""
         You are HANS SAYS. Voice: blunt, Canadian, accountability-focused. Short sentences. No fluff.
         
@@ -224,59 +452,26 @@ class ContentEngine:
         
         Generate the following PLATFORM-SPECIFIC packages in one JSON object:
         
-        1. canonical:
-           - secondary_topic: A related sub-category.
-           - core_thesis: One sentence summary of the stance.
-        
-        2. facebook_page_post:
-           - post_body: 300-400 words, clear stance, conversational, strong hook. mobile-formatted (1-2 line paragraphs).
-           - headlines: 3 scroll-stopping options (<=12 words each).
-           - cta: 1-2 engagement-oriented sentences.
-           - pinned_comment: 1-2 open-ended sentences inviting debate.
-           - distribution_safe_version: Final, softened-claim version of the post_body.
-           - metadata: {{ "recommended_post_time": "ISO string", "timezone": "America/Toronto", "post_intent": "accountability", "status": "generated" }}
-           
-        3. facebook_group_post:
-           - post_body: 150-250 words, conversational, question-forward.
-           - discussion_prompt: Explicit question for members.
-           - safety_notes: Note on why phrasing is group-safe.
-           - metadata: {{ "group_safe_score": 0.9, "recommended_delay": "+45 min", "status": "generated" }}
-           
-        4. instagram_reel:
-           - reel_script: 20-35s script with visual beats.
-           - on_screen_text: Array of 5-8 short text bursts (<=10 words each).
-           - caption: 2 short paragraphs, ends with 3-5 hashtags.
-           - seed_comment: 1 open-ended question.
-           - metadata: {{ "audio_guidance": "voiceover", "recommended_post_time": "ISO string", "status": "generated" }}
-           
-        5. youtube_short:
-           - shorts_script: 20-40s timestamped script (Hook, Build, CTA).
-           - title: <=70 characters, curiosity-driven.
-           - description: 1-2 sentence summary.
-           - pinned_comment: Accountability or clarification question.
-           - metadata: {{ "retention_hook_used": true, "recommended_post_time": "ISO string", "status": "generated" }}
-           
-        6. x_post:
-           - primary_post: Main post <= 280 chars.
-           - thread_replies: 2-4 follow-up replies (each <= 280 chars).
-           - engagement_question: Short, pointed question.
-           - metadata: {{ "post_type": "thread", "recommended_post_time": "ISO string", "status": "generated" }}
-           
-        7. comment_seeding_pack:
-           - yt_seed_comments: Array of 3 comments.
-           - ig_seed_comments: Array of 3 comments.
-           - pin_recommendation: Which comment to pin and why.
-           - follow_up_timing: "+10 min"
-           - creator_reply_templates: {{ "agree": "template text", "neutral": "template text", "calm_disagreement": "template text" }}
-           
-        8. carousel_asset:
-           - slides: 6-8 slides with text (<=12 words), visual_direction, and text_style per slide.
-           - caption: Summary for the post.
-           - metadata: {{ "status": "generated" }}
+{sections}
 
         Return valid JSON with these keys. No markdown blocks.
         """
 
+    def _get_section_prompt(self, cluster_id, context, strongest_angle, section):
+        return f"""
+        You are HANS SAYS. Voice: blunt, Canadian, accountability-focused. Short sentences. No fluff.
+        
+        Topic: {cluster_id}
+        Core Angle: {strongest_angle}
+        Context: {context}
+        
+        Generate only this part of the PLATFORM-SPECIFIC package:
+        
+{_section_block(1, section)}
+
+        Return valid JSON with the single key "{section}". No markdown blocks.
+        """
+
     def _get_mock_package_data(self, cluster_id):
         return {
             "canonical": {
@@ -0,0 +1,207 @@
+import hashlib
+import heapq
+import re
+import struct
+import threading
+import weakref
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models import ContentItem, TitleSignature
+
+_MAX_HASH = (1 << 64) - 1
+
+
+def tokenize(title: str) -> FrozenSet[str]:
+    """
+    Same word tokenization as FilterService.jaccard_similarity.
+    """
+    return frozenset(re.sub(r'\W+', ' ', (title or "").lower()).split())
+
+
+def jaccard(tokens1: FrozenSet[str], tokens2: FrozenSet[str]) -> float:
+    if not tokens1 or not tokens2:
+        return 0.0
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+
+class TitleSignatureData:
+    """
+    Token set plus LSH band keys for one title.
+    """
+    __slots__ = ("tokens", "band_keys")
+
+    def __init__(self, tokens: FrozenSet[str], band_keys: List[int]):
+        self.tokens = tokens
+        self.band_keys = band_keys
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH banding index answering "is this title more than `threshold`
+    Jaccard-similar to anything in the window" without scanning the window.
+
+    Titles sharing a band key become candidates and are confirmed with the exact
+    Jaccard of FilterService, so there are no false positives. With 32 bands of
+    4 rows a pair at J=0.7 becomes a candidate with probability ~0.9998.
+    Entries carry a timestamp and `expire` drops them as the window slides.
+    Lookups and updates hold the index's lock, so one ingestion thread can
+    query while another refreshes.
+    """
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._seed = str(seed).encode("utf-8") + b":"
+        self._hash_format = struct.Struct(f"<{num_perm}I")
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(bands)]
+        self._entries: Dict[int, Tuple[FrozenSet[str], List[int]]] = {}
+        self._expiry_heap: List[Tuple[datetime, int]] = []
+        self.max_item_id = 0
+        self.window_start: Optional[datetime] = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _token_hashes(self, token: str):
+        # One SHAKE-128 call yields `num_perm` independent 32-bit hashes of the token.
+        digest = hashlib.shake_128(self._seed + token.encode("utf-8")).digest(self._hash_format.size)
+        return self._hash_format.unpack(digest)
+
+    def signature(self, title: str) -> TitleSignatureData:
+        tokens = tokenize(title)
+        if not tokens:
+            return TitleSignatureData(tokens, [])
+
+        minhashes = list(map(min, zip(*(self._token_hashes(t) for t in tokens))))
+
+        band_keys = []
+        for band in range(self.bands):
+            chunk = minhashes[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f"<{self.rows}I", *chunk), digest_size=8).digest()
+            band_keys.append(int.from_bytes(digest, "little") & (_MAX_HASH >> 1))  # Fits a signed 64-bit JSON int
+        return TitleSignatureData(tokens, band_keys)
+
+    def add(self, item_id: int, signature: TitleSignatureData, timestamp: Optional[datetime] = None):
+        with self._lock:
+            if item_id in self._entries:
+                self.remove(item_id)
+            self._entries[item_id] = (signature.tokens, signature.band_keys)
+            for band, key in enumerate(signature.band_keys):
+                self._buckets[band].setdefault(key, set()).add(item_id)
+            if timestamp is not None:
+                heapq.heappush(self._expiry_heap, (timestamp, item_id))
+            self.max_item_id = max(self.max_item_id, item_id)
+
+    def remove(self, item_id: int):
+        with self._lock:
+            entry = self._entries.pop(item_id, None)
+            if entry is None:
+                return
+            for band, key in enumerate(entry[1]):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Drops every entry whose timestamp is older than `cutoff`.
+        """
+        removed = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+                _, item_id = heapq.heappop(self._expiry_heap)
+                if item_id in self._entries:
+                    self.remove(item_id)
+                    removed += 1
+            self.window_start = cutoff
+        return removed
+
+    def find_similar(self, signature: TitleSignatureData) -> Optional[int]:
+        """
+        Returns the id of an indexed title with Jaccard > threshold, if any.
+        """
+        checked = set()
+        with self._lock:
+            for band, key in enumerate(signature.band_keys):
+                for item_id in self._buckets[band].get(key, ()):
+                    if item_id in checked:
+                        continue
+                    checked.add(item_id)
+                    if jaccard(signature.tokens, self._entries[item_id][0]) > self.threshold:
+                        return item_id
+        return None
+
+    def is_duplicate(self, title: str) -> bool:
+        return self.find_similar(self.signature(title)) is not None
+
+    def refresh(self, db: Session, window_hours: int = 24):
+        """
+        Slides the window to the last `window_hours` and indexes items added since
+        the previous refresh. Stored signatures are reused; items without one
+        (rows from before the index existed) are signed and backfilled in the
+        caller's transaction (flushed, not committed).
+        """
+        since = datetime.now() - timedelta(hours=window_hours)
+        self.expire(since)
+
+        rows = db.query(
+            ContentItem.id, ContentItem.title, ContentItem.timestamp, TitleSignature.band_keys
+        ).outerjoin(
+            TitleSignature, TitleSignature.item_id == ContentItem.id
+        ).filter(
+            ContentItem.timestamp >= since,
+            ContentItem.id > self.max_item_id
+        ).all()
+
+        backfilled = 0
+        for item_id, title, timestamp, band_keys in rows:
+            tokens = tokenize(title)
+            if band_keys is None or len(band_keys) != self.bands:
+                signature = self.signature(title)
+                db.merge(TitleSignature(item_id=item_id, timestamp=timestamp, band_keys=signature.band_keys))
+                backfilled += 1
+            else:
+                signature = TitleSignatureData(tokens, band_keys)
+            self.add(item_id, signature, timestamp)
+
+        if backfilled:
+            db.flush()
+        return len(rows)
+
+    def store(self, db: Session, entries: List[Tuple[int, Optional[datetime], TitleSignatureData]]):
+        """
+        Persists (item_id, timestamp, signature) of freshly inserted items with a
+        single executemany, in the caller's transaction.
+        """
+        if entries:
+            db.execute(insert(TitleSignature), [
+                {"item_id": item_id, "timestamp": timestamp, "band_keys": signature.band_keys}
+                for item_id, timestamp, signature in entries
+            ])
+
+
+_shared_indexes = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def get_recent_index(db: Session, window_hours: int = 24, threshold: float = 0.7) -> NearDuplicateIndex:
+    """
+    Returns the process-wide index for this database, slid to the current window.
+    Only items added since the last call are read from the DB.
+    """
+    bind = db.get_bind()
+    with _shared_lock:
+        index = _shared_indexes.get(bind)
+        if index is None or index.threshold != threshold:
+            index = NearDuplicateIndex(threshold=threshold)
+            _shared_indexes[bind] = index
+        index.refresh(db, window_hours)
+    return index
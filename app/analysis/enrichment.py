@@ -1,75 +1,113 @@
 import os
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from app.models import ContentItem, SourceType
-from openai import OpenAI
+from app.analysis.ranker import queue_for_ranking
+from app.analysis.llm import SHARED_CACHE, create_llm_client
+from app.response_cache import ITEMS, bump_versions
+
+PAYWALLED_DOMAINS = ["nytimes.com", "wsj.com", "theglobeandmail.com", "thestar.com"]
 
 class EnrichmentService:
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_workers: Optional[int] = None, max_inflight: Optional[int] = None,
+                 cache=SHARED_CACHE):
+        self.max_workers = max_workers or int(os.getenv("ENRICHMENT_WORKERS", 8))
+        self.llm = create_llm_client(api_key, base_url, max_inflight=max_inflight or self.max_workers, cache=cache)
+        self.client = self.llm.client if self.llm else None
 
-    def process_item(self, db: Session, item: ContentItem):
+    def process_item(self, db: Session, item: ContentItem, commit: bool = True):
         """
         Enriches a single item if it's missing a summary or likely paywalled.
         """
-        if item.summary and len(item.summary) > 50 and not self._is_paywall_likely(item):
+        if not self._needs_enrichment(item):
             return
 
         print(f"Enriching item: {item.title}")
         
         # 1. Attempt to fetch summary via LLM if we have the title/URL context
         summary = self._fetch_fallback_summary(item)
+        self._apply_summary(db, item, summary)
         
+        if commit:
+            db.commit()
+            bump_versions(ITEMS)
+
+    def _needs_enrichment(self, item: ContentItem) -> bool:
+        return not (item.summary and len(item.summary) > 50 and not self._is_paywall_likely(item))
+
+    def _apply_summary(self, db: Session, item: ContentItem, summary: Optional[str]):
         if summary:
             item.summary = summary
             item.enrichment_status = "generated"
+            queue_for_ranking(db, [item.id])
         else:
             item.is_unavailable = True
             item.enrichment_status = "failed"
-        
-        db.commit()
 
     def _is_paywall_likely(self, item: ContentItem) -> bool:
         """
         Heuristic check for common paywalled domains or indicators.
         """
-        paywalled_domains = ["nytimes.com", "wsj.com", "theglobeandmail.com", "thestar.com"]
-        return any(domain in item.url for domain in paywalled_domains)
+        return any(domain in item.url for domain in PAYWALLED_DOMAINS)
 
     def _fetch_fallback_summary(self, item: ContentItem) -> Optional[str]:
         """
         Uses LLM to generate a summary based on the title and any snippet available.
         In a real scenario, this might call a specialized news API.
         """
-        if not self.client:
+        return self._summarize(item.title)
+
+    def _summarize(self, title: str) -> Optional[str]:
+        if not self.llm:
             return None
 
         try:
-            prompt = f"Summarize this news headline in 2-3 concise sentences for a political feed: {item.title}"
-            response = self.client.chat.completions.create(
+            prompt = f"Summarize this news headline in 2-3 concise sentences for a political feed: {title}"
+            content = self.llm.complete(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a concise political news summarizer."},
                     {"role": "user", "content": prompt}
                 ]
             )
-            return response.choices[0].message.content.strip()
+            return content.strip()
         except Exception as e:
             print(f"Enrichment error: {e}")
             return None
 
-    def enrich_batch(self, db: Session, limit: int = 20):
+    def enrich_batch(self, db: Session, limit: Optional[int] = None) -> int:
         """
-        Enriches a batch of items that need it.
+        Enriches a batch of items that need it. Summaries are fetched concurrently
+        (up to max_workers) and all results are committed in one transaction.
         """
-        items = db.query(ContentItem).filter(
-            ContentItem.enrichment_status == "original"
+        limit = limit or int(os.getenv("ENRICHMENT_BATCH_LIMIT", 100))
+        # Same condition as _needs_enrichment, so items that are fine as-is don't fill the batch
+        items: List[ContentItem] = db.query(ContentItem).filter(
+            ContentItem.enrichment_status == "original",
+            or_(
+                ContentItem.summary.is_(None),
+                func.length(ContentItem.summary) <= 50,
+                *[ContentItem.url.contains(domain) for domain in PAYWALLED_DOMAINS]
+            )
         ).order_by(ContentItem.timestamp.desc()).limit(limit).all()
         
-        for item in items:
-            self.process_item(db, item)
+        if not items:
+            return 0
+
+        print(f"Enriching {len(items)} items with {min(self.max_workers, len(items))} workers...")
+        titles = [item.title for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            summaries = list(pool.map(self._summarize, titles))
+
+        for item, summary in zip(items, summaries):
+            self._apply_summary(db, item, summary)
+        db.commit()
+        bump_versions(ITEMS)
+
+        if self.llm:
+            print(f"Enrichment done: {sum(1 for s in summaries if s)}/{len(items)} summarized, {self.llm.stats()}")
+        return len(items)
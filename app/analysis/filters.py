@@ -1,6 +1,7 @@
 from typing import List, Set
 import re
 from config import STRONG_LANGUAGE
+from app.analysis.keywords import KeywordMatcher, get_keyword_matcher, STRONG_LANGUAGE as STRONG_LANGUAGE_CATEGORY
 
 class FilterService:
     def __init__(self, blacklist_keywords: List[str] = None, whitelist_sources: Set[str] = None):
@@ -8,6 +9,13 @@ class FilterService:
         self.blacklist.extend(STRONG_LANGUAGE) # Auto-blacklist extremely strong language from generation
         self.whitelist_sources = whitelist_sources or set()
 
+        if blacklist_keywords:
+            self.matcher = KeywordMatcher({"blacklist": self.blacklist})
+            self.blacklist_category = "blacklist"
+        else:
+            self.matcher = get_keyword_matcher(STRONG_LANGUAGE_CATEGORY)
+            self.blacklist_category = STRONG_LANGUAGE_CATEGORY
+
     def is_eligible(self, title: str, summary: str, source_name: str) -> bool:
         """
         Determines if an item is eligible for ingestion and content generation.
@@ -15,9 +23,8 @@ class FilterService:
         text = f"{title} {summary or ''}".lower()
         
         # 1. Check Blacklist
-        for word in self.blacklist:
-            if re.search(rf'\b{re.escape(word)}\b', text):
-                return False
+        if self.matcher.match(text).get(self.blacklist_category):
+            return False
         
         # 2. Check source (Optional logic)
         # if self.whitelist_sources and source_name not in self.whitelist_sources:
@@ -0,0 +1,74 @@
+import json
+from typing import Any, List, Tuple
+
+
+class JSONSectionParser:
+    """
+    Incrementally parses a streamed top-level JSON object.
+
+    `feed(chunk)` returns the (key, value) members that became complete with
+    that chunk, so an object or array member is available as soon as its
+    closing bracket arrives rather than when the whole document ends. Text
+    before the opening brace (e.g. a markdown fence) and after the closing
+    brace is ignored; a member that doesn't parse is skipped.
+    """
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        members = []
+        if self.done:
+            return members
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text):
+            c = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._start = self._pos + 1
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._emit(text[self._start:self._pos + 1], members)
+                    self._start = self._pos + 1
+                elif self._depth == 0:
+                    self._emit(text[self._start:self._pos], members)
+                    self.done = True
+                    break
+            elif c == "," and self._depth == 1:
+                self._emit(text[self._start:self._pos], members)
+                self._start = self._pos + 1
+            self._pos += 1
+
+        # Drop what has been consumed so long streams don't grow the buffer.
+        self._text = text[self._start:]
+        self._pos -= self._start
+        self._start = 0
+        return members
+
+    def _emit(self, member: str, members: List[Tuple[str, Any]]):
+        member = member.strip().lstrip(",").strip()
+        if not member:
+            return
+        try:
+            members.extend(json.loads("{" + member + "}").items())
+        except ValueError:
+            pass
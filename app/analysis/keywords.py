@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STRONG_LANGUAGE = "strong_language"
+CONTROVERSIAL_TOPICS = "controversial_topics"
+POLITICAL_PREFIX = "political:"
+CLUSTER_PREFIX = "cluster:"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Regex source matching any of `terms`, factored into a character trie so the
+    engine rejects a position after a character or two instead of trying every
+    alternative. Longer continuations are tried before ending at a shorter
+    term, so the match at a position is the longest term that fits.
+    """
+    root: Dict[str, dict] = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+
+class _ModePattern:
+    """
+    One compiled alternation for all terms sharing a matching mode.
+
+    The pattern is a zero-width lookahead tried at every position that prefers
+    longer terms, so each start position yields the longest term that matches
+    there. Shorter terms matching at the same position are always
+    prefixes of that term, and whether they match is known up front. They are
+    precomputed in `_prefixes`, so hits equal independent per-term searches.
+    """
+    def __init__(self, terms: Iterable[str], whole_word: bool):
+        self.whole_word = whole_word
+        terms = sorted(set(terms), key=lambda t: (-len(t), t))
+        self._prefixes: Dict[str, List[str]] = {}
+        for term in terms:
+            self._prefixes[term] = [
+                other for other in terms
+                if len(other) < len(term) and term.startswith(other) and self._ends_cleanly(term, len(other))
+            ]
+
+        alternation = _trie_pattern(terms)
+        if whole_word:
+            self.regex = re.compile(rf"(?=\b({alternation})\b)") if terms else None
+        else:
+            self.regex = re.compile(rf"(?=({alternation}))") if terms else None
+
+    def _ends_cleanly(self, term: str, cut: int) -> bool:
+        if not self.whole_word:
+            return True
+        return _is_word_char(term[cut - 1]) != _is_word_char(term[cut])
+
+    def scan(self, text: str):
+        if self.regex is None:
+            return
+        for match in self.regex.finditer(text):
+            term = match.group(1)
+            start = match.start()
+            yield term, start
+            for prefix in self._prefixes[term]:
+                yield prefix, start
+
+
+class KeywordMatcher:
+    """
+    Matches many keyword categories against a text in a single regex scan per
+    matching mode (whole-word or substring), instead of one `re.search` per word.
+
+    Terms and text are compared lower-cased. `match` returns, per category, the
+    distinct terms found in the order they were configured; `scan` + `terms`
+    give access to hit positions for callers that need to look at a prefix of
+    the text (e.g. only the title part of "title summary").
+    """
+    def __init__(self, categories: Dict[str, Iterable[str]], substring_categories: Iterable[str] = ()):
+        substring_categories = set(substring_categories)
+        self._order: Dict[str, Dict[str, int]] = {}
+        self._term_categories: Dict[Tuple[bool, str], List[str]] = {}
+
+        for category, terms in categories.items():
+            whole_word = category not in substring_categories
+            self._order[category] = {}
+            for term in terms:
+                term = term.lower()
+                self._order[category].setdefault(term, len(self._order[category]))
+                self._term_categories.setdefault((whole_word, term), []).append(category)
+
+        self._patterns = [
+            _ModePattern([t for (w, t) in self._term_categories if w == whole_word], whole_word)
+            for whole_word in (True, False)
+        ]
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._order)
+
+    def scan(self, text: str) -> List[Tuple[str, str, int]]:
+        """
+        Every (category, term, start) hit in the lower-cased text.
+        """
+        text = (text or "").lower()
+        hits = []
+        for pattern in self._patterns:
+            for term, start in pattern.scan(text):
+                for category in self._term_categories[(pattern.whole_word, term)]:
+                    hits.append((category, term, start))
+        return hits
+
+    def terms(self, hits: List[Tuple[str, str, int]], category: str, end: Optional[int] = None) -> List[str]:
+        """
+        Distinct terms of `category` among `hits`, in configured order.
+        `end` keeps only hits lying entirely within text[:end].
+        """
+        found = {
+            term for hit_category, term, start in hits
+            if hit_category == category and (end is None or start + len(term) <= end)
+        }
+        return sorted(found, key=self._order[category].__getitem__)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """
+        Returns {category: [terms found]} for every category with at least one hit.
+        """
+        hits = self.scan(text)
+        return {category: self.terms(hits, category) for category in {h[0] for h in hits}}
+
+
+@lru_cache(maxsize=None)
+def get_keyword_matcher(*only: str) -> KeywordMatcher:
+    """
+    The shared matcher built once from the config.py keyword lists. Passing
+    category names builds (and caches) a smaller matcher for just those.
+    """
+    from config import STRONG_LANGUAGE as STRONG_WORDS, CONTROVERSIAL_TOPICS as TOPICS
+    from config import POLITICAL_KEYWORDS, CLUSTER_KEYWORDS
+
+    categories = {STRONG_LANGUAGE: STRONG_WORDS, CONTROVERSIAL_TOPICS: TOPICS}
+    categories.update({f"{POLITICAL_PREFIX}{name}": terms for name, terms in POLITICAL_KEYWORDS.items()})
+    categories.update({f"{CLUSTER_PREFIX}{name}": terms for name, terms in CLUSTER_KEYWORDS.items()})
+    if only:
+        categories = {name: terms for name, terms in categories.items() if name in only}
+    # Controversial topics have always been plain substring checks.
+    return KeywordMatcher(categories, substring_categories=[CONTROVERSIAL_TOPICS])
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+from openai import OpenAI, RateLimitError, APIConnectionError, InternalServerError
+from sqlalchemy import func
+from app.metrics import metrics
+from app.models import LLMResponse
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of chat completion content in the `llm_responses` table.
+
+    Keys hash the model, the full message list (system and user prompt) and
+    the response_format, so any change to the prompt context is a miss.
+    Entries expire after `ttl_hours`; beyond `max_entries` the least recently
+    used are evicted. Each call uses its own short-lived session, so the cache
+    is safe to share between worker threads, and a failing cache never fails
+    the request.
+    """
+    def __init__(self, session_factory, ttl_hours: Optional[float] = None, max_entries: Optional[int] = None):
+        self.session_factory = session_factory
+        self.ttl = timedelta(hours=ttl_hours if ttl_hours is not None else float(os.getenv("LLM_CACHE_TTL_HOURS", 24)))
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+
+    @staticmethod
+    def key(model: str, messages: List[Dict], response_format: Optional[Dict] = None, **params) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "response_format": response_format, "params": params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = datetime.now()
+        try:
+            db = self.session_factory()
+            try:
+                entry = db.get(LLMResponse, key)
+                if entry is not None and entry.created_at < now - self.ttl:
+                    db.delete(entry)
+                    db.commit()
+                    entry = None
+                if entry is None:
+                    with self._lock:
+                        self.misses += 1
+                    return None
+                entry.hits = (entry.hits or 0) + 1
+                entry.last_used_at = now
+                content, latency_ms = entry.content, entry.latency_ms or 0.0
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.latency_saved_ms += latency_ms
+        return content
+
+    def put(self, key: str, model: str, content: str, latency_ms: float):
+        now = datetime.now()
+        try:
+            db = self.session_factory()
+            try:
+                db.merge(LLMResponse(
+                    cache_key=key, model=model, content=content, latency_ms=latency_ms,
+                    hits=0, created_at=now, last_used_at=now
+                ))
+                db.flush()
+                db.query(LLMResponse).filter(LLMResponse.created_at < now - self.ttl).delete()
+                excess = db.query(func.count(LLMResponse.cache_key)).scalar() - self.max_entries
+                if excess > 0:
+                    oldest = db.query(LLMResponse.cache_key).order_by(LLMResponse.last_used_at).limit(excess)
+                    db.query(LLMResponse).filter(LLMResponse.cache_key.in_(oldest.scalar_subquery())).delete(
+                        synchronize_session=False
+                    )
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+
+    def stats(self) -> Dict:
+        stats = {
+            "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else None,
+            "latency_saved_ms": round(self.latency_saved_ms, 1),
+        }
+        try:
+            db = self.session_factory()
+            try:
+                entries, stored_hits, saved = db.query(
+                    func.count(LLMResponse.cache_key), func.sum(LLMResponse.hits),
+                    func.sum(LLMResponse.hits * LLMResponse.latency_ms)
+                ).one()
+            finally:
+                db.close()
+            stats.update({
+                "entries": entries, "max_entries": self.max_entries, "ttl_hours": self.ttl.total_seconds() / 3600,
+                "lifetime_hits": stored_hits or 0, "lifetime_latency_saved_ms": round(saved or 0.0, 1)
+            })
+        except Exception as e:
+            print(f"LLM cache stats error: {e}")
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    The process-wide cache on the app database, or None if LLM_CACHE_ENABLED=0.
+    """
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+    from app.database import SessionLocal
+    return LLMResponseCache(SessionLocal)
+
+
+class LLMClient:
+    """
+    Wraps an OpenAI-compatible client for concurrent callers.
+
+    At most `max_inflight` requests are outstanding at once. Rate limited (429)
+    requests are retried after the server's Retry-After (or exponential backoff
+    with jitter), and the wait is shared: every caller holds off until the
+    cool-down ends instead of hammering the API in parallel. Connection errors
+    and 5xx responses are retried with backoff as well.
+    """
+    def __init__(self, client: OpenAI, max_inflight: Optional[int] = None, max_retries: Optional[int] = None,
+                 base_delay: float = 1.0, max_delay: float = 30.0, cache: Optional[LLMResponseCache] = None):
+        self.client = client
+        self.cache = cache
+        self.max_inflight = max_inflight or int(os.getenv("LLM_MAX_INFLIGHT", 8))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", 5))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._inflight = threading.BoundedSemaphore(self.max_inflight)
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def chat(self, **kwargs):
+        """
+        client.chat.completions.create(**kwargs) with in-flight limiting and retries.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_cool_down()
+            with self._inflight:
+                try:
+                    with self._lock:
+                        self.requests += 1
+                    return self.client.chat.completions.create(**kwargs)
+                except RateLimitError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._retry_after(e) or self._backoff(attempt)
+                    with self._lock:
+                        self.rate_limited += 1
+                        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                except (APIConnectionError, InternalServerError):
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def complete(self, model: str, messages: List[Dict], response_format: Optional[Dict] = None,
+                 use_cache: bool = True, **params) -> str:
+        """
+        Message content of a chat completion, served from the response cache when
+        an identical request was answered before. Truncated answers and JSON-mode
+        answers that don't parse are not cached.
+        """
+        key = None
+        if self.cache is not None and use_cache:
+            key = self.cache.key(model, messages, response_format, **params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.inc("llm_cache_hits_total", model=model)
+                return cached
+
+        if response_format is not None:
+            params["response_format"] = response_format
+        started = time.perf_counter()
+        try:
+            response = self.chat(model=model, messages=messages, **params)
+        except Exception:
+            metrics.inc("llm_errors_total", model=model)
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._record(model, "complete", latency_ms, getattr(response, "usage", None))
+        choice = response.choices[0]
+        content = choice.message.content
+
+        if key is not None and choice.finish_reason == "stop" and self._cacheable(content, response_format):
+            self.cache.put(key, model, content, latency_ms)
+        return content
+
+    def stream_complete(self, model: str, messages: List[Dict], response_format: Optional[Dict] = None,
+                        use_cache: bool = True, **params) -> Iterator[str]:
+        """
+        Like complete(), but yields the content as the tokens arrive. A cached
+        answer is yielded in one piece; a streamed answer is cached once it has
+        finished cleanly. Only opening the stream is retried, not a stream that
+        breaks off midway.
+        """
+        key = None
+        if self.cache is not None and use_cache:
+            key = self.cache.key(model, messages, response_format, **params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.inc("llm_cache_hits_total", model=model)
+                yield cached
+                return
+
+        if response_format is not None:
+            params["response_format"] = response_format
+        started = time.perf_counter()
+        try:
+            stream = self.chat(model=model, messages=messages, stream=True, **params)
+        except Exception:
+            metrics.inc("llm_errors_total", model=model)
+            raise
+        parts = []
+        finish_reason = None
+        usage = None
+        for chunk in stream:
+            # Only sent when the request asks for it (stream_options include_usage)
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta and choice.delta.content:
+                parts.append(choice.delta.content)
+                yield choice.delta.content
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._record(model, "stream", latency_ms, usage)
+
+        content = "".join(parts)
+        if key is not None and finish_reason == "stop" and self._cacheable(content, response_format):
+            self.cache.put(key, model, content, latency_ms)
+
+    def _record(self, model: str, mode: str, latency_ms: float, usage):
+        metrics.observe("llm_request_seconds", latency_ms / 1000, model=model, mode=mode)
+        if usage is not None:
+            metrics.inc("llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+            metrics.inc("llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+
+    def _cacheable(self, content: Optional[str], response_format: Optional[Dict]) -> bool:
+        if not content:
+            return False
+        if response_format and response_format.get("type") == "json_object":
+            try:
+                json.loads(content)
+            except ValueError:
+                return False
+        return True
+
+    def stats(self):
+        return {"requests": self.requests, "retries": self.retries, "rate_limited": self.rate_limited}
+
+    def _wait_for_cool_down(self):
+        while True:
+            with self._lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _retry_after(self, error) -> Optional[float]:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                return min(self.max_delay, float(headers["retry-after-ms"]) / 1000)
+            if headers.get("retry-after"):
+                return min(self.max_delay, float(headers["retry-after"]))
+        except ValueError:
+            pass
+        return None
+
+
+# Default for `cache` arguments: the process-wide response cache. None disables caching.
+SHARED_CACHE = object()
+
+
+def create_llm_client(api_key: Optional[str] = None, base_url: Optional[str] = None,
+                      max_inflight: Optional[int] = None, cache=SHARED_CACHE) -> Optional[LLMClient]:
+    """
+    LLMClient for OPENAI_API_KEY / OPENAI_BASE_URL, or None without a key.
+    Retries are handled by LLMClient, so the SDK's own retries are disabled.
+    Uses the process-wide response cache unless another `cache` is given;
+    cache=None sends every request.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    client = OpenAI(api_key=api_key, base_url=base_url or os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+    if cache is SHARED_CACHE:
+        cache = get_response_cache()
+    return LLMClient(client, max_inflight=max_inflight, cache=cache)
@@ -1,25 +1,65 @@
 from sqlalchemy.orm import Session
-from textblob import TextBlob
-from app.models import ContentItem, SourceType
-from sqlalchemy import func
+from app.models import ContentItem, SourceType, RankedItem, RankingQueue, RankingState
+from sqlalchemy import func, insert
 from datetime import datetime, timedelta
+from itertools import chain
 import re
-from config import CONTROVERSIAL_TOPICS, STRONG_LANGUAGE
+import numpy as np
+from app.analysis import columnar
+from app.analysis.bulk import BulkItemUpdater
+from app.analysis.keywords import get_keyword_matcher, CONTROVERSIAL_TOPICS, STRONG_LANGUAGE
+from app.analysis.sentiment import SentimentCache, sentiment_text
+from app.response_cache import ITEMS, bump_versions
+from app.events import publish_scores
 
 class ContentRanker:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, vectorized: bool = True):
         self.db = db
+        self.vectorized = vectorized  # Full-window rescores use the columnar NumPy path
+        self.matcher = get_keyword_matcher(CONTROVERSIAL_TOPICS, STRONG_LANGUAGE)
+        self.sentiment = SentimentCache(db)
+        self.rescored = []  # (id, final_score, controversy_score) written by the last run
 
-    def calculate_final_scores(self, lookback_hours=24):
+    def calculate_final_scores(self, lookback_hours=24, incremental=False):
         """
         Calculates and updates final_score for items ingested within lookback_hours
         using the new 40/20/20/20 engagement weighting and 0-100 controversy scale.
+
+        With incremental=True only new items, queued items (see queue_for_ranking)
+        and items whose coverage count changed are rescored. The window is
+        rescored in full when there is no state for this lookback yet or a
+        normalization maximum changes.
         """
         since = datetime.now() - timedelta(hours=lookback_hours)
+        if incremental and self._load_state().get("lookback_hours") == lookback_hours:
+            rescored = self._rescore_changed(since)
+            if rescored is not None:
+                print(f"Incremental ranking: rescored {rescored} items")
+                if rescored:
+                    bump_versions(ITEMS)
+                    publish_scores(self.rescored)
+                return rescored
+            print("Normalization maximum changed, rescoring the full window")
+        rescored = self._rescore_window(since, lookback_hours)
+        if rescored:
+            bump_versions(ITEMS)
+            publish_scores(self.rescored)
+        return rescored
+
+    def _rescore_window(self, since, lookback_hours):
+        if self.vectorized:
+            return self._rescore_window_columnar(since, lookback_hours)
+
+        last_item_id = self.db.query(func.max(ContentItem.id)).scalar() or 0
         items = self.db.query(ContentItem).filter(ContentItem.timestamp >= since).all()
         
         if not items:
-            return
+            return 0
+
+        # Stored sentiment for unchanged titles/summaries, so TextBlob only sees new text
+        self.sentiment.prefetch(
+            text for item in items for text in (item.title, self._full_text(item))
+        )
 
         # 1. Calculate Coverage Signals (Cross-source repetition)
         coverage_counts = self._calculate_coverage_signals(items)
@@ -28,52 +68,267 @@ class ContentRanker:
         max_metrics = self._get_max_metrics(items)
 
         for item in items:
-            # Step 2: Calculate Controversy Score (0-100)
-            c_score, reason = self._calculate_controversy_details(item)
-            item.controversy_score = c_score
-            item.controversy_reason = reason
+            self._score_item(item, max_metrics, coverage_counts)
+        self.rescored = [(item.id, item.final_score, item.controversy_score) for item in items]
 
-            # Step 3: Calculate Engagement Score (0-100)
-            engagement_score = self._calculate_weighted_engagement(item, max_metrics, coverage_counts)
-            
-            # final_score = controversy_score + engagement_score
-            item.final_score = round(item.controversy_score + engagement_score, 2)
+        self._reset_ledger([self._ledger_row(item) for item in items], lookback_hours, max_metrics, last_item_id)
+        return len(items)
+
+    def _rescore_window_columnar(self, since, lookback_hours):
+        """
+        Same scores as the per-item path, computed over column arrays. Only the
+        keyword scan and the sentiment lookup stay per row; everything is written
+        back with chunked executemany UPDATEs by primary key.
+        """
+        last_item_id = self.db.query(func.max(ContentItem.id)).scalar() or 0
+        rows = self.db.query(
+            ContentItem.id, ContentItem.source_type, ContentItem.source_name, ContentItem.title,
+            ContentItem.summary, ContentItem.engagement_metrics, ContentItem.timestamp
+        ).filter(ContentItem.timestamp >= since).all()
+
+        if not rows:
+            return 0
+
+        full_texts = [sentiment_text(row.title, row.summary) for row in rows]
+        self.sentiment.prefetch(chain((row.title for row in rows), full_texts))
+
+        signals = [self._controversy_signals(row.title, row.summary) for row in rows]
+        metric_counts = [self._metric_counts(row.source_type, row.engagement_metrics) for row in rows]
+        counts = np.array(metric_counts, dtype=float)
+        title_sentiment = np.array([self.sentiment.get(row.title) for row in rows])
+        full_sentiment = np.array([self.sentiment.get(text) for text in full_texts])
+        fingerprints = [self._fingerprint(row.title) for row in rows]
+        is_reddit = np.array([row.source_type == SourceType.REDDIT for row in rows])
+
+        max_metrics = self._get_max_metrics(rows)
+        intense = np.abs(full_sentiment[:, 0]) * full_sentiment[:, 1] > 0.3
+        controversy = columnar.controversy_scores(
+            np.array([bool(topics) for topics, _ in signals]), np.array([len(words) for _, words in signals]), intense
+        )
+        engagement = columnar.engagement_scores(
+            is_reddit, counts[:, 0], counts[:, 1], np.abs(title_sentiment[:, 0]) * title_sentiment[:, 1],
+            columnar.coverage_counts(fingerprints, [row.source_name for row in rows]), max_metrics
+        )
+        final = np.round(controversy + engagement, 2)
+
+        with BulkItemUpdater(self.db) as updater:
+            for row, (topics, words), c_score, f_score, is_intense in zip(
+                rows, signals, controversy.tolist(), final.tolist(), intense.tolist()
+            ):
+                updater.add(
+                    row.id, controversy_score=c_score, final_score=f_score,
+                    controversy_reason=self._controversy_reason(topics, words, is_intense)
+                )
+        self.rescored = list(zip((row.id for row in rows), final.tolist(), controversy.tolist()))
+
+        ledger_rows = [
+            {
+                "item_id": row.id, "fingerprint": fingerprint, "source_name": row.source_name,
+                "timestamp": row.timestamp, "ups": ups, "comments": comments
+            }
+            for row, fingerprint, (ups, comments) in zip(rows, fingerprints, metric_counts)
+        ]
+        self._reset_ledger(ledger_rows, lookback_hours, max_metrics, last_item_id)
+        return len(rows)
+
+    def _reset_ledger(self, ledger_rows, lookback_hours, max_metrics, last_item_id):
+        # Ledger of what each item was scored with, for later incremental runs
+        self.db.query(RankedItem).delete()
+        self.db.query(RankingQueue).delete()
+        if ledger_rows:
+            self.db.execute(insert(RankedItem.__table__), ledger_rows)
+        self._save_state(lookback_hours=lookback_hours, max_metrics=max_metrics, last_item_id=last_item_id)
         
+        self.sentiment.flush()
         self.db.commit()
 
+    def _rescore_changed(self, since):
+        """
+        Rescores only what changed since the last run. Returns the number of
+        items rescored, or None when a maximum changed and the window needs a
+        full rescore.
+        """
+        state = self._load_state()
+        max_metrics = state["max_metrics"]
+        last_item_id = self.db.query(func.max(ContentItem.id)).scalar() or 0
+
+        # 1. Items that slid out of the window
+        expired = self.db.query(RankedItem).filter(RankedItem.timestamp < since).all()
+        for entry in expired:
+            if self._holds_max(entry.ups, entry.comments, max_metrics):
+                return None
+
+        # 2. New items and items queued because their metrics or text changed
+        queued_ids = [item_id for (item_id,) in self.db.query(RankingQueue.item_id)]
+        candidates = self.db.query(ContentItem).filter(
+            ContentItem.timestamp >= since,
+            (ContentItem.id > state["last_item_id"]) | ContentItem.id.in_(queued_ids)
+        ).all()
+        ledger = {
+            entry.item_id: entry for entry in
+            self.db.query(RankedItem).filter(RankedItem.item_id.in_([item.id for item in candidates]))
+        }
+        for item in candidates:
+            ups, comments = self._engagement_counts(item)
+            if ups > max_metrics['ups'] or comments > max_metrics['comments']:
+                return None
+            previous = ledger.get(item.id)
+            if previous and self._holds_max(previous.ups, previous.comments, max_metrics) and (
+                ups < previous.ups or comments < previous.comments
+            ):
+                return None
+
+        # 3. Update the ledger, tracking fingerprints whose source count may change
+        fingerprints = {entry.fingerprint for entry in expired}
+        fingerprints.update(self._fingerprint(item.title) for item in candidates)
+        fingerprints.update(entry.fingerprint for entry in ledger.values())
+        counts_before = self._ledger_coverage(fingerprints)
+
+        for entry in expired:
+            self.db.delete(entry)
+        new_rows = []
+        for item in candidates:
+            row = self._ledger_row(item)
+            if item.id in ledger:
+                for key, value in row.items():
+                    setattr(ledger[item.id], key, value)
+            else:
+                new_rows.append(row)
+        if new_rows:
+            self.db.execute(insert(RankedItem), new_rows)
+        self.db.flush()
+        coverage_counts = self._ledger_coverage(fingerprints)
+
+        # 4. Rescore candidates and items sharing a fingerprint whose count changed
+        changed = [fp for fp in fingerprints if counts_before.get(fp) != coverage_counts.get(fp)]
+        items = {item.id: item for item in candidates}
+        if changed:
+            neighbour_ids = [
+                item_id for (item_id,) in
+                self.db.query(RankedItem.item_id).filter(RankedItem.fingerprint.in_(changed))
+                if item_id not in items
+            ]
+            if neighbour_ids:
+                items.update({
+                    item.id: item for item in
+                    self.db.query(ContentItem).filter(ContentItem.id.in_(neighbour_ids))
+                })
+
+        self.sentiment.prefetch(
+            text for item in items.values() for text in (item.title, self._full_text(item))
+        )
+        for item in items.values():
+            self._score_item(item, max_metrics, coverage_counts)
+        self.rescored = [(item.id, item.final_score, item.controversy_score) for item in items.values()]
+
+        self.db.query(RankingQueue).delete()
+        self._save_state(last_item_id=max(last_item_id, state["last_item_id"]))
+        self.sentiment.flush()
+        self.db.commit()
+        return len(items)
+
+    def _score_item(self, item, max_metrics, coverage_counts):
+        # Step 2: Calculate Controversy Score (0-100)
+        c_score, reason = self._calculate_controversy_details(item)
+        item.controversy_score = c_score
+        item.controversy_reason = reason
+
+        # Step 3: Calculate Engagement Score (0-100)
+        engagement_score = self._calculate_weighted_engagement(item, max_metrics, coverage_counts)
+        
+        # final_score = controversy_score + engagement_score
+        item.final_score = round(item.controversy_score + engagement_score, 2)
+
+    def _full_text(self, item):
+        return sentiment_text(item.title, item.summary)
+
+    def _fingerprint(self, title):
+        norm_title = re.sub(r'\W+', ' ', title.lower()).strip()
+        words = norm_title.split()
+        return " ".join(words[:5]) if len(words) > 3 else norm_title
+
+    def _engagement_counts(self, item):
+        return self._metric_counts(item.source_type, item.engagement_metrics)
+
+    def _metric_counts(self, source_type, engagement_metrics):
+        if source_type != SourceType.REDDIT:
+            return 0, 0
+        metrics = engagement_metrics or {}
+        return metrics.get('score', 0), metrics.get('num_comments', 0)
+
+    def _holds_max(self, ups, comments, max_metrics):
+        return (max_metrics['ups'] > 0 and ups >= max_metrics['ups']) or \
+            (max_metrics['comments'] > 0 and comments >= max_metrics['comments'])
+
+    def _ledger_row(self, item):
+        ups, comments = self._engagement_counts(item)
+        return {
+            "item_id": item.id, "fingerprint": self._fingerprint(item.title), "source_name": item.source_name,
+            "timestamp": item.timestamp, "ups": ups, "comments": comments
+        }
+
+    def _ledger_coverage(self, fingerprints):
+        if not fingerprints:
+            return {}
+        rows = self.db.query(
+            RankedItem.fingerprint, func.count(func.distinct(RankedItem.source_name))
+        ).filter(RankedItem.fingerprint.in_(list(fingerprints))).group_by(RankedItem.fingerprint).all()
+        return dict(rows)
+
+    def _load_state(self):
+        return {row.key: row.value for row in self.db.query(RankingState)}
+
+    def _save_state(self, **values):
+        for key, value in values.items():
+            self.db.merge(RankingState(key=key, value=value))
+
     def _calculate_controversy_details(self, item):
         """
         Calculates controversy_score (0-100) and controversy_reason.
         Based on sentiment intensity, charged language, topic sensitivity, and conflict framing.
         """
         score = 0.0
-        reasons = []
 
-        # 1. Topic Sensitivity
-        sensitive_match = [t for t in CONTROVERSIAL_TOPICS if t.lower() in item.title.lower()]
+        sensitive_match, charged_words = self._controversy_signals(item.title, item.summary)
+
+        # 1. Topic Sensitivity (title only)
         if sensitive_match:
             score += 40
-            reasons.append(f"Topic matches sensitive areas: {', '.join(sensitive_match)}")
 
         # 2. Charged Language
-        charged_words = [w for w in STRONG_LANGUAGE if re.search(rf'\b{w}\b', item.title.lower() + " " + (item.summary or "").lower())]
         if charged_words:
             # capped at 30
             score += min(len(charged_words) * 10, 30)
-            reasons.append(f"Contains charged language: {', '.join(charged_words[:3])}")
 
         # 3. Sentiment Intensity (Conflict Framing)
-        analysis = TextBlob(item.title + " " + (item.summary or ""))
-        intensity = abs(analysis.sentiment.polarity) * analysis.sentiment.subjectivity
-        if intensity > 0.3:
+        polarity, subjectivity = self.sentiment.get(self._full_text(item))
+        intensity = abs(polarity) * subjectivity
+        intense = intensity > 0.3
+        if intense:
             score += 30
-            reasons.append("High sentiment intensity and subjectivity detected")
 
         # Cap at 100
         final_c_score = min(score, 100.0)
         
-        reason_text = " ".join(reasons) if reasons else "No specific controversy signals detected."
-        return final_c_score, reason_text
+        return final_c_score, self._controversy_reason(sensitive_match, charged_words, intense)
+
+    def _controversy_signals(self, title, summary):
+        """
+        Sensitive topics in the title and charged words in title + summary.
+        """
+        title = title.lower()
+        hits = self.matcher.scan(title + " " + (summary or "").lower())
+        return self.matcher.terms(hits, CONTROVERSIAL_TOPICS, end=len(title)), self.matcher.terms(hits, STRONG_LANGUAGE)
+
+    def _controversy_reason(self, sensitive_match, charged_words, intense):
+        reasons = []
+        if sensitive_match:
+            reasons.append(f"Topic matches sensitive areas: {', '.join(sensitive_match)}")
+        if charged_words:
+            reasons.append(f"Contains charged language: {', '.join(charged_words[:3])}")
+        if intense:
+            reasons.append("High sentiment intensity and subjectivity detected")
+        return " ".join(reasons) if reasons else "No specific controversy signals detected."
 
     def _calculate_weighted_engagement(self, item, max_metrics, coverage_counts):
         """
@@ -103,15 +358,13 @@ class ContentRanker:
                 score += (min(comments / max_metrics['comments'], 1.0)) * 20
 
         # 3. Headline intensity (20%)
-        analysis = TextBlob(item.title)
-        intensity = abs(analysis.sentiment.polarity) * analysis.sentiment.subjectivity
+        polarity, subjectivity = self.sentiment.get(item.title)
+        intensity = abs(polarity) * subjectivity
         # Map 0-1 intensity to 0-20 score
         score += intensity * 20
 
         # 4. Cross-source repetition (20%)
-        norm_title = re.sub(r'\W+', ' ', item.title.lower()).strip()
-        words = norm_title.split()
-        fingerprint = " ".join(words[:5]) if len(words) > 3 else norm_title
+        fingerprint = self._fingerprint(item.title)
         sources_count = coverage_counts.get(fingerprint, 1)
         # Boost: 1 source = 0, 2 = 10, 3+ = 20
         if sources_count == 2:
@@ -124,9 +377,7 @@ class ContentRanker:
     def _calculate_coverage_signals(self, items):
         counts = {}
         for item in items:
-            norm_title = re.sub(r'\W+', ' ', item.title.lower()).strip()
-            words = norm_title.split()
-            fingerprint = " ".join(words[:5]) if len(words) > 3 else norm_title
+            fingerprint = self._fingerprint(item.title)
             
             if fingerprint not in counts:
                 counts[fingerprint] = set()
@@ -143,3 +394,20 @@ class ContentRanker:
                 if ups > max_metrics['ups']: max_metrics['ups'] = ups
                 if comments > max_metrics['comments']: max_metrics['comments'] = comments
         return max_metrics
+
+
+def queue_for_ranking(db: Session, item_ids):
+    """
+    Marks items whose engagement_metrics or text changed so the next incremental
+    ranking run rescores them. Runs in the caller's transaction.
+    """
+    item_ids = {item_id for item_id in item_ids if item_id is not None}
+    if not item_ids:
+        return
+    queued = {
+        item_id for (item_id,) in
+        db.query(RankingQueue.item_id).filter(RankingQueue.item_id.in_(list(item_ids)))
+    }
+    rows = [{"item_id": item_id} for item_id in item_ids - queued]
+    if rows:
+        db.execute(insert(RankingQueue), rows)
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import insert as generic_insert
+from sqlalchemy.orm import Session
+from textblob import TextBlob
+from app.metrics import metrics
+from app.models import SentimentResult
+
+Sentiment = Tuple[float, float]  # (polarity, subjectivity)
+
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def sentiment_text(title: Optional[str], summary: Optional[str]) -> str:
+    """
+    The text an item's sentiment is computed on. Ingestion and the ranker
+    both key SentimentCache with it, so an item is analyzed once.
+    """
+    return f"{title or ''} {summary or ''}"
+
+
+class _LRU:
+    """
+    Thread-safe bounded mapping of text hash -> sentiment, shared by the process.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Sentiment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Sentiment]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Sentiment):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(int(os.getenv("SENTIMENT_LRU_SIZE", 50000)))
+
+
+class SentimentCache:
+    """
+    TextBlob sentiment that is computed at most once per distinct text.
+
+    Lookups go to the in-process LRU first, then to the `sentiment_cache` table
+    (loaded in bulk with `prefetch`). Texts seen for the first time are
+    analyzed, and the result is queued so that `flush` persists it in the
+    caller's transaction. Without a session only the LRU is used.
+    """
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db
+        self._pending: Dict[str, Sentiment] = {}
+        self.hits = 0
+        self.misses = 0
+        self._reported_hits = 0
+
+    def prefetch(self, texts: Iterable[str]) -> int:
+        """
+        Loads stored results for `texts` not already in the LRU. Returns how many were found.
+        """
+        if self.db is None:
+            return 0
+        wanted = list({text_hash(t) for t in texts if t} - set(self._pending))
+        wanted = [key for key in wanted if _lru.get(key) is None]
+        found = 0
+        for start in range(0, len(wanted), _LOOKUP_CHUNK):
+            rows = self.db.query(
+                SentimentResult.text_hash, SentimentResult.polarity, SentimentResult.subjectivity
+            ).filter(SentimentResult.text_hash.in_(wanted[start:start + _LOOKUP_CHUNK])).all()
+            for key, polarity, subjectivity in rows:
+                _lru.put(key, (polarity, subjectivity))
+                found += 1
+        return found
+
+    def get(self, text: str) -> Sentiment:
+        key = text_hash(text)
+        value = _lru.get(key) or self._pending.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        started = time.perf_counter()
+        sentiment = TextBlob(text).sentiment
+        value = (sentiment.polarity, sentiment.subjectivity)
+        metrics.inc("sentiment_textblob_seconds_total", time.perf_counter() - started)
+        metrics.inc("sentiment_lookups_total", result="miss")
+        _lru.put(key, value)
+        if self.db is not None:
+            self._pending[key] = value
+        return value
+
+    def flush(self) -> int:
+        """
+        Writes results computed since the last flush. Does not commit.
+        """
+        # Hits are too frequent to count one by one
+        metrics.inc("sentiment_lookups_total", self.hits - self._reported_hits, result="hit")
+        self._reported_hits = self.hits
+        if self.db is None or not self._pending:
+            return 0
+        rows = [
+            {"text_hash": key, "polarity": polarity, "subjectivity": subjectivity}
+            for key, (polarity, subjectivity) in self._pending.items()
+        ]
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            self.db.execute(insert(SentimentResult).on_conflict_do_nothing(index_elements=[SentimentResult.text_hash]), rows)
+        else:
+            stored = {
+                key for (key,) in self.db.query(SentimentResult.text_hash).filter(
+                    SentimentResult.text_hash.in_(list(self._pending))
+                )
+            }
+            rows = [r for r in rows if r["text_hash"] not in stored]
+            if rows:
+                self.db.execute(generic_insert(SentimentResult), rows)
+        self._pending.clear()
+        return len(rows)
@@ -0,0 +1,113 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert as generic_insert
+from sqlalchemy.orm import Session
+from app.models import ContentItem, TrendingCount
+from app.analysis.bulk import stream_items
+from app.analysis.keywords import get_keyword_matcher, POLITICAL_PREFIX
+
+
+def political_categories(title: str, summary: str) -> List[str]:
+    """
+    POLITICAL_KEYWORDS categories with at least one whole-word hit in the item.
+    """
+    from config import POLITICAL_KEYWORDS
+    matcher = get_keyword_matcher(*(f"{POLITICAL_PREFIX}{name}" for name in POLITICAL_KEYWORDS))
+    return [category[len(POLITICAL_PREFIX):] for category in matcher.match(f"{title} {summary or ''}")]
+
+
+def hour_bucket(timestamp: Optional[datetime]) -> datetime:
+    return (timestamp or datetime.now()).replace(minute=0, second=0, microsecond=0)
+
+
+class TrendingCounter:
+    """
+    Accumulates per (category, country, hour) hit counts for newly ingested
+    items and adds them to `trending_counts` on flush, in the caller's
+    transaction, so the counters commit (or roll back) with the items.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        self._pending: Counter = Counter()
+
+    def add(self, title: str, summary: str, country: Optional[str], timestamp: Optional[datetime]):
+        bucket = hour_bucket(timestamp)
+        for category in political_categories(title, summary):
+            self._pending[(category, country or "", bucket)] += 1
+
+    def add_rows(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.add(row.get("title"), row.get("summary"), row.get("country"), row.get("timestamp"))
+
+    def flush(self) -> int:
+        """
+        Writes counts accumulated since the last flush. Does not commit.
+        """
+        if not self._pending:
+            return 0
+        rows = [
+            {"category": category, "country": country, "hour": hour, "count": count}
+            for (category, country, hour), count in self._pending.items()
+        ]
+        # Cleared up front: after a failed write the caller rolls back, and the
+        # counts must not be carried into the next feed's flush.
+        self._pending.clear()
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(TrendingCount)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TrendingCount.category, TrendingCount.country, TrendingCount.hour],
+                set_={"count": TrendingCount.count + stmt.excluded.count}
+            )
+            self.db.execute(stmt, rows)
+        else:
+            for row in rows:
+                updated = self.db.query(TrendingCount).filter(
+                    TrendingCount.category == row["category"], TrendingCount.country == row["country"],
+                    TrendingCount.hour == row["hour"]
+                ).update({"count": TrendingCount.count + row["count"]}, synchronize_session=False)
+                if not updated:
+                    self.db.execute(generic_insert(TrendingCount), [row])
+        return len(rows)
+
+
+def trending_counts(db: Session, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    country: Optional[str] = None) -> Dict[str, int]:
+    """
+    {category: items} over the hour buckets in [since, until), for every
+    POLITICAL_KEYWORDS category (zero when there were no hits). Both bounds
+    are floored to the hour: the hour holding `since` is counted, the hour
+    holding `until` is not.
+    """
+    from config import POLITICAL_KEYWORDS
+    query = db.query(TrendingCount.category, func.sum(TrendingCount.count))
+    if since is not None:
+        query = query.filter(TrendingCount.hour >= hour_bucket(since))
+    if until is not None:
+        query = query.filter(TrendingCount.hour < hour_bucket(until))
+    if country:
+        query = query.filter(TrendingCount.country == country)
+    totals = dict(query.group_by(TrendingCount.category).all())
+    return {category: int(totals.get(category) or 0) for category in POLITICAL_KEYWORDS}
+
+
+def backfill_trending(db: Session, batch_size: int = 1000) -> Tuple[int, int]:
+    """
+    Rebuilds trending_counts from every stored item. Returns (items, buckets).
+    """
+    db.query(TrendingCount).delete()
+    counter = TrendingCounter(db)
+    items = 0
+    for rows in stream_items(db, ContentItem.title, ContentItem.summary, ContentItem.country, ContentItem.timestamp,
+                             batch_size=batch_size):
+        for row in rows:
+            counter.add(row.title, row.summary, row.country, row.timestamp)
+        items += len(rows)
+    buckets = counter.flush()
+    db.commit()
+    return items, buckets
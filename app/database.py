@@ -1,17 +1,117 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from typing import Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.metrics import instrument_engine
 
 load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'app.db')}")
+# Optional read replica for the API's read-only routes (Postgres)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+
+def sqlite_pragmas(read_only: bool = False):
+    """
+    Connect hook for SQLite. WAL lets readers run alongside the one writer
+    SQLite allows, instead of both blocking each other on the rollback
+    journal; busy_timeout makes a second writer wait for the lock rather
+    than fail with "database is locked". NORMAL sync is durable under WAL
+    except for the last commits on power loss.
+    """
+    cache_kib = int(os.getenv("SQLITE_CACHE_MB", 64)) * 1024
+    mmap_bytes = int(os.getenv("SQLITE_MMAP_MB", 256)) * 1024 * 1024
+    busy_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 10000))
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={busy_ms}")
+        cursor.execute(f"PRAGMA cache_size=-{cache_kib}")
+        cursor.execute(f"PRAGMA mmap_size={mmap_bytes}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return on_connect
+
+
+def create_engines(url: str, read_url: str = None) -> Tuple[Engine, Engine]:
+    """
+    (write engine, read engine) for `url`.
+
+    SQLite: the write engine keeps a small pool for the background writers
+    (scheduler, job workers, LLM cache) and the read engine a larger
+    query_only pool for the API, which never waits on them under WAL.
+    In-memory databases are per connection, so both are the same engine.
+
+    Postgres: one sized pool with pre-ping, and a separate pool on
+    `read_url` when a replica is configured.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            engine = create_engine(url, connect_args={"check_same_thread": False})
+            return engine, engine
+        write_engine = create_engine(
+            url, connect_args={"check_same_thread": False},
+            pool_size=int(os.getenv("SQLITE_WRITE_POOL_SIZE", 4)), max_overflow=4, pool_timeout=60
+        )
+        event.listen(write_engine, "connect", sqlite_pragmas())
+        read_engine = create_engine(
+            url, connect_args={"check_same_thread": False},
+            pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", 8)), max_overflow=8
+        )
+        event.listen(read_engine, "connect", sqlite_pragmas(read_only=True))
+        return write_engine, read_engine
+
+    write_engine = create_engine(url, **_pool_options())
+    return write_engine, create_engine(read_url, **_pool_options()) if read_url else write_engine
+
+
+def _pool_options():
+    return dict(
+        pool_size=int(os.getenv("DB_POOL_SIZE", 10)), max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 30)), pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=True,
+    )
+
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def create_async_read_engine(url: str) -> AsyncEngine:
+    """
+    Async counterpart of the read engine for `url` (aiosqlite / asyncpg),
+    for the async API routes. An in-memory SQLite URL gets a database of
+    its own, so the async routes need a file database.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    async_url = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "sqlite":
+        engine = create_async_engine(async_url, pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", 8)), max_overflow=8)
+        event.listen(engine.sync_engine, "connect", sqlite_pragmas(read_only=True))
+        return engine
+    return create_async_engine(async_url, **_pool_options())
+
+
+engine, read_engine = create_engines(DATABASE_URL, DATABASE_READ_URL)
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 def get_db():
     db = SessionLocal()
@@ -20,6 +120,33 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """
+    Session for routes that only read; writes through it fail on SQLite.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@lru_cache(maxsize=1)
+def get_async_read_sessions() -> async_sessionmaker:
+    async_engine = create_async_read_engine(DATABASE_READ_URL or DATABASE_URL)
+    instrument_engine(async_engine.sync_engine)
+    return async_sessionmaker(async_engine, autoflush=False)
+
+async def get_async_read_db():
+    """
+    AsyncSession for the async read-only routes.
+    """
+    async with get_async_read_sessions()() as db:
+        yield db
+
 def init_db():
     from app.models import Base
+    from app.migrations import run_migrations
+    from app.search import ensure_search_index
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ensure_search_index(engine)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.schemas import LIST_FIELDS, SUMMARY_PREVIEW_CHARS
+
+# Event kinds sent on /events
+ITEMS = "items"        # {"items": [list view of each newly inserted item]}
+SCORES = "scores"      # {"scores": [[id, final_score, controversy_score], ...]}
+PACKAGE = "package"    # {"cluster_id", "package_id", "section"} when a package or section is saved
+ANGLES = "angles"      # {"cluster_id", "commentary_id"}
+JOB = "job"            # {"job_id", "kind", "cluster_id", "status", "error"} when a generation job finishes
+RESYNC = "resync"      # Events were missed; reload what is on screen
+
+
+class Subscription:
+    """
+    One /events client: a bounded queue on the client's event loop, filled
+    from whichever thread publishes. A client that falls `queue_size`
+    events behind gets a single resync instead of the backlog.
+    """
+    def __init__(self, bus: "EventBus", queue_size: int):
+        self.bus = bus
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def deliver(self, event: Tuple[int, str, str]):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The client's loop is gone
+            self.bus.unsubscribe(self)
+
+    def _put(self, event: Tuple[int, str, str]):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = (event[0], RESYNC, "{}")
+        self.queue.put_nowait(event)
+
+    async def stream(self, keepalive_seconds: float):
+        """
+        Server-sent event frames until the client disconnects, with a comment
+        line every `keepalive_seconds` so proxies keep the connection open.
+        """
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event_id, kind, data = await asyncio.wait_for(self.queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+        finally:
+            self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process pub/sub behind /events. Publishers (ingestion, ranking,
+    generation, job workers) run on their own threads; each event is
+    serialized once and handed to every subscriber's loop. The last
+    `history` events are kept so a reconnecting EventSource resumes from
+    Last-Event-ID. Events published by other processes are not seen.
+    """
+    def __init__(self, history: Optional[int] = None, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+        self._history = deque(maxlen=history or int(os.getenv("EVENTS_HISTORY", 512)))
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, kind: str, data: Dict):
+        payload = json.dumps(data, default=str)
+        with self._lock:
+            event = (self._next_id, kind, payload)
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Must be called on the event loop that will consume the subscription.
+        """
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                missed = [event for event in self._history if event[0] > last_event_id]
+                # Ids restart with the process, and the history is bounded
+                complete = last_event_id < self._next_id and (
+                    not self._history or self._history[0][0] <= last_event_id + 1
+                )
+                if not complete or len(missed) > self.queue_size:
+                    missed = [(self._next_id - 1, RESYNC, "{}")]
+                for event in missed:
+                    subscription.queue.put_nowait(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict:
+        return {"subscribers": len(self._subscribers), "last_event_id": self._next_id - 1}
+
+
+@lru_cache(maxsize=1)
+def get_event_bus() -> EventBus:
+    return EventBus()
+
+
+def publish(kind: str, data: Dict):
+    """
+    Publishes to the process-wide bus. Call after the commit, so clients
+    that follow up with a request see what the event describes.
+    """
+    try:
+        get_event_bus().publish(kind, data)
+    except Exception as e:
+        print(f"Event publish error: {e}")
+
+
+def publish_new_items(rows: Iterable[Dict], ids: Dict[str, int]):
+    """
+    An ITEMS event for the writer rows that were inserted (`ids` maps their
+    external_id to the new id), shaped like the /items list view.
+    """
+    items = []
+    for row in rows:
+        if row["external_id"] not in ids:
+            continue
+        item = {name: row.get(name) for name in LIST_FIELDS}
+        item.update(
+            id=ids[row["external_id"]], source_type=getattr(row["source_type"], "value", row["source_type"]),
+            summary=(row.get("summary") or "")[:SUMMARY_PREVIEW_CHARS], final_score=row.get("final_score") or 0.0,
+            controversy_score=row.get("controversy_score") or 0.0, used_for_content=False,
+            enrichment_status=row.get("enrichment_status") or "original",
+        )
+        items.append(item)
+    if items:
+        publish(ITEMS, {"items": items})
+
+
+def publish_scores(scores: List[Tuple[int, float, float]]):
+    if scores:
+        publish(SCORES, {"scores": [[item_id, final, controversy] for item_id, final, controversy in scores]})
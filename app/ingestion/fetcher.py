@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from app.metrics import metrics
+
+
+class FetchResult:
+    """
+    Outcome of a single feed download. Exactly one of `response` / `error` is set.
+    """
+    def __init__(self, key, url: str, response: Optional[requests.Response] = None,
+                 error: Optional[Exception] = None, elapsed: float = 0.0):
+        self.key = key
+        self.url = url
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.response is not None
+
+
+class FeedFetcher:
+    """
+    Downloads many feed URLs concurrently on a thread pool.
+
+    Only the network I/O runs on worker threads. Callers get the responses back
+    and parse / write them serially, so a single SQLAlchemy session stays safe.
+    A per-host semaphore keeps us polite to a single publisher and a global
+    deadline bounds the whole stage, so a cycle costs roughly the slowest feed.
+    """
+    def __init__(self, max_workers: Optional[int] = None, per_host_limit: Optional[int] = None,
+                 deadline: Optional[float] = None, timeout: float = 15):
+        self.max_workers = max_workers or int(os.getenv("FETCH_MAX_WORKERS", 16))
+        self.per_host_limit = per_host_limit or int(os.getenv("FETCH_PER_HOST_LIMIT", 2))
+        self.deadline = deadline or float(os.getenv("FETCH_DEADLINE_SECONDS", 60))
+        self.timeout = timeout
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[host]
+
+    def _fetch_one(self, key, url: str, headers: Dict[str, str], deadline_at: float) -> FetchResult:
+        started = time.monotonic()
+        semaphore = self._host_semaphore(url)
+        if not semaphore.acquire(timeout=max(deadline_at - started, 0)):
+            return FetchResult(key, url, error=TimeoutError("Fetch deadline exceeded waiting for host slot"))
+        try:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                return FetchResult(key, url, error=TimeoutError("Fetch deadline exceeded"))
+            response = requests.get(url, headers=headers, timeout=min(self.timeout, remaining))
+            response.raise_for_status()
+            return FetchResult(key, url, response=response, elapsed=time.monotonic() - started)
+        except requests.Timeout as e:
+            # The deadline, not the per-request timeout, cut this one short
+            error = TimeoutError("Fetch deadline exceeded") if remaining < self.timeout else e
+            return FetchResult(key, url, error=error, elapsed=time.monotonic() - started)
+        except Exception as e:
+            return FetchResult(key, url, error=e, elapsed=time.monotonic() - started)
+        finally:
+            semaphore.release()
+
+    def fetch_all(self, jobs: List[Tuple[object, str, Dict[str, str]]]) -> Dict[object, FetchResult]:
+        """
+        Fetches every (key, url, headers) job concurrently.
+        Returns a dict of key -> FetchResult. Jobs still running when the global
+        deadline passes are reported as TimeoutError results.
+        """
+        if not jobs:
+            return {}
+
+        deadline_at = time.monotonic() + self.deadline
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)))
+        try:
+            futures = {
+                executor.submit(self._fetch_one, key, url, headers, deadline_at): (key, url)
+                for key, url, headers in jobs
+            }
+            done, not_done = wait(futures, timeout=self.deadline)
+
+            results = {}
+            for future in done:
+                result = future.result()
+                results[result.key] = result
+                metrics.observe("fetch_seconds", result.elapsed, status="ok" if result.ok else "error")
+            for future in not_done:
+                key, url = futures[future]
+                future.cancel()
+                results[key] = FetchResult(key, url, error=TimeoutError("Fetch deadline exceeded"))
+            return results
+        finally:
+            # Don't block the cycle on stragglers; their sockets time out on their own.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prefetch_sources(db, validators, fetcher: Optional[FeedFetcher] = None) -> Dict[int, FetchResult]:
+    """
+    Downloads every active RSS and Reddit source in a single concurrent wave,
+    sending conditional GET headers from `validators` (a ValidatorStore).
+    The result (source.id -> FetchResult) is handed to fetch_rss_feeds and
+    fetch_reddit_content so neither stage waits on the other's network I/O.
+    """
+    from app.ingestion import rss, reddit
+
+    jobs = (
+        rss.build_fetch_jobs(rss.get_rss_sources(db), validators)
+        + reddit.build_fetch_jobs(reddit.get_reddit_sources(db), validators)
+    )
+    print(f"Fetching {len(jobs)} sources concurrently...")
+    started = time.monotonic()
+    results = (fetcher or FeedFetcher()).fetch_all(jobs)
+    failed = sum(1 for r in results.values() if not r.ok)
+    print(f"  - Fetched {len(results) - failed}/{len(jobs)} sources in {time.monotonic() - started:.1f}s")
+    return results
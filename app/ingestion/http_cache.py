@@ -0,0 +1,126 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import requests
+from sqlalchemy.orm import Session
+from app.models import FeedValidator
+
+
+class ValidatorStore:
+    """
+    Per-feed ETag / Last-Modified / body-hash store used for conditional polling.
+
+    Validator changes live in the caller's session, so they are committed
+    together with the feed's items. If processing fails and the session rolls
+    back, the old validators remain and the feed is parsed again next cycle.
+    """
+    def __init__(self, db: Session, namespace: str = ""):
+        self.db = db
+        self.namespace = namespace
+        self._validators: Dict[str, FeedValidator] = {}
+        self._pending_hashes: Dict[str, str] = {}
+
+    def _key(self, url: str) -> str:
+        return f"{self.namespace}{url}"
+
+    def load(self, urls: Iterable[str]):
+        """
+        Loads validators for all given URLs in a single query.
+        """
+        keys = [self._key(url) for url in urls if self._key(url) not in self._validators]
+        if not keys:
+            return
+        for validator in self.db.query(FeedValidator).filter(FeedValidator.cache_key.in_(keys)).all():
+            self._validators[validator.cache_key] = validator
+
+    def _get(self, url: str, create: bool = False) -> Optional[FeedValidator]:
+        key = self._key(url)
+        if key not in self._validators:
+            self.load([url])
+        validator = self._validators.get(key)
+        if validator is None and create:
+            validator = FeedValidator(cache_key=key, hits=0, misses=0)
+            self.db.add(validator)
+            self._validators[key] = validator
+        return validator
+
+    def snapshot(self, url: str):
+        """
+        The snapshot stored with the last processed body, or None.
+        """
+        validator = self._get(url)
+        return validator.snapshot if validator else None
+
+    def conditional_headers(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Returns `headers` extended with If-None-Match / If-Modified-Since when known.
+        """
+        headers = dict(headers or {})
+        validator = self._validators.get(self._key(url))
+        if validator:
+            if validator.etag:
+                headers['If-None-Match'] = validator.etag
+            if validator.last_modified:
+                headers['If-Modified-Since'] = validator.last_modified
+        return headers
+
+    def is_unchanged(self, url: str, response: requests.Response) -> bool:
+        """
+        True on a 304 or when the body hashes to the last processed body.
+        Records a hit or miss for the feed either way.
+        """
+        validator = self._get(url, create=True)
+        validator.last_checked_at = datetime.now()
+
+        if response.status_code == 304:
+            unchanged = True
+        else:
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            self._pending_hashes[url] = body_hash
+            unchanged = body_hash == validator.body_hash
+
+        if unchanged:
+            validator.hits = (validator.hits or 0) + 1
+            # Some servers only send fresh validators on 200s; keep what they gave us.
+            self._store_headers(validator, response)
+        else:
+            validator.misses = (validator.misses or 0) + 1
+        return unchanged
+
+    def remember(self, url: str, response: requests.Response, snapshot=None):
+        """
+        Stores the validators of a response once its entries have been processed,
+        with `snapshot` (JSON) for callers that must reproduce an unchanged feed.
+        """
+        validator = self._get(url, create=True)
+        self._store_headers(validator, response)
+        if snapshot is not None:
+            validator.snapshot = snapshot
+        body_hash = self._pending_hashes.pop(url, None)
+        if body_hash:
+            validator.body_hash = body_hash
+
+    def _store_headers(self, validator: FeedValidator, response: requests.Response):
+        if response.headers.get('ETag'):
+            validator.etag = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validator.last_modified = response.headers['Last-Modified']
+
+    def stats(self) -> List[Dict]:
+        """
+        Hit/miss counters for every feed in this namespace.
+        """
+        validators = self.db.query(FeedValidator).filter(
+            FeedValidator.cache_key.startswith(self.namespace)
+        ).order_by(FeedValidator.cache_key).all()
+        return [
+            {
+                "url": v.cache_key[len(self.namespace):],
+                "hits": v.hits or 0,
+                "misses": v.misses or 0,
+                "etag": v.etag,
+                "last_modified": v.last_modified,
+                "last_checked_at": v.last_checked_at,
+            }
+            for v in validators
+        ]
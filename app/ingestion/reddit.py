@@ -1,15 +1,43 @@
-import requests
 import os
 from sqlalchemy.orm import Session
-from app.models import ContentItem, Source, SourceType
+from app.models import Source, SourceType
 from app.analysis.controversy import ControversyAnalyzer
+from app.analysis.sentiment import SentimentCache
+from app.analysis.trending import TrendingCounter
+from app.analysis.dedup import get_recent_index
+from app.ingestion.fetcher import FeedFetcher, FetchResult
+from app.ingestion.http_cache import ValidatorStore
+from app.ingestion.writer import BulkItemWriter, WriteStats
+from app.response_cache import ITEMS, bump_versions
+from app.events import publish_new_items
+from app.metrics import metrics
 from datetime import datetime
+import time
+from typing import Dict, List, Optional
 import json
 from dotenv import load_dotenv
 from config import GET_ALL_KEYWORDS
 
 load_dotenv()
 
+REDDIT_BASE_URL = os.getenv("REDDIT_BASE_URL", "https://www.reddit.com")
+
+# Use a custom User-Agent to satisfy Reddit's non-API request policy
+REDDIT_HEADERS = {
+    'User-Agent': 'HansSays:v1.0.0 (News Aggregator Bot)'
+}
+
+def get_reddit_sources(db: Session) -> List[Source]:
+    return db.query(Source).filter(Source.type == SourceType.REDDIT, Source.is_active == 1).all()
+
+def build_fetch_jobs(sources: List[Source], validators: ValidatorStore):
+    urls = {source.id: f"{REDDIT_BASE_URL}/r/{source.url}/hot.json?limit=50" for source in sources}
+    validators.load(urls.values())
+    return [
+        (source.id, urls[source.id], validators.conditional_headers(urls[source.id], REDDIT_HEADERS))
+        for source in sources
+    ]
+
 def should_ingest_reddit(post_data, keywords, min_score=50):
     # Check "High Upvotes"
     if post_data.get('ups', 0) < min_score:
@@ -22,80 +50,141 @@ def should_ingest_reddit(post_data, keywords, min_score=50):
         
     return False
 
-def fetch_reddit_content(db: Session):
-    # Use a custom User-Agent to satisfy Reddit's non-API request policy
-    headers = {
-        'User-Agent': 'HansSays:v1.0.0 (News Aggregator Bot)'
-    }
-    
-    from app.analysis.filters import FilterService
-    from datetime import timedelta
-    filter_service = FilterService()
+def fetch_reddit_content(db: Session, fetched: Optional[Dict[int, FetchResult]] = None,
+                         validators: Optional[ValidatorStore] = None):
+    """
+    Ingests every active subreddit. Downloads run concurrently (or come
+    pre-fetched from the scheduler); parsing and DB writes stay on this thread.
+    Listings that answer 304 or return an unchanged body are skipped entirely.
+    Returns {source name: {"inserted", "updated", "skipped"}} for processed listings.
+    """
+    sources = get_reddit_sources(db)
+    sentiment = SentimentCache(db)
+    trending = TrendingCounter(db)
+    analyzer = ControversyAnalyzer(sentiment)
+    validators = validators or ValidatorStore(db)
+    writer = BulkItemWriter(db)
+    report = {}
 
-    sources = db.query(Source).filter(Source.type == SourceType.REDDIT, Source.is_active == 1).all()
+    if fetched is None:
+        print(f"Fetching {len(sources)} subreddits concurrently...")
+        fetched = FeedFetcher().fetch_all(build_fetch_jobs(sources, validators))
 
-    # Get recent items for similarity check
-    recent_items = db.query(ContentItem).filter(ContentItem.timestamp >= datetime.now() - timedelta(hours=24)).all()
+    # Near-duplicate index over the last 24h of titles (similarity check)
+    near_duplicates = get_recent_index(db, window_hours=24, threshold=0.7)
 
     for source in sources:
-        print(f"Fetching Reddit (Non-API): r/{source.url}")
+        print(f"Processing Reddit (Non-API): r/{source.url}")
         try:
-            url = f"https://www.reddit.com/r/{source.url}/hot.json?limit=50"
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            result = fetched.get(source.id)
+            if result is None:
+                raise RuntimeError("Source was not fetched")
+            if result.error:
+                metrics.inc("source_fetch_errors_total", source=source.name)
+                raise result.error
+            metrics.inc("source_bytes_fetched_total", len(result.response.content), source=source.name)
+            if validators.is_unchanged(result.url, result.response):
+                db.commit()
+                metrics.inc("source_unchanged_total", source=source.name)
+                print(f"  - Unchanged since last poll, skipped r/{source.url}")
+                continue
+            with metrics.timer("ingest_step_seconds", step="parse", kind="reddit"):
+                data = result.response.json()
+            stats = WriteStats()
             
             posts = data.get('data', {}).get('children', [])
-            
+            metrics.inc("source_entries_parsed_total", len(posts), source=source.name)
+            dedup_started = time.perf_counter()
+
+            candidates = []
             for post in posts:
                 item = post.get('data', {})
                 if not should_ingest_reddit(item, GET_ALL_KEYWORDS):
+                    stats.skipped += 1
                     continue
-                
-                title = item.get('title')
-                summary = item.get('selftext') if item.get('is_self') else item.get('url')
+                candidates.append(item)
+            metrics.inc("source_ineligible_total", stats.skipped, source=source.name)
 
-                # 1. Similarity Check
-                is_duplicate = False
-                for recent in recent_items:
-                    if filter_service.jaccard_similarity(title, recent.title) > 0.7:
-                        is_duplicate = True
-                        break
-                if is_duplicate:
-                    continue
-                    
+            # 1. Existing posts - one IN query for the whole listing
+            existing_ids = writer.existing_ids(item.get('id') for item in candidates)
+
+            rows = []
+            signatures = {}
+            seen = set()
+            for item in candidates:
                 external_id = item.get('id')
-                existing_item = db.query(ContentItem).filter(ContentItem.external_id == external_id).first()
-                
-                metrics = {
+                if external_id in seen:
+                    stats.skipped += 1
+                    continue
+                seen.add(external_id)
+
+                title = item.get('title')
+                summary = item.get('selftext') if item.get('is_self') else item.get('url')
+                engagement_metrics = {
                     "score": item.get('ups', 0),
                     "num_comments": item.get('num_comments', 0),
                     "upvote_ratio": item.get('upvote_ratio', 0)
                 }
 
-                if existing_item:
-                    existing_item.engagement_metrics = metrics
-                    continue
-
-                analyzer = ControversyAnalyzer()
-                controversy_score = analyzer.analyze(item.get('title', ''), item.get('selftext') if item.get('is_self') else item.get('url'))
+                if external_id in existing_ids:
+                    # Only engagement_metrics is written on conflict, so skip the analysis.
+                    controversy_score = 0.0
+                else:
+                    # 2. Similarity Check
+                    signature = near_duplicates.signature(title)
+                    if near_duplicates.find_similar(signature) is not None:
+                        stats.skipped += 1
+                        continue
+                    signatures[external_id] = signature
+                    controversy_score = analyzer.analyze(title, summary)
 
-                new_item = ContentItem(
+                rows.append(dict(
                     external_id=external_id,
                     source_type=SourceType.REDDIT,
                     source_name=source.name,
                     country=source.country,
-                    title=item.get('title'),
-                    summary=item.get('selftext') if item.get('is_self') else item.get('url'),
+                    title=title,
+                    summary=summary,
                     url=f"https://reddit.com{item.get('permalink')}",
                     timestamp=datetime.fromtimestamp(item.get('created_utc', 0)),
-                    engagement_metrics=metrics,
+                    engagement_metrics=engagement_metrics,
                     controversy_score=controversy_score,
                     raw_json=json.dumps({"id": external_id})
-                )
-                db.add(new_item)
+                ))
+
+            metrics.observe("ingest_step_seconds", time.perf_counter() - dedup_started, step="dedup", kind="reddit")
+            # Repeated ids in the listing and near duplicates; existing posts are updated, not dropped
+            metrics.inc("source_duplicates_dropped_total", len(candidates) - len(rows), source=source.name)
+
+            # 3. Single upsert: new posts are inserted, existing ones get fresh metrics
+            write_started = time.perf_counter()
+            written = writer.upsert(rows, update_metrics=True)
+            stats.updated = sum(1 for external_id in written if external_id in existing_ids)
+            stats.inserted = len(written) - stats.updated
+            near_duplicates.store(db, [
+                (written[row['external_id']], row['timestamp'], signatures[row['external_id']])
+                for row in rows if row['external_id'] in signatures and row['external_id'] in written
+            ])
+
+            trending.add_rows(
+                row for row in rows if row['external_id'] in written and row['external_id'] not in existing_ids
+            )
+
+            validators.remember(result.url, result.response)
+            sentiment.flush()
+            trending.flush()
             db.commit()
-            print(f"  - Successfully processed r/{source.url}")
+            metrics.observe("ingest_step_seconds", time.perf_counter() - write_started, step="write", kind="reddit")
+            metrics.inc("source_items_inserted_total", stats.inserted, source=source.name)
+            metrics.inc("source_items_updated_total", stats.updated, source=source.name)
+            if stats.inserted or stats.updated:
+                bump_versions(ITEMS)
+                publish_new_items(rows, {
+                    external_id: item_id for external_id, item_id in written.items() if external_id not in existing_ids
+                })
+            report[source.name] = stats.as_dict()
+            print(f"  - Successfully processed r/{source.url} ({stats})")
         except Exception as e:
             print(f"  - Error processing r/{source.url}: {e}")
             db.rollback()
+    return report
@@ -1,51 +1,103 @@
 import feedparser
-import requests
 from sqlalchemy.orm import Session
-from app.models import ContentItem, Source, SourceType
+from app.models import Source, SourceType
 from app.analysis.controversy import ControversyAnalyzer
+from app.analysis.sentiment import SentimentCache
+from app.analysis.trending import TrendingCounter
 from app.analysis.filters import FilterService
-from datetime import datetime, timedelta
+from app.analysis.dedup import get_recent_index
+from app.ingestion.fetcher import FeedFetcher, FetchResult
+from app.ingestion.http_cache import ValidatorStore
+from app.ingestion.writer import BulkItemWriter, WriteStats
+from app.response_cache import ITEMS, bump_versions
+from app.events import publish_new_items
+from app.metrics import metrics
+from datetime import datetime
+from typing import Dict, List, Optional
 import time
 import json
 
-def fetch_rss_feeds(db: Session):
-    sources = db.query(Source).filter(Source.type == SourceType.NEWS, Source.is_active == 1).all()
+RSS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (HansSays News Bot; v1.0.0)'
+}
+
+def get_rss_sources(db: Session) -> List[Source]:
+    return db.query(Source).filter(Source.type == SourceType.NEWS, Source.is_active == 1).all()
+
+def build_fetch_jobs(sources: List[Source], validators: ValidatorStore):
+    validators.load(source.url for source in sources)
+    return [(source.id, source.url, validators.conditional_headers(source.url, RSS_HEADERS)) for source in sources]
+
+def fetch_rss_feeds(db: Session, fetched: Optional[Dict[int, FetchResult]] = None,
+                    validators: Optional[ValidatorStore] = None):
+    """
+    Ingests every active RSS source. Downloads run concurrently (or come
+    pre-fetched from the scheduler); parsing and DB writes stay on this thread.
+    Feeds that answer 304 or return an unchanged body are skipped entirely.
+    Returns {source name: {"inserted", "updated", "skipped"}} for processed feeds.
+    """
+    sources = get_rss_sources(db)
     filter_service = FilterService()
+    sentiment = SentimentCache(db)
+    trending = TrendingCounter(db)
+    analyzer = ControversyAnalyzer(sentiment)
+    validators = validators or ValidatorStore(db)
+    writer = BulkItemWriter(db)
+    report = {}
+
+    if fetched is None:
+        print(f"Fetching {len(sources)} RSS feeds concurrently...")
+        fetched = FeedFetcher().fetch_all(build_fetch_jobs(sources, validators))
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (HansSays News Bot; v1.0.0)'
-    }
-    
-    # Get recent items for similarity check
-    recent_items = db.query(ContentItem).filter(ContentItem.timestamp >= datetime.now() - timedelta(hours=24)).all()
+    # Near-duplicate index over the last 24h of titles (similarity check)
+    near_duplicates = get_recent_index(db, window_hours=24, threshold=0.7)
     
     for source in sources:
-        print(f"Fetching RSS: {source.name}")
+        print(f"Processing RSS: {source.name}")
         try:
-            response = requests.get(source.url, headers=headers, timeout=15)
-            response.raise_for_status()
-            feed = feedparser.parse(response.text)
-            
+            result = fetched.get(source.id)
+            if result is None:
+                raise RuntimeError("Source was not fetched")
+            if result.error:
+                metrics.inc("source_fetch_errors_total", source=source.name)
+                raise result.error
+            metrics.inc("source_bytes_fetched_total", len(result.response.content), source=source.name)
+            if validators.is_unchanged(result.url, result.response):
+                db.commit()
+                metrics.inc("source_unchanged_total", source=source.name)
+                print(f"  - Unchanged since last poll, skipped {source.name}")
+                continue
+            with metrics.timer("ingest_step_seconds", step="parse", kind="rss"):
+                feed = feedparser.parse(result.response.text)
+            stats = WriteStats()
+            metrics.inc("source_entries_parsed_total", len(feed.entries), source=source.name)
+            dedup_started = time.perf_counter()
+
+            # 1. Eligibility Check
+            candidates = []
             for entry in feed.entries:
                 title = entry.get('title', 'No Title')
                 summary = entry.get('summary', entry.get('description', ''))
-                
-                # 1. Eligibility Check
                 if not filter_service.is_eligible(title, summary, source.name):
+                    stats.skipped += 1
                     continue
+                candidates.append((entry, title, summary))
+            metrics.inc("source_ineligible_total", stats.skipped, source=source.name)
+
+            # 2. Hard Deduplication (URL) - one IN query for the whole feed
+            existing_ids = writer.existing_ids(entry.link for entry, _, _ in candidates)
 
-                # 2. Hard Deduplication (URL)
-                existing_item = db.query(ContentItem).filter(ContentItem.external_id == entry.link).first()
-                if existing_item:
+            rows = []
+            signatures = {}
+            for entry, title, summary in candidates:
+                if entry.link in existing_ids or entry.link in signatures:
+                    stats.skipped += 1
                     continue
                 
                 # 3. Advanced Deduplication (Similarity)
-                is_duplicate = False
-                for recent in recent_items:
-                    if filter_service.jaccard_similarity(title, recent.title) > 0.7:
-                        is_duplicate = True
-                        break
-                if is_duplicate:
+                signature = near_duplicates.signature(title)
+                if near_duplicates.find_similar(signature) is not None:
+                    stats.skipped += 1
                     continue
                 
                 pub_date = None
@@ -56,25 +108,51 @@ def fetch_rss_feeds(db: Session):
                 else:
                     pub_date = datetime.now()
 
-                analyzer = ControversyAnalyzer()
-                controversy_score = analyzer.analyze(entry.get('title', ''), entry.get('summary', entry.get('description', '')))
+                controversy_score = analyzer.analyze(title, summary)
 
-                new_item = ContentItem(
+                rows.append(dict(
                     external_id=entry.link,
                     source_type=SourceType.NEWS,
                     source_name=source.name,
                     country=source.country,
-                    title=entry.get('title', 'No Title'),
-                    summary=entry.get('summary', entry.get('description', '')),
+                    title=title,
+                    summary=summary,
                     url=entry.link,
                     timestamp=pub_date,
                     engagement_metrics={}, # News rarely has engagement in RSS
                     controversy_score=controversy_score,
                     raw_json=json.dumps(entry)
-                )
-                db.add(new_item)
+                ))
+                signatures[entry.link] = signature
+
+            metrics.observe("ingest_step_seconds", time.perf_counter() - dedup_started, step="dedup", kind="rss")
+
+            # 4. Single bulk insert for the feed
+            write_started = time.perf_counter()
+            inserted = writer.upsert(rows)
+            stats.inserted = len(inserted)
+            stats.skipped += len(rows) - len(inserted)
+            near_duplicates.store(db, [
+                (inserted[row['external_id']], row['timestamp'], signatures[row['external_id']])
+                for row in rows if row['external_id'] in inserted
+            ])
+
+            trending.add_rows(row for row in rows if row['external_id'] in inserted)
+
+            validators.remember(result.url, result.response)
+            sentiment.flush()
+            trending.flush()
             db.commit()
-            print(f"  - Successfully processed {source.name}")
+            metrics.observe("ingest_step_seconds", time.perf_counter() - write_started, step="write", kind="rss")
+            metrics.inc("source_items_inserted_total", stats.inserted, source=source.name)
+            # Existing URLs, near duplicates and rows that lost the insert race
+            metrics.inc("source_duplicates_dropped_total", len(candidates) - stats.inserted, source=source.name)
+            if stats.inserted:
+                bump_versions(ITEMS)
+                publish_new_items(rows, inserted)
+            report[source.name] = stats.as_dict()
+            print(f"  - Successfully processed {source.name} ({stats})")
         except Exception as e:
             print(f"  - Error processing {source.name}: {e}")
             db.rollback()
+    return report
@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import insert as generic_insert
+from sqlalchemy.orm import Session
+from app.models import ContentItem
+from app.payloads import store_payloads
+from app.analysis.ranker import queue_for_ranking
+
+
+class WriteStats:
+    """
+    Per-source counters reported by the ingesters.
+    """
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"inserted": self.inserted, "updated": self.updated, "skipped": self.skipped}
+
+    def __str__(self):
+        return f"inserted {self.inserted}, updated {self.updated}, skipped {self.skipped}"
+
+
+class BulkItemWriter:
+    """
+    Writes one feed's worth of ContentItems with a constant number of round trips:
+    one IN query to resolve existing external_ids and one INSERT ... ON CONFLICT
+    ... RETURNING (SQLite 3.35+ / Postgres) that inserts new rows and optionally
+    refreshes engagement_metrics on rows that already exist. Other databases
+    fall back to an IN query plus executemany insert/update.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        dialect = db.get_bind().dialect
+        self.dialect = dialect.name
+        self.returning = dialect.insert_executemany_returning
+
+    def existing_ids(self, external_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Maps every already-stored external_id in `external_ids` to its item id.
+        """
+        external_ids = list({e for e in external_ids if e})
+        if not external_ids:
+            return {}
+        rows = self.db.query(ContentItem.external_id, ContentItem.id).filter(
+            ContentItem.external_id.in_(external_ids)
+        ).all()
+        return {external_id: item_id for external_id, item_id in rows}
+
+    def _insert(self):
+        if not self.returning:
+            return None
+        if self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+            return insert(ContentItem)
+        if self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            return insert(ContentItem)
+        return None
+
+    def upsert(self, rows: List[Dict], update_metrics: bool = False) -> Dict[str, int]:
+        """
+        Inserts `rows` (ContentItem column dicts, all with the same keys; a
+        `raw_json` key is stored in raw_payloads and replaced by its raw_hash).
+        Conflicting external_ids are ignored, or have only their engagement_metrics
+        overwritten when `update_metrics` is set (those rows are queued for the
+        incremental ranker). Returns external_id -> id for every row written.
+        """
+        if not rows:
+            return {}
+        if "raw_json" in rows[0]:
+            rows = self._store_payloads(rows)
+
+        stmt = self._insert()
+        if stmt is None:
+            written = self._upsert_fallback(rows, update_metrics)
+        else:
+            written = self._upsert_on_conflict(stmt, rows, update_metrics)
+        if update_metrics:
+            queue_for_ranking(self.db, written.values())
+        return written
+
+    def _store_payloads(self, rows: List[Dict]) -> List[Dict]:
+        hashes = store_payloads(self.db, [row["raw_json"] for row in rows])
+        return [
+            {**{key: value for key, value in row.items() if key != "raw_json"}, "raw_hash": raw_hash}
+            for row, raw_hash in zip(rows, hashes)
+        ]
+
+    def _upsert_on_conflict(self, stmt, rows: List[Dict], update_metrics: bool) -> Dict[str, int]:
+        if update_metrics:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ContentItem.external_id],
+                set_={"engagement_metrics": stmt.excluded.engagement_metrics}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[ContentItem.external_id])
+        stmt = stmt.returning(ContentItem.id, ContentItem.external_id)
+
+        result = self.db.execute(stmt, rows)
+        return {external_id: item_id for item_id, external_id in result.all()}
+
+    def _upsert_fallback(self, rows: List[Dict], update_metrics: bool) -> Dict[str, int]:
+        # No ON CONFLICT ... RETURNING: one IN query, then executemany insert/update.
+        existing = self.existing_ids(r["external_id"] for r in rows)
+        new_rows = [r for r in rows if r["external_id"] not in existing]
+        if new_rows:
+            self.db.execute(generic_insert(ContentItem), new_rows)
+        if update_metrics:
+            updates = [
+                {"id": existing[r["external_id"]], "engagement_metrics": r["engagement_metrics"]}
+                for r in rows if r["external_id"] in existing
+            ]
+            if updates:
+                self.db.bulk_update_mappings(ContentItem, updates)
+        written = self.existing_ids(r["external_id"] for r in new_rows)
+        if update_metrics:
+            written.update({r["external_id"]: existing[r["external_id"]] for r in rows if r["external_id"] in existing})
+        return written
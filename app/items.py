@@ -0,0 +1,107 @@
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import ContentItem, RawPayload, SourceType
+from app.pagination import decode_cursor, encode_cursor, keyset
+from app.payloads import decompress, load_payload
+from app.schemas import ItemOut, ItemPage, LIST_FIELDS, SUMMARY_PREVIEW_CHARS
+from app.search import apply_search, relevance
+
+# sort_by -> (sort key, descending). Searches default to relevance.
+ITEM_SORTS = {
+    "timestamp": (ContentItem.timestamp, True),
+    "final_score": (ContentItem.final_score, True),
+    "controversy_score": (ContentItem.controversy_score, True),
+}
+MAX_PAGE_SIZE = 200
+
+
+class UnknownFields(ValueError):
+    pass
+
+
+def list_items(db: Session, q: str = None, country: str = None, source_type: str = None, used: bool = None,
+               sort_by: str = None, limit: int = 20, cursor: str = None, fields: str = None) -> ItemPage:
+    """
+    The /items listing (see the route for the parameters). Raises
+    UnknownFields or pagination.InvalidCursor for bad requests.
+    """
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in ItemOut.model_fields]
+        if unknown:
+            raise UnknownFields(f"Unknown fields: {', '.join(unknown)}")
+        with_snippet, with_payload = "snippet" in names, "raw_json" in names
+        names = [name for name in names if name not in ("snippet", "raw_json")]
+        columns = [getattr(ContentItem, name) for name in names]
+    else:
+        names, with_snippet, with_payload = list(LIST_FIELDS), True, False
+        columns = [
+            func.substr(ContentItem.summary, 1, SUMMARY_PREVIEW_CHARS).label("summary") if name == "summary"
+            else getattr(ContentItem, name) for name in names
+        ]
+
+    query = db.query(*columns)
+    if with_payload:
+        query = query.outerjoin(RawPayload, RawPayload.payload_hash == ContentItem.raw_hash).add_columns(
+            RawPayload.codec.label("payload_codec"), RawPayload.data.label("payload")
+        )
+
+    if used is not None:
+        query = query.filter(ContentItem.used_for_content == used)
+
+    if country:
+        query = query.filter(ContentItem.country == country)
+
+    if source_type:
+        if source_type.lower() == "news":
+            query = query.filter(ContentItem.source_type == SourceType.NEWS)
+        elif source_type.lower() == "reddit":
+            query = query.filter(ContentItem.source_type == SourceType.REDDIT)
+
+    dialect = db.bind.dialect.name
+    searching = False
+    if q:
+        searched = apply_search(query, q, dialect, rank=False)
+        if searched is not None:
+            query, searching = searched, True
+
+    if sort_by in ITEM_SORTS:
+        key, descending = ITEM_SORTS[sort_by]
+    elif searching and sort_by in (None, "relevance") and relevance(q, dialect) is not None:
+        sort_by, key, descending = "relevance", relevance(q, dialect), False
+    else:
+        sort_by, (key, descending) = "timestamp", ITEM_SORTS["timestamp"]
+    # The page position is selected whatever the projection
+    query = query.add_columns(ContentItem.id.label("page_id"), key.label("page_key"))
+
+    after = decode_cursor(cursor, sort_by) if cursor else None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = keyset(query, key, ContentItem.id, descending, after).limit(limit + 1).all()
+    page = rows[:limit]
+
+    items = []
+    for row in page:
+        values = {name: row._mapping[name] for name in names}
+        if searching and with_snippet:
+            values["snippet"] = row._mapping["snippet"]
+        if with_payload:
+            values["raw_json"] = decompress(row._mapping["payload_codec"], row._mapping["payload"])
+        items.append(ItemOut(**values))
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]._mapping
+        next_cursor = encode_cursor(sort_by, last["page_key"], last["page_id"])
+    return ItemPage(items=items, next_cursor=next_cursor)
+
+
+def item_detail(db: Session, item_id: int) -> Optional[Dict]:
+    """
+    Every field of an item, with its raw payload, or None if there is no such item.
+    """
+    item = db.query(ContentItem).filter(ContentItem.id == item_id).first()
+    if not item:
+        return None
+    detail = ItemOut.model_validate(item)
+    detail.raw_json = load_payload(db, item.raw_hash)
+    return detail.model_dump(exclude={"snippet"})
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from app.models import GenerationJob, TopicCommentary, TopicPackage
+from app.events import JOB, publish
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _generate_angles(db, cluster_id: str, use_cache: bool = True) -> int:
+    from app.analysis.commentary import ContentEngine
+    commentary = ContentEngine().generate_commentary_angles(db, cluster_id, use_cache=use_cache)
+    if not commentary:
+        raise ValueError("No items found for this topic")
+    return commentary.id
+
+
+def _generate_package(db, cluster_id: str, use_cache: bool = True, parallel: Optional[bool] = None) -> int:
+    from app.analysis.commentary import ContentEngine
+    package = ContentEngine().generate_full_package(db, cluster_id, use_cache=use_cache, parallel=parallel)
+    if not package:
+        raise ValueError("No items found or failed to generate package")
+    return package.id
+
+
+def _regenerate_section(db, cluster_id: str, section: str) -> int:
+    from app.analysis.commentary import ContentEngine
+    package = ContentEngine().regenerate_section(db, cluster_id, section)
+    if not package:
+        raise ValueError("No package found or failed to regenerate section")
+    return package.id
+
+
+# kind -> handler(db, cluster_id, **params) returning the id of the stored result
+DEFAULT_HANDLERS: Dict[str, Callable] = {
+    "angles": _generate_angles,
+    "package": _generate_package,
+    "section": _regenerate_section,
+}
+
+RESULT_MODELS = {
+    "angles": TopicCommentary,
+    "package": TopicPackage,
+    "section": TopicPackage,
+}
+
+
+class JobQueue:
+    """
+    Generation jobs stored in the `generation_jobs` table and run by a fixed
+    pool of worker threads, so LLM calls never hold a request handler.
+
+    Submitting a job identical (kind, cluster, params) to one that is still
+    queued or running returns that job instead of adding another; a partial
+    unique index backs this up across processes. Workers claim jobs with a
+    conditional UPDATE, and jobs left running by a process that died are
+    requeued when the queue starts, so one process should run the workers.
+    """
+    def __init__(self, session_factory, handlers: Optional[Dict[str, Callable]] = None,
+                 workers: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.session_factory = session_factory
+        self.handlers = handlers or DEFAULT_HANDLERS
+        self.workers = workers or int(os.getenv("JOB_WORKERS", 2))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_SECONDS", 2))
+        self._pending = threading.Semaphore(0)
+        self._stop = threading.Event()
+        self._threads = []
+
+    @staticmethod
+    def dedup_key(kind: str, cluster_id: str, params: Dict) -> str:
+        payload = json.dumps({"kind": kind, "cluster_id": cluster_id, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def submit(self, kind: str, cluster_id: str, **params) -> Tuple[Dict, bool]:
+        """
+        Queues a job and returns (job, created). created is False when an
+        identical job was already in flight and that job is returned instead.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = self.dedup_key(kind, cluster_id, params)
+
+        db = self.session_factory()
+        try:
+            existing = self._active(db, key)
+            if existing:
+                return self._as_dict(existing), False
+
+            job = GenerationJob(
+                id=uuid.uuid4().hex, kind=kind, cluster_id=cluster_id, params=params, dedup_key=key,
+                status="queued", attempts=0, created_at=datetime.now()
+            )
+            db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another submitter won the race for this key.
+                db.rollback()
+                existing = self._active(db, key)
+                if existing:
+                    return self._as_dict(existing), False
+                raise
+            job = self._as_dict(job)
+        finally:
+            db.close()
+
+        self._pending.release()
+        return job, True
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict]:
+        db = self.session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            if not job:
+                return None
+            data = self._as_dict(job)
+            if with_result and job.status == "done" and job.result_id is not None:
+                data["result"] = db.get(RESULT_MODELS[job.kind], job.result_id)
+            return data
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        db = self.session_factory()
+        try:
+            counts = dict(db.query(GenerationJob.status, func.count(GenerationJob.id)).group_by(GenerationJob.status).all())
+        finally:
+            db.close()
+        return {"workers": self.workers, "running_threads": len(self._threads), **counts}
+
+    def start(self):
+        if self._threads:
+            return
+        requeued = self.requeue_interrupted()
+        if requeued:
+            print(f"Requeued {requeued} interrupted generation jobs.")
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"generation-job-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Job queue started with {self.workers} workers.")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        for _ in self._threads:
+            self._pending.release()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def requeue_interrupted(self) -> int:
+        db = self.session_factory()
+        try:
+            requeued = db.execute(
+                update(GenerationJob).where(GenerationJob.status == "running").values(status="queued", started_at=None)
+            ).rowcount
+            db.commit()
+            return requeued
+        finally:
+            db.close()
+
+    def run_next(self) -> bool:
+        """
+        Claims and runs the oldest queued job. Returns False if there was none.
+        """
+        job_id = self._claim()
+        if not job_id:
+            return False
+        self._run(job_id)
+        return True
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            # Woken by submit(); the timeout picks up jobs queued by other processes.
+            self._pending.acquire(timeout=self.poll_interval)
+
+    def _claim(self) -> Optional[str]:
+        db = self.session_factory()
+        try:
+            while True:
+                candidate = db.query(GenerationJob.id).filter(
+                    GenerationJob.status == "queued"
+                ).order_by(GenerationJob.created_at).first()
+                if not candidate:
+                    return None
+                claimed = db.execute(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == candidate.id, GenerationJob.status == "queued")
+                    .values(status="running", started_at=datetime.now(), attempts=GenerationJob.attempts + 1)
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return candidate.id
+        finally:
+            db.close()
+
+    def _run(self, job_id: str):
+        db = self.session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            kind, cluster_id, params = job.kind, job.cluster_id, job.params or {}
+            try:
+                result_id = self.handlers[kind](db, cluster_id, **params)
+                job = db.get(GenerationJob, job_id)
+                job.status, job.result_id = "done", result_id
+            except Exception as e:
+                print(f"Generation job {job_id} ({kind} {cluster_id}) failed: {e}")
+                db.rollback()
+                job = db.get(GenerationJob, job_id)
+                job.status, job.error = "failed", str(e)
+            job.finished_at = datetime.now()
+            finished = {"job_id": job_id, "kind": kind, "cluster_id": cluster_id, "status": job.status, "error": job.error}
+            db.commit()
+            publish(JOB, finished)
+        finally:
+            db.close()
+
+    def _active(self, db, key: str) -> Optional[GenerationJob]:
+        return db.query(GenerationJob).filter(
+            GenerationJob.dedup_key == key, GenerationJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    def _as_dict(self, job: GenerationJob) -> Dict:
+        return {
+            "id": job.id, "kind": job.kind, "cluster_id": job.cluster_id, "params": job.params,
+            "status": job.status, "attempts": job.attempts, "result_id": job.result_id, "error": job.error,
+            "created_at": job.created_at, "started_at": job.started_at, "finished_at": job.finished_at,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> JobQueue:
+    """
+    The process-wide queue on the app database.
+    """
+    from app.database import SessionLocal
+    return JobQueue(SessionLocal)
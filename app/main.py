@@ -1,17 +1,39 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import init_db, get_db, SessionLocal
-from app.models import Source, ContentItem, SourceType, TopicCommentary
+from app.database import init_db, get_db, get_read_db, get_async_read_db, SessionLocal
+from app.models import Source, ContentItem, SourceType, TopicCommentary, TopicPackage
 from app.scheduler import start_scheduler
+from app.jobs import get_job_queue
+from app.items import UnknownFields, item_detail, list_items
+from app.schemas import ItemPage
+from app.pagination import InvalidCursor
+from app.events import get_event_bus
+from app.metrics import metrics
+from app.pipeline import recent_runs
+from app.response_cache import ITEMS, PACKAGES, SOURCES, ResponseCacheMiddleware, bump_versions, get_response_cache
 from app.analysis.commentary import ContentEngine
 from app.analysis.clustering import TopicClusterer
+from datetime import datetime, timedelta
 import uvicorn
+import json
 import os
 
 app = FastAPI(title="HansSays Automated Content Generator")
 
+# Read routes answered from the response cache until a stage bumps a scope they read
+app.add_middleware(ResponseCacheMiddleware, routes={
+    "/items": (ITEMS,),
+    "/items/{item_id}": (ITEMS,),
+    "/trending": (ITEMS,),
+    "/sources": (SOURCES,),
+    "/topics/{cluster_id}/package": (PACKAGES,),
+    "/topics/{cluster_id}/angles": (PACKAGES,),
+})
+
 # Mount Static Files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -25,6 +47,11 @@ def startup_event():
     db.close()
     
     start_scheduler()
+    get_job_queue().start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    get_job_queue().stop(timeout=5)
 
 def seed_sources(db: Session):
     from config import RSS_FEEDS
@@ -49,56 +76,52 @@ def seed_sources(db: Session):
             db.add(source)
             
     db.commit()
+    bump_versions(SOURCES)
 
 @app.get("/")
 def read_root():
     return FileResponse("static/index.html")
 
-@app.get("/items")
-def get_items(
+@app.get("/items", response_model=ItemPage, response_model_exclude_unset=True)
+async def get_items(
     q: str = None, 
     country: str = None, 
     source_type: str = None, 
     used: bool = None,
-    sort_by: str = "timestamp", 
+    sort_by: str = None, 
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    fields: str = None,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    query = db.query(ContentItem)
-    
-    if used is not None:
-        query = query.filter(ContentItem.used_for_content == used)
-    
-    if country:
-        query = query.filter(ContentItem.country == country)
-    
-    if source_type:
-        if source_type.lower() == "news":
-            query = query.filter(ContentItem.source_type == SourceType.NEWS)
-        elif source_type.lower() == "reddit":
-            query = query.filter(ContentItem.source_type == SourceType.REDDIT)
-        
-    if q:
-        search = f"%{q}%"
-        query = query.filter((ContentItem.title.ilike(search)) | (ContentItem.summary.ilike(search)))
-    
-    # Sorting
-    if sort_by == "final_score":
-        query = query.order_by(ContentItem.final_score.desc())
-    elif sort_by == "controversy_score":
-        query = query.order_by(ContentItem.controversy_score.desc())
-    else:
-        query = query.order_by(ContentItem.timestamp.desc())
-        
-    items = query.limit(limit).all()
-    return items
+    """
+    One page of items plus `next_cursor`, which continues the same listing
+    when passed back as `cursor` (keyset pagination over (sort key, id)).
+
+    Items carry LIST_FIELDS, with the summary shortened, unless `fields`
+    names what to return (comma separated; the full summary, raw_json and
+    engagement_metrics are only sent when asked for).
+
+    `q` is a full-text search (the last word matches as a prefix, `word*`
+    marks others) and adds a highlighted `snippet` to each item. Searches
+    sort by relevance unless another sort_by is given; otherwise the default
+    is newest first.
+    """
+    try:
+        # The query builders are shared with sync callers; run_sync drives them on the async connection
+        return await db.run_sync(
+            list_items, q=q, country=country, source_type=source_type, used=used, sort_by=sort_by,
+            limit=limit, cursor=cursor, fields=fields
+        )
+    except (UnknownFields, InvalidCursor) as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
 
 @app.get("/items/{item_id}")
-def get_item(item_id: int, db: Session = Depends(get_db)):
-    item = db.query(ContentItem).filter(ContentItem.id == item_id).first()
-    if not item:
+async def get_item(item_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    detail = await db.run_sync(item_detail, item_id)
+    if not detail:
         return {"error": "Item not found"}
-    return item
+    return detail
 
 @app.post("/items/{item_id}/promote")
 def promote_item(item_id: int, db: Session = Depends(get_db)):
@@ -109,65 +132,149 @@ def promote_item(item_id: int, db: Session = Depends(get_db)):
     clusterer = TopicClusterer()
     item.cluster_id = clusterer.categorize(item.title, item.summary)
     db.commit()
+    bump_versions(ITEMS)
     
     return {"cluster_id": item.cluster_id}
 
 @app.get("/trending")
-def get_trending_topics(db: Session = Depends(get_db)):
-    from config import POLITICAL_KEYWORDS
-    results = {}
-    for category, terms in POLITICAL_KEYWORDS.items():
-        filters = []
-        for term in terms:
-            filters.append(ContentItem.title.ilike(f"%{term}%"))
-            filters.append(ContentItem.summary.ilike(f"%{term}%"))
-        
-        from sqlalchemy import or_
-        count = db.query(ContentItem).filter(or_(*filters)).count()
-        results[category] = count
-        
-    return results
-
-@app.post("/topics/{cluster_id}/generate_angles")
-def generate_topic_angles(cluster_id: str, db: Session = Depends(get_db)):
-    engine = ContentEngine()
-    commentary = engine.generate_commentary_angles(db, cluster_id)
-    if not commentary:
-        return {"error": "No items found for this topic"}
-    return commentary
+async def get_trending_topics(
+    hours: int = None,
+    since: datetime = None,
+    until: datetime = None,
+    country: str = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Items per POLITICAL_KEYWORDS category from the hourly rollup, over all
+    history by default, the last `hours`, or [since, until).
+    """
+    from app.analysis.trending import trending_counts
+    if hours is not None:
+        since = datetime.now() - timedelta(hours=hours)
+    return await db.run_sync(trending_counts, since=since, until=until, country=country)
 
-@app.post("/topics/{cluster_id}/generate_full_package")
-def generate_full_package(cluster_id: str, db: Session = Depends(get_db)):
-    engine = ContentEngine()
-    package = engine.generate_full_package(db, cluster_id)
-    if not package:
-        return {"error": "No items found or failed to generate package"}
-    return package
+def _job_response(kind: str, cluster_id: str, **params):
+    job, created = get_job_queue().submit(kind, cluster_id, **params)
+    return {"job_id": job["id"], "status": job["status"], "deduplicated": not created}
+
+@app.post("/topics/{cluster_id}/generate_angles", status_code=202)
+def generate_topic_angles(cluster_id: str, fresh: bool = False):
+    return _job_response("angles", cluster_id, use_cache=not fresh)
+
+@app.post("/topics/{cluster_id}/generate_full_package", status_code=202)
+def generate_full_package(cluster_id: str, fresh: bool = False, parallel: bool = None):
+    return _job_response("package", cluster_id, use_cache=not fresh, parallel=parallel)
+
+@app.post("/topics/{cluster_id}/generate_full_package/stream")
+def stream_full_package(cluster_id: str, fresh: bool = False):
+    """
+    NDJSON stream of generation events (see ContentEngine.stream_full_package).
+    The session is opened here because it has to outlive the request handler.
+    """
+    def events():
+        db = SessionLocal()
+        try:
+            for event in ContentEngine().stream_full_package(db, cluster_id, use_cache=not fresh):
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/topics/{cluster_id}/package/sections/{section}/regenerate", status_code=202)
+def regenerate_package_section(cluster_id: str, section: str):
+    from app.analysis.commentary import PACKAGE_SECTIONS
+    if section not in PACKAGE_SECTIONS:
+        return {"error": f"Unknown section. Choose from: {', '.join(PACKAGE_SECTIONS)}"}
+    return _job_response("section", cluster_id, section=section)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_job_queue().get(job_id, with_result=True)
+    if not job:
+        return {"error": "Job not found"}
+    return job
+
+@app.get("/jobs")
+def get_job_stats():
+    return get_job_queue().stats()
 
 @app.get("/topics/{cluster_id}/package")
-def get_topic_package(cluster_id: str, db: Session = Depends(get_db)):
-    from app.models import TopicPackage
-    package = db.query(TopicPackage).filter(
-        TopicPackage.cluster_id == cluster_id
-    ).order_by(TopicPackage.date.desc()).first()
+async def get_topic_package(cluster_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    package = await db.scalar(
+        select(TopicPackage).where(TopicPackage.cluster_id == cluster_id).order_by(TopicPackage.date.desc()).limit(1)
+    )
     
     if not package:
         return {"error": "No package found for this topic"}
     return package
 
 @app.get("/topics/{cluster_id}/angles")
-def get_topic_angles(cluster_id: str, db: Session = Depends(get_db)):
-    commentary = db.query(TopicCommentary).filter(
-        TopicCommentary.cluster_id == cluster_id
-    ).order_by(TopicCommentary.generated_at.desc()).first()
+async def get_topic_angles(cluster_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    commentary = await db.scalar(
+        select(TopicCommentary).where(TopicCommentary.cluster_id == cluster_id)
+        .order_by(TopicCommentary.generated_at.desc()).limit(1)
+    )
     
     if not commentary:
         return {"error": "No commentary found for this topic"}
     return commentary
 
+@app.get("/events")
+async def stream_events(last_event_id: int = Header(None)):
+    """
+    Server-sent events for the dashboard (kinds and payloads in app.events):
+    new items, score changes, saved packages and angles, finished jobs.
+    EventSource reconnects with Last-Event-ID and gets what it missed, or a
+    `resync` event when that is no longer available.
+    """
+    subscription = get_event_bus().subscribe(last_event_id)
+    return StreamingResponse(
+        subscription.stream(float(os.getenv("EVENTS_KEEPALIVE_SECONDS", 15))),
+        media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/events/stats")
+def get_event_stats():
+    return get_event_bus().stats()
+
 @app.get("/sources")
-def get_sources(db: Session = Depends(get_db)):
-    return db.query(Source).all()
+async def get_sources(db: AsyncSession = Depends(get_async_read_db)):
+    return (await db.scalars(select(Source))).all()
+
+@app.get("/sources/fetch-cache")
+def get_fetch_cache_stats(db: Session = Depends(get_read_db)):
+    from app.ingestion.http_cache import ValidatorStore
+    return ValidatorStore(db).stats()
+
+@app.get("/llm/cache")
+def get_llm_cache_stats():
+    from app.analysis.llm import get_response_cache
+    cache = get_response_cache()
+    if not cache:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Pipeline, ingestion, database and LLM metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/responses/cache")
+def get_response_cache_stats():
+    cache = get_response_cache()
+    if not cache:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/pipeline/runs")
+def get_pipeline_runs(pipeline: str = None, limit: int = 10, db: Session = Depends(get_read_db)):
+    """
+    Latest pipeline runs with each stage's watermark, outputs and status.
+    """
+    return recent_runs(db, pipeline=pipeline, limit=min(limit, 100))
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
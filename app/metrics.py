@@ -0,0 +1,284 @@
+import bisect
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Latency buckets in seconds (Prometheus "le" bounds, +Inf is implicit)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# name -> (type, help). Only declared metrics can be recorded.
+METRICS = {
+    "pipeline_stage_seconds": ("histogram", "Duration of pipeline stages"),
+    "pipeline_stage_failures_total": ("counter", "Pipeline stages that raised"),
+    "db_statements_total": ("counter", "SQL statements sent to the database (round trips), by pipeline stage"),
+    "fetch_seconds": ("histogram", "Feed download time, including waiting for a host slot"),
+    "ingest_step_seconds": ("histogram", "Per-feed ingestion steps: parse, dedup (with scoring) and write"),
+    "source_bytes_fetched_total": ("counter", "Response bytes downloaded per source"),
+    "source_fetch_errors_total": ("counter", "Failed downloads per source"),
+    "source_unchanged_total": ("counter", "Polls answered 304 or with an unchanged body"),
+    "source_entries_parsed_total": ("counter", "Feed entries / posts parsed per source"),
+    "source_ineligible_total": ("counter", "Entries dropped by the eligibility filters"),
+    "source_duplicates_dropped_total": ("counter", "Entries dropped as URL or near duplicates"),
+    "source_items_inserted_total": ("counter", "New items stored per source"),
+    "source_items_updated_total": ("counter", "Existing items refreshed per source"),
+    "sentiment_lookups_total": ("counter", "Sentiment lookups by result (hit: LRU or stored, miss: TextBlob)"),
+    "sentiment_textblob_seconds_total": ("counter", "Time spent in TextBlob sentiment analysis"),
+    "llm_request_seconds": ("histogram", "LLM request latency (until the last token for streams)"),
+    "llm_tokens_total": ("counter", "LLM tokens by kind (prompt, completion) as reported by the API"),
+    "llm_cache_hits_total": ("counter", "LLM requests answered from the response cache"),
+    "llm_errors_total": ("counter", "LLM requests that failed after retries"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_stage = threading.local()
+
+
+class Metrics:
+    """
+    In-process counters and histograms by (name, labels), safe to update
+    from any thread. Exposed in the Prometheus text format at /metrics and
+    diffed into a JSON report per pipeline run (RunReport).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> Tuple[str, Labels]:
+        if name not in METRICS:
+            raise KeyError(f"Undeclared metric: {name}")
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        bucket = bisect.bisect_left(BUCKETS, value)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(BUCKETS) + 2)
+            series[bucket] += 1
+            series[-1] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Flat {series: value}; histograms as their _count and _sum series.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (sum(series[:-1]), series[-1]) for key, series in self._histograms.items()}
+        flat = {_series(name, labels): value for (name, labels), value in counters.items()}
+        for (name, labels), (count, total) in histograms.items():
+            flat[_series(name + "_count", labels)] = count
+            flat[_series(name + "_sum", labels)] = total
+        return flat
+
+    def prometheus(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+        out = io.StringIO()
+        for name, (kind, description) in METRICS.items():
+            out.write(f"# HELP {name} {description}\n# TYPE {name} {kind}\n")
+            if kind == "counter":
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        out.write(f"{_series(name, labels)} {value:g}\n")
+                continue
+            for (series_name, labels), series in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    out.write(f"{_series(name + '_bucket', labels + (('le', str(bound)),))} {cumulative:g}\n")
+                out.write(f"{_series(name + '_count', labels)} {cumulative:g}\n")
+                out.write(f"{_series(name + '_sum', labels)} {series[-1]:g}\n")
+        return out.getvalue()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _series(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return name + "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+metrics = Metrics()
+
+
+def current_stage() -> str:
+    return getattr(_stage, "name", None) or "none"
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times a pipeline stage into pipeline_stage_seconds and the active run
+    report. SQL statements issued on this thread meanwhile are counted
+    under the stage (see instrument_engine).
+    """
+    outer = getattr(_stage, "name", None)
+    _stage.name = name
+    started, started_at = time.perf_counter(), datetime.now()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        metrics.inc("pipeline_stage_failures_total", stage=name)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _stage.name = outer
+        metrics.observe("pipeline_stage_seconds", seconds, stage=name)
+        report = RunReport.active
+        if report is not None and report.thread_id == threading.get_ident():
+            report.stages.append({
+                "stage": name, "started_at": started_at.isoformat(timespec="seconds"), "seconds": round(seconds, 3),
+                "status": "failed" if error else "ok", **({"error": str(error)} if error else {}),
+            })
+
+
+def instrument_engine(engine):
+    """
+    Counts the statements `engine` sends (executemany counts once) in
+    db_statements_total by the current stage.
+    """
+    from sqlalchemy import event
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        metrics.inc("db_statements_total", stage=current_stage())
+
+    event.listen(engine, "before_cursor_execute", count)
+
+
+class RunReport:
+    """
+    JSON report of one pipeline run: its stages and the change in every
+    metric over the run, written to RUN_REPORT_DIR/<run>-<timestamp>.json.
+    Metrics are process-wide, so work done concurrently outside the run
+    (API requests) shows up under stage "none".
+
+    `profile` captures the run with "cprofile" (the top functions go in the
+    report, the full stats next to it as .prof) or "pyinstrument" (.html,
+    if installed). Only the calling thread is profiled.
+    """
+    active: Optional["RunReport"] = None
+    TOP_FUNCTIONS = 30
+
+    def __init__(self, run: str, profile: Optional[str] = None, report_dir: Optional[str] = None):
+        if profile not in (None, "cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.run = run
+        self.profile = profile
+        self.report_dir = report_dir or os.getenv("RUN_REPORT_DIR") or os.path.join(BASE_DIR, "run_reports")
+        self.stages: List[Dict] = []
+        self.path: Optional[str] = None
+        self.data: Dict = {}
+        self.thread_id = threading.get_ident()  # Stages on other threads belong to other work
+
+    def __enter__(self):
+        self._before = metrics.snapshot()
+        self._started, self._started_at = time.perf_counter(), datetime.now()
+        self._profiler = self._start_profiler()
+        RunReport.active = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        RunReport.active = None
+        seconds = time.perf_counter() - self._started
+        after = metrics.snapshot()
+        failed = exc is not None or any(entry["status"] == "failed" for entry in self.stages)
+        self.data = {
+            "run": self.run, "status": "failed" if failed else "ok",
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"), "seconds": round(seconds, 3),
+            "stages": self.stages,
+            "metrics": {
+                series: round(value - self._before.get(series, 0), 6) for series, value in sorted(after.items())
+                if value != self._before.get(series, 0)
+            },
+        }
+        if exc is not None:
+            self.data["error"] = str(exc)
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            stem = os.path.join(self.report_dir, f"{self.run}-{self._started_at:%Y%m%d-%H%M%S}")
+            if self._profiler is not None:
+                self.data["profile"] = self._stop_profiler(stem)
+            self.path = stem + ".json"
+            with open(self.path, "w") as f:
+                json.dump(self.data, f, indent=2)
+            print(f"Run report written to {self.path}")
+        except Exception as e:
+            print(f"Run report error: {e}")
+        return False
+
+    def _start_profiler(self):
+        if self.profile == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument is not installed, running without a profile")
+                return None
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profiler(self, stem: str) -> Dict:
+        if self.profile == "pyinstrument":
+            self._profiler.stop()
+            with open(stem + ".html", "w") as f:
+                f.write(self._profiler.output_html())
+            return {"profiler": "pyinstrument", "path": stem + ".html"}
+
+        import pstats
+        self._profiler.disable()
+        self._profiler.dump_stats(stem + ".prof")
+        stats = pstats.Stats(self._profiler)
+        top = sorted(stats.stats.items(), key=lambda entry: entry[1][3], reverse=True)[:self.TOP_FUNCTIONS]
+        return {
+            "profiler": "cprofile", "path": stem + ".prof",
+            "top_cumulative": [
+                {
+                    "function": f"{os.path.relpath(filename, BASE_DIR) if filename.startswith(BASE_DIR) else filename}"
+                                f":{line}({function})",
+                    "calls": calls, "own_seconds": round(own, 4), "cumulative_seconds": round(cumulative, 4),
+                }
+                for (filename, line, function), (_, calls, own, cumulative, _) in top
+            ],
+        }
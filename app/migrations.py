@@ -0,0 +1,102 @@
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection
+from app.models import ContentItem
+from app.payloads import store_payloads
+
+# Applied versions, kept apart from Base so create_all never touches it.
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime),
+)
+
+
+def columns(conn: Connection, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str):
+    """
+    ALTER TABLE ... ADD COLUMN unless the column already exists (create_all
+    has already built the current schema on a new database).
+    """
+    if column not in columns(conn, table):
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _content_item_indexes(conn: Connection):
+    for index in ContentItem.__table__.indexes:
+        index.create(conn, checkfirst=True)
+    # Superseded by the (cluster_id, final_score) index
+    conn.execute(text("DROP INDEX IF EXISTS ix_content_items_cluster_id"))
+
+
+def _raw_payloads(conn: Connection, batch_size: int = 1000):
+    add_column(conn, "content_items", "raw_hash", "VARCHAR(32)")
+    if "raw_json" not in columns(conn, "content_items"):
+        return
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, raw_json FROM content_items WHERE id > :last_id AND raw_json IS NOT NULL ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).all()
+        if not rows:
+            break
+        hashes = store_payloads(conn, [raw_json for _, raw_json in rows])
+        conn.execute(text("UPDATE content_items SET raw_hash = :raw_hash WHERE id = :id"), [
+            {"id": item_id, "raw_hash": raw_hash} for (item_id, _), raw_hash in zip(rows, hashes)
+        ])
+        last_id = rows[-1][0]
+    # Frees the pages in place; SQLite files only shrink after a VACUUM.
+    if conn.dialect.name == "sqlite" and sqlite3.sqlite_version_info < (3, 35, 0):
+        # No DROP COLUMN before SQLite 3.35. The column is no longer mapped, so
+        # emptying it frees the same pages without rebuilding the table.
+        conn.execute(text("UPDATE content_items SET raw_json = NULL WHERE raw_json IS NOT NULL"))
+        return
+    conn.exec_driver_sql("ALTER TABLE content_items DROP COLUMN raw_json")
+
+
+def _feed_validator_snapshot(conn: Connection):
+    add_column(conn, "feed_validators", "snapshot", "JSON")
+
+
+def _stage_run_finished_watermark(conn: Connection):
+    add_column(conn, "pipeline_stage_runs", "finished_watermark", "JSON")
+
+
+# (version, name, migration). Append only; each runs once per database, in
+# order, inside its own transaction, after create_all. Migrations must also
+# be harmless on a database that create_all has just built.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "content_items query indexes", _content_item_indexes),
+    (2, "raw_json to compressed raw_payloads", _raw_payloads),
+    (3, "feed_validators.snapshot", _feed_validator_snapshot),
+    (4, "pipeline_stage_runs.finished_watermark", _stage_run_finished_watermark),
+]
+
+
+def run_migrations(engine) -> List[int]:
+    """
+    Applies the migrations this database has not seen yet. Returns their versions.
+    """
+    _metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        applied = {version for (version,) in conn.execute(schema_migrations.select().with_only_columns(
+            schema_migrations.c.version
+        ))}
+
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.now()))
+        print(f"Applied migration {version}: {name}")
+        ran.append(version)
+    return ran
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Float, JSON, Index, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import enum
@@ -19,8 +19,39 @@ class Source(Base):
     country = Column(String)
     is_active = Column(Integer, default=1)
 
+class FeedValidator(Base):
+    """
+    HTTP cache validators for a polled feed URL (conditional GET support).
+    """
+    __tablename__ = "feed_validators"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True)  # Feed URL, optionally namespaced
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    body_hash = Column(String, nullable=True)  # sha256 of the last processed body
+    hits = Column(Integer, default=0)  # Polls skipped (304 or identical body)
+    misses = Column(Integer, default=0)  # Polls that had to be parsed
+    last_checked_at = Column(DateTime, nullable=True)
+    snapshot = Column(JSON, nullable=True)  # What the caller extracted from that body (pull_feeds.py articles)
+
 class ContentItem(Base):
     __tablename__ = "content_items"
+    # One index per hot access path: the 24h window (ranker, near-duplicate
+    # index), top-N by score (pipeline, commentary, inspection scripts), the
+    # enrichment backlog, a cluster's best items, and the /items filters,
+    # which sort newest first by default. Existing databases get these from
+    # app.migrations.
+    __table_args__ = (
+        Index("ix_content_items_timestamp", "timestamp"),
+        Index("ix_content_items_final_score", "final_score"),
+        Index("ix_content_items_controversy_score", "controversy_score"),
+        Index("ix_content_items_enrichment", "enrichment_status", "timestamp"),
+        Index("ix_content_items_cluster_score", "cluster_id", "final_score"),
+        Index("ix_content_items_country", "country", "timestamp"),
+        Index("ix_content_items_source_type", "source_type", "timestamp"),
+        Index("ix_content_items_used", "used_for_content", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, unique=True, index=True)  # Link for RSS, ID for Reddit
@@ -39,14 +70,106 @@ class ContentItem(Base):
     controversy_score = Column(Float, default=0.0)
     controversy_reason = Column(Text, nullable=True) # Reason for the controversy score
     final_score = Column(Float, default=0.0)
-    cluster_id = Column(String, index=True, nullable=True)
+    cluster_id = Column(String, nullable=True)
     used_for_content = Column(Boolean, default=False)
     
     # Metadata
     is_unavailable = Column(Boolean, default=False)
     enrichment_status = Column(String, default="original") # 'original', 'generated', 'failed'
     ingested_at = Column(DateTime, server_default=func.now())
-    raw_json = Column(Text)  # Original payload
+    raw_hash = Column(String(32), nullable=True)  # RawPayload holding the original payload (app.payloads)
+
+class RawPayload(Base):
+    """
+    Original source payload of ContentItems (the serialized feed entry),
+    compressed and keyed by a hash of the uncompressed text, so identical
+    payloads are stored once. Kept out of content_items because only the
+    item detail view reads it.
+    """
+    __tablename__ = "raw_payloads"
+
+    payload_hash = Column(String(32), primary_key=True)  # blake2b-128 hex of the uncompressed text
+    codec = Column(String(8))
+    size = Column(Integer)  # Uncompressed bytes
+    data = Column(LargeBinary)
+
+class TitleSignature(Base):
+    """
+    MinHash LSH band keys of a ContentItem title, used for near-duplicate lookups.
+    """
+    __tablename__ = "title_signatures"
+
+    item_id = Column(Integer, ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True)
+    timestamp = Column(DateTime, index=True)  # Copy of ContentItem.timestamp for window scans
+    band_keys = Column(JSON)  # One 64-bit key per LSH band
+
+class SentimentResult(Base):
+    """
+    TextBlob sentiment of a piece of text, keyed by a hash of the exact text.
+    """
+    __tablename__ = "sentiment_cache"
+
+    text_hash = Column(String(32), primary_key=True)  # blake2b-128 hex of the analyzed text
+    polarity = Column(Float)
+    subjectivity = Column(Float)
+    created_at = Column(DateTime, server_default=func.now())
+
+class RankedItem(Base):
+    """
+    Inputs ContentRanker last scored an item with, for incremental ranking.
+    Holds exactly the items of the current ranking window.
+    """
+    __tablename__ = "ranked_items"
+
+    item_id = Column(Integer, ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True)
+    fingerprint = Column(String, index=True)  # Coverage fingerprint of the title
+    source_name = Column(String)
+    timestamp = Column(DateTime, index=True)
+    ups = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+
+class RankingQueue(Base):
+    """
+    Items whose ranking inputs changed since they were last scored.
+    """
+    __tablename__ = "ranking_queue"
+
+    item_id = Column(Integer, ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True)
+
+class RankingState(Base):
+    """
+    Small key/value store for the incremental ranker (window, maxima, last seen id).
+    """
+    __tablename__ = "ranking_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(JSON)
+
+class LLMResponse(Base):
+    """
+    Cached chat completion content, keyed by a hash of the full request.
+    """
+    __tablename__ = "llm_responses"
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 of model, messages, response_format
+    model = Column(String)
+    content = Column(Text)
+    latency_ms = Column(Float)  # How long the original request took
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, index=True)
+    last_used_at = Column(DateTime, index=True)
+
+class TrendingCount(Base):
+    """
+    Items per political keyword category, country and hour (by item timestamp),
+    counted at ingestion so /trending doesn't scan content_items.
+    """
+    __tablename__ = "trending_counts"
+
+    category = Column(String, primary_key=True)  # POLITICAL_KEYWORDS key
+    country = Column(String, primary_key=True)  # "" when the source has none
+    hour = Column(DateTime, primary_key=True, index=True)  # Start of the hour bucket
+    count = Column(Integer, default=0)
 
 class TopicCommentary(Base):
     __tablename__ = "topic_commentaries"
@@ -127,3 +250,71 @@ class TopicPackage(Base):
     notes = Column(Text)
     today_queue_position = Column(Integer)
     next_action = Column(String, default="wait")
+
+class GenerationJob(Base):
+    """
+    Queued LLM generation work (angles, packages, single sections), see app/jobs.py.
+    At most one queued or running job exists per dedup_key.
+    """
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index(
+            "ux_generation_jobs_active", "dedup_key", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String, index=True)  # angles | package | section
+    cluster_id = Column(String, index=True)
+    params = Column(JSON)
+    dedup_key = Column(String(64))
+    status = Column(String, default="queued", index=True)  # queued | running | done | failed
+    attempts = Column(Integer, default=0)
+    result_id = Column(Integer, nullable=True)  # TopicCommentary.id or TopicPackage.id
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class PipelineRun(Base):
+    """
+    One run of a staged pipeline (app/pipeline.py). A run that failed or was
+    interrupted is resumed by the next invocation: stages it already
+    finished are skipped.
+    """
+    __tablename__ = "pipeline_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pipeline = Column(String, index=True)  # daily_pipeline | ingestion_cycle
+    stages = Column(JSON)  # Stage names the run covers, in order
+    status = Column(String, default="running", index=True)  # running | done | failed
+    attempts = Column(Integer, default=1)  # Invocations, counting resumes
+    report_path = Column(String, nullable=True)  # RunReport JSON of the last invocation
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class PipelineStageRun(Base):
+    """
+    Ledger entry for one stage of a PipelineRun: the watermark of its inputs
+    when it started and what it produced. Outputs are checkpointed while a
+    stage runs, so a resumed stage can skip the work it already committed.
+    """
+    __tablename__ = "pipeline_stage_runs"
+    __table_args__ = (
+        Index("ux_pipeline_stage_runs_run_stage", "run_id", "stage", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("pipeline_runs.id", ondelete="CASCADE"))
+    stage = Column(String, index=True)
+    status = Column(String, default="running")  # running | done | failed
+    attempts = Column(Integer, default=0)
+    watermark = Column(JSON)  # e.g. {"max_item_id": 5120, "queued": 37}
+    finished_watermark = Column(JSON, nullable=True)  # The same once the stage was done; a resume compares it
+    outputs = Column(JSON)  # e.g. {"top_clusters": [...]}; read by later stages
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: Any, item_id: int) -> str:
+    if isinstance(key, datetime):
+        key = {"dt": key.isoformat()}
+    raw = json.dumps([sort, key, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """
+    (sort key, id) of the last item of the previous page. Raises InvalidCursor
+    for malformed cursors and cursors issued for another sort order.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, item_id = json.loads(raw)
+        if isinstance(key, dict):
+            key = datetime.fromisoformat(key["dt"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor(f"Cursor was issued for sort_by={cursor_sort}")
+    if not isinstance(item_id, int):
+        raise InvalidCursor("Malformed cursor")
+    return key, item_id
+
+
+def keyset(query: Query, key, id_column, descending: bool, after: Optional[Tuple[Any, int]] = None) -> Query:
+    """
+    Orders `query` by (key, id) and, given the (key, id) of the last row of
+    the previous page, starts right after it. The row-value comparison is an
+    index range on (…, key) indexes (the id tiebreak is the implicit rowid),
+    so a deep page costs the same as the first one.
+
+    Rows whose key is NULL sort last and are not reachable through a cursor;
+    the scores and timestamps /items sorts on are always set on ingest.
+    """
+    if after is not None:
+        position = tuple_(key, id_column)
+        query = query.filter(position < after if descending else position > after)
+    if descending:
+        return query.order_by(key.desc(), id_column.desc())
+    return query.order_by(key, id_column)
@@ -0,0 +1,74 @@
+import hashlib
+import zlib
+from typing import Iterable, List, Optional
+from sqlalchemy import insert as generic_insert
+from app.models import RawPayload
+
+CODEC = "zlib"
+LEVEL = 6
+
+
+def payload_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), LEVEL)
+
+
+def decompress(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    if data is None:
+        return None
+    if codec != "zlib":
+        raise ValueError(f"Unknown payload codec: {codec}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _dialect(executor) -> str:
+    # Works with both a Session and a Connection (migrations)
+    bind = executor.get_bind() if hasattr(executor, "get_bind") else executor
+    return bind.dialect.name
+
+
+def store_payloads(executor, texts: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    Writes each distinct payload once, compressed, in the caller's transaction.
+    Returns the hash of each text in order (None for None), for ContentItem.raw_hash.
+    """
+    texts = list(texts)
+    hashes = [payload_hash(text) if text is not None else None for text in texts]
+    rows = {
+        digest: {"payload_hash": digest, "codec": CODEC, "size": len(text.encode("utf-8")), "data": compress(text)}
+        for digest, text in zip(hashes, texts) if digest is not None
+    }
+    if not rows:
+        return hashes
+
+    dialect = _dialect(executor)
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(RawPayload).on_conflict_do_nothing(index_elements=[RawPayload.payload_hash])
+        executor.execute(stmt, list(rows.values()))
+    else:
+        stored = {digest for (digest,) in executor.execute(
+            RawPayload.__table__.select().with_only_columns(RawPayload.payload_hash).where(
+                RawPayload.payload_hash.in_(list(rows))
+            )
+        )}
+        new_rows = [row for digest, row in rows.items() if digest not in stored]
+        if new_rows:
+            executor.execute(generic_insert(RawPayload), new_rows)
+    return hashes
+
+
+def load_payload(db, raw_hash: Optional[str]) -> Optional[str]:
+    """
+    The original payload of an item, or None if it has none.
+    """
+    if not raw_hash:
+        return None
+    row = db.query(RawPayload.codec, RawPayload.data).filter(RawPayload.payload_hash == raw_hash).first()
+    return decompress(*row) if row else None
@@ -0,0 +1,339 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.metrics import RunReport, stage
+from app.models import ContentItem, PipelineRun, PipelineStageRun, RankingQueue, Source
+from app.response_cache import ITEMS, bump_versions
+
+RESUMABLE_STATUSES = ("running", "failed")
+
+
+class StageContext:
+    """
+    Handed to a stage while it runs: the outputs of earlier stages and the
+    outputs this stage checkpointed on a previous attempt.
+    """
+    def __init__(self, runner: "PipelineRunner", db: Session, run_id: int, stage_run_id: Optional[int] = None):
+        self.runner = runner
+        self.db = db
+        self.run_id = run_id
+        self.stage_run_id = stage_run_id
+        self.outputs: Dict = {}
+
+    def inputs(self, stage_name: str) -> Dict:
+        """
+        Outputs of `stage_name` from this run, or from the last run that
+        finished it when this run didn't (a stage run on its own).
+        """
+        row = self.db.query(PipelineStageRun).filter(
+            PipelineStageRun.run_id == self.run_id, PipelineStageRun.stage == stage_name,
+            PipelineStageRun.status == "done"
+        ).first()
+        if row is None:
+            row = self.db.query(PipelineStageRun).join(PipelineRun).filter(
+                PipelineRun.pipeline == self.runner.pipeline, PipelineStageRun.stage == stage_name,
+                PipelineStageRun.status == "done"
+            ).order_by(PipelineStageRun.finished_at.desc()).first()
+        return dict(row.outputs or {}) if row else {}
+
+    def checkpoint(self, **outputs):
+        """
+        Records partial outputs. Call right after committing the work they
+        describe, so a resumed attempt doesn't redo it.
+        """
+        self.outputs.update(outputs)
+        row = self.db.get(PipelineStageRun, self.stage_run_id)
+        row.outputs = dict(self.outputs)
+        self.db.commit()
+
+
+def _items_watermark(db: Session) -> Dict:
+    max_id, count = db.query(func.max(ContentItem.id), func.count(ContentItem.id)).one()
+    return {"max_item_id": max_id or 0, "items": count}
+
+
+def _ingest(db: Session, ctx: StageContext) -> Dict:
+    from app.ingestion.rss import fetch_rss_feeds
+    from app.ingestion.reddit import fetch_reddit_content
+    from app.ingestion.fetcher import prefetch_sources
+    from app.ingestion.http_cache import ValidatorStore
+
+    # One resumable unit: the downloads only live in memory. Each feed commits
+    # with its validators, so a retry gets 304s for the feeds already stored.
+    validators = ValidatorStore(db)
+    with stage("fetch"):
+        fetched = prefetch_sources(db, validators)
+    with stage("ingest_rss"):
+        rss_report = fetch_rss_feeds(db, fetched, validators)
+    with stage("ingest_reddit"):
+        reddit_report = fetch_reddit_content(db, fetched, validators)
+
+    totals = {"sources": len(fetched), "inserted": 0, "updated": 0}
+    for stats in list(rss_report.values()) + list(reddit_report.values()):
+        totals["inserted"] += stats.get("inserted", 0)
+        totals["updated"] += stats.get("updated", 0)
+    return totals
+
+
+def _ingest_watermark(db: Session, ctx: StageContext) -> Dict:
+    return {**_items_watermark(db), "active_sources": db.query(Source).filter(Source.is_active == 1).count()}
+
+
+def _rank(db: Session, ctx: StageContext) -> Dict:
+    from app.analysis.ranker import ContentRanker
+    print("Scoring and ranking controversy/engagement...")
+    return {"rescored": ContentRanker(db).calculate_final_scores(incremental=True)}
+
+
+def _rank_watermark(db: Session, ctx: StageContext) -> Dict:
+    return {**_items_watermark(db), "queued": db.query(RankingQueue).count()}
+
+
+def _enrich(db: Session, ctx: StageContext) -> Dict:
+    from app.analysis.enrichment import EnrichmentService
+    print("Enriching items (Paywall & Summary pass)...")
+    return {"enriched": EnrichmentService().enrich_batch(db)}
+
+
+def _enrich_watermark(db: Session, ctx: StageContext) -> Dict:
+    original = db.query(ContentItem).filter(ContentItem.enrichment_status == "original").count()
+    return {**_items_watermark(db), "original": original}
+
+
+def _cluster(db: Session, ctx: StageContext) -> Dict:
+    from app.analysis.clustering import TopicClusterer
+    print("Clustering and selecting top topics...")
+    clusterer = TopicClusterer()
+    # Fetch top items for clustering
+    items = db.query(
+        ContentItem.id, ContentItem.title, ContentItem.summary, ContentItem.cluster_id, ContentItem.final_score
+    ).order_by(ContentItem.final_score.desc()).limit(100).all()
+    assignments = clusterer.assign_clusters(db, items)
+    db.commit()
+    bump_versions(ITEMS)
+
+    top_clusters = clusterer.select_top_clusters(items, n=2, assignments=assignments)
+    print(f"Selected topics: {', '.join(top_clusters)}")
+    return {"clustered": len(assignments), "top_clusters": top_clusters}
+
+
+def _cluster_watermark(db: Session, ctx: StageContext) -> Dict:
+    max_score = db.query(func.max(ContentItem.final_score)).scalar()
+    return {**_items_watermark(db), "max_final_score": max_score}
+
+
+def _generate(db: Session, ctx: StageContext) -> Dict:
+    from app.analysis.commentary import ContentEngine
+    print("Generating output packages...")
+    engine = ContentEngine()
+    # cluster_id -> package id, including packages saved by a failed attempt
+    packages = dict(ctx.outputs.get("packages") or {})
+    failed = []
+    for cluster_id in ctx.inputs("cluster").get("top_clusters", []):
+        if cluster_id in packages:
+            print(f"  - Package for {cluster_id} already generated ({packages[cluster_id]})")
+            continue
+        print(f"  - Generating package for: {cluster_id}")
+        package = engine.generate_full_package(db, cluster_id)
+        if package:
+            print(f"    SUCCESS: Package created for {cluster_id}")
+            packages[cluster_id] = package.id
+            ctx.checkpoint(packages=packages)
+        else:
+            print(f"    FAILED: Could not create package for {cluster_id}")
+            failed.append(cluster_id)
+    if failed:
+        # Fails the stage so the next run retries just these clusters
+        raise RuntimeError(f"No package generated for {', '.join(failed)}")
+    return {"packages": packages}
+
+
+def _generate_watermark(db: Session, ctx: StageContext) -> Dict:
+    return {"top_clusters": ctx.inputs("cluster").get("top_clusters", [])}
+
+
+# (name, run(db, ctx) -> outputs, watermark(db, ctx) -> inputs' state), in order.
+# A stage commits its own work; its outputs are stored once it returns.
+DAILY_STAGES: List[Tuple[str, Callable, Callable]] = [
+    ("ingest", _ingest, _ingest_watermark),
+    ("rank", _rank, _rank_watermark),
+    ("enrich", _enrich, _enrich_watermark),
+    ("cluster", _cluster, _cluster_watermark),
+    ("generate", _generate, _generate_watermark),
+]
+INGESTION_STAGES = DAILY_STAGES[:3]
+
+
+class PipelineRunner:
+    """
+    Runs `stages` as a run recorded in pipeline_runs / pipeline_stage_runs.
+
+    With resume (the default), an invocation continues the pipeline's
+    latest run if that failed or never finished and started less than
+    `resume_max_hours` (PIPELINE_RESUME_MAX_HOURS) ago. Its done stages are
+    skipped unless their inputs' watermark moved since they finished, and
+    the failed one starts again from its checkpointed outputs (from scratch
+    if its own watermark moved).
+    `only` runs just the named stages, even if done, inside that run when
+    it covers them (its other unfinished stages stay pending) or else as a
+    run of their own. Runs of one pipeline should not overlap; a run still
+    marked running is taken to be interrupted.
+    """
+    def __init__(self, session_factory, pipeline: str, stages: Optional[List[Tuple[str, Callable, Callable]]] = None,
+                 resume_max_hours: Optional[float] = None):
+        self.session_factory = session_factory
+        self.pipeline = pipeline
+        self.stages = stages or DAILY_STAGES
+        self.resume_max_hours = resume_max_hours or float(os.getenv("PIPELINE_RESUME_MAX_HOURS", 12))
+
+    def run(self, only: Optional[List[str]] = None, resume: bool = True, profile: Optional[str] = None) -> Dict:
+        """
+        Runs the pipeline and returns the run (see as_dict). A failing stage
+        is recorded and its exception re-raised.
+        """
+        names = [name for name, _, _ in self.stages]
+        unknown = set(only or []) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        db = self.session_factory()
+        report = RunReport(self.pipeline, profile=profile)
+        try:
+            run = self._open_run(db, [name for name in names if not only or name in only], only, resume)
+            run_id = run.id
+            try:
+                with report:
+                    self._run_stages(db, run_id, set(only or []))
+            finally:
+                db.rollback()
+                run = db.get(PipelineRun, run_id)
+                run.report_path = report.path
+                db.commit()
+            return as_dict(db, run)
+        finally:
+            db.close()
+
+    def _open_run(self, db: Session, scope: List[str], only: Optional[List[str]], resume: bool) -> PipelineRun:
+        latest = db.query(PipelineRun).filter(
+            PipelineRun.pipeline == self.pipeline
+        ).order_by(PipelineRun.id.desc()).first() if resume else None
+        if latest and latest.status in RESUMABLE_STATUSES and set(scope) <= set(latest.stages or []) \
+                and latest.started_at < datetime.now() - timedelta(hours=self.resume_max_hours):
+            print(f"Not resuming run {latest.id}: it started over {self.resume_max_hours:g}h ago")
+            latest = None
+        if latest and latest.status in RESUMABLE_STATUSES and set(scope) <= set(latest.stages or []):
+            print(f"Resuming {self.pipeline} run {latest.id} ({latest.status}, attempt {latest.attempts + 1})")
+            latest.status, latest.error, latest.finished_at = "running", None, None
+            latest.attempts = (latest.attempts or 0) + 1
+            db.commit()
+            return latest
+
+        run = PipelineRun(pipeline=self.pipeline, stages=scope, status="running", attempts=1, started_at=datetime.now())
+        db.add(run)
+        db.commit()
+        return run
+
+    def _run_stages(self, db: Session, run_id: int, forced: set):
+        run = db.get(PipelineRun, run_id)
+        rows = {row.stage: row for row in db.query(PipelineStageRun).filter(PipelineStageRun.run_id == run_id)}
+        done = {name for name, row in rows.items() if row.status == "done"}
+        for name, run_stage, watermark in self.stages:
+            if name not in run.stages or (forced and name not in forced):
+                continue
+            restart = name in done
+            if name in done and name not in forced:
+                current = _normalized(watermark(db, StageContext(self, db, run_id, rows[name].id)))
+                if current == rows[name].finished_watermark:
+                    print(f"Skipping {name}: done in run {run_id}")
+                    if RunReport.active is not None:
+                        RunReport.active.stages.append({"stage": name, "status": "skipped"})
+                    continue
+                print(f"Rerunning {name}: its inputs changed since run {run_id} finished it")
+            elif name in rows and rows[name].watermark != _normalized(
+                watermark(db, StageContext(self, db, run_id, rows[name].id))
+            ):
+                # Checkpoints describe work done on other inputs
+                restart = True
+            self._run_stage(db, run_id, name, run_stage, watermark, restart=restart)
+            done.add(name)
+            run = db.get(PipelineRun, run_id)
+
+        remaining = [name for name in run.stages if name not in done]
+        if remaining:
+            # Left out by `only`; the next invocation resumes them
+            run.status, run.error = "failed", f"Not done: {', '.join(remaining)}"
+        else:
+            run.status = "done"
+        run.finished_at = datetime.now()
+        db.commit()
+
+    def _run_stage(self, db: Session, run_id: int, name: str, run_stage: Callable, watermark: Callable, restart: bool):
+        row = db.query(PipelineStageRun).filter(
+            PipelineStageRun.run_id == run_id, PipelineStageRun.stage == name
+        ).first()
+        if row is None:
+            row = PipelineStageRun(run_id=run_id, stage=name, attempts=0, outputs={})
+            db.add(row)
+            db.flush()
+        ctx = StageContext(self, db, run_id, row.id)
+        # A rerun of a finished stage starts over; a failed one resumes
+        ctx.outputs = {} if restart else dict(row.outputs or {})
+        row.status, row.error, row.finished_at = "running", None, None
+        row.attempts = (row.attempts or 0) + 1
+        row.started_at = datetime.now()
+        row.outputs = dict(ctx.outputs)
+        row.watermark = _normalized(watermark(db, ctx))
+        db.commit()
+
+        try:
+            with stage(name):
+                outputs = run_stage(db, ctx) or {}
+        except Exception as e:
+            print(f"Stage {name} of run {run_id} failed: {e}")
+            db.rollback()
+            row = db.get(PipelineStageRun, ctx.stage_run_id)
+            row.status, row.error, row.finished_at = "failed", str(e), datetime.now()
+            run = db.get(PipelineRun, run_id)
+            run.status, run.error, run.finished_at = "failed", f"{name}: {e}", datetime.now()
+            db.commit()
+            raise
+
+        row = db.get(PipelineStageRun, ctx.stage_run_id)
+        row.status, row.finished_at = "done", datetime.now()
+        row.outputs = {**ctx.outputs, **outputs}
+        row.finished_watermark = _normalized(watermark(db, ctx))
+        db.commit()
+
+
+def _normalized(watermark: Dict) -> Dict:
+    # As it reads back from the JSON column
+    return json.loads(json.dumps(watermark, default=str))
+
+
+def as_dict(db: Session, run: PipelineRun) -> Dict:
+    rows = {
+        row.stage: row for row in db.query(PipelineStageRun).filter(PipelineStageRun.run_id == run.id)
+    }
+    return {
+        "id": run.id, "pipeline": run.pipeline, "status": run.status, "attempts": run.attempts,
+        "error": run.error, "report_path": run.report_path, "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "stages": [
+            {
+                "stage": name, "status": rows[name].status, "attempts": rows[name].attempts,
+                "watermark": rows[name].watermark, "outputs": rows[name].outputs, "error": rows[name].error,
+                "started_at": rows[name].started_at, "finished_at": rows[name].finished_at,
+            } if name in rows else {"stage": name, "status": "pending"}
+            for name in run.stages or []
+        ],
+    }
+
+
+def recent_runs(db: Session, pipeline: Optional[str] = None, limit: int = 10) -> List[Dict]:
+    query = db.query(PipelineRun)
+    if pipeline:
+        query = query.filter(PipelineRun.pipeline == pipeline)
+    return [as_dict(db, run) for run in query.order_by(PipelineRun.id.desc()).limit(limit)]
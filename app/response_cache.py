@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from starlette.datastructures import Headers
+from starlette.routing import compile_path
+
+# Version scopes. A stage that commits changes to what a scope covers bumps
+# it; cached responses depending on that scope are then never served again.
+ITEMS = "items"          # content_items and the trending rollup
+SOURCES = "sources"
+PACKAGES = "packages"    # topic packages and commentary
+
+# Response headers not stored with an entry: the middleware sets these itself
+# on every replay, and cookies are never shared between clients.
+_UNSTORED_HEADERS = {b"content-length", b"etag", b"cache-control", b"x-cache", b"set-cookie"}
+
+
+def _replayable(headers: Iterable[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    return [(name, value) for name, value in headers if name.lower() not in _UNSTORED_HEADERS]
+
+
+class MemoryBackend:
+    """
+    Bounded LRU of entries with a TTL, plus the version counters, in this
+    process. Only bumps made in this process (scheduler, job workers, API
+    writes) are seen; the TTL bounds staleness from other processes.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, scopes: Iterable[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(scope, 0) for scope in scopes]
+
+    def bump(self, scope: str):
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Entries and counters in a Redis-compatible server (RESPONSE_CACHE_URL),
+    shared by every API worker and by the pipeline script, so a bump from
+    any process invalidates everywhere. Eviction is the server's maxmemory
+    policy; entries also expire after the TTL.
+    """
+    PREFIX = "response-cache:"
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.PREFIX + key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self.client.set(self.PREFIX + key, value, ex=ttl)
+
+    def versions(self, scopes: Iterable[str]) -> List[int]:
+        return [int(value or 0) for value in self.client.mget([f"{self.PREFIX}version:{scope}" for scope in scopes])]
+
+    def bump(self, scope: str):
+        self.client.incr(f"{self.PREFIX}version:{scope}")
+
+    def size(self) -> int:
+        # SCAN in batches rather than KEYS, which blocks the server
+        versions = (self.PREFIX + "version:").encode()
+        return sum(
+            1 for key in self.client.scan_iter(match=self.PREFIX + "*", count=1000) if not key.startswith(versions)
+        )
+
+
+class ResponseCache:
+    """
+    Cached GET responses (body and headers) keyed by path, normalized query
+    string and the current versions of the scopes the route reads. Each entry
+    carries an ETag (hash of the body) so browsers revalidate with
+    If-None-Match and get a 304. A failing backend never fails the request.
+    """
+    def __init__(self, backend, ttl_seconds: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl_seconds or int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 3600))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def key(self, path: str, query_string: bytes, scopes: Tuple[str, ...]) -> Optional[str]:
+        try:
+            versions = self.backend.versions(scopes)
+        except Exception as e:
+            print(f"Response cache version read error: {e}")
+            return None
+        query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        tag = ",".join(f"{scope}={version}" for scope, version in zip(scopes, versions))
+        return f"{path}?{query}#{tag}"
+
+    def get(self, key: str) -> Optional[Tuple[str, List[Tuple[bytes, bytes]], bytes]]:
+        """
+        (etag, raw headers, body) or None.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"Response cache read error: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        etag, headers, body = value.split(b"\n", 2)
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(headers)]
+        return etag.decode("latin-1"), headers, body
+
+    def put(self, key: str, headers: List[Tuple[bytes, bytes]], body: bytes) -> str:
+        """
+        Stores a response's body and raw headers, minus the ones the middleware
+        sets itself. Returns the ETag.
+        """
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = json.dumps([(name.decode("latin-1"), value.decode("latin-1")) for name, value in _replayable(headers)])
+        try:
+            self.backend.set(key, b"\n".join([etag.encode("latin-1"), headers.encode("latin-1"), body]), self.ttl)
+        except Exception as e:
+            print(f"Response cache write error: {e}")
+        return etag
+
+    def bump(self, *scopes: str):
+        for scope in scopes:
+            try:
+                self.backend.bump(scope)
+            except Exception as e:
+                print(f"Response cache version bump error: {e}")
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict:
+        stats = {
+            "backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else None,
+            "ttl_seconds": self.ttl,
+        }
+        try:
+            stats["entries"] = self.backend.size()
+        except Exception as e:
+            print(f"Response cache stats error: {e}")
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    The process-wide cache: Redis when RESPONSE_CACHE_URL is set, otherwise
+    in memory; None if RESPONSE_CACHE_ENABLED=0.
+    """
+    if os.getenv("RESPONSE_CACHE_ENABLED", "1") == "0":
+        return None
+    url = os.getenv("RESPONSE_CACHE_URL")
+    if url:
+        return ResponseCache(RedisBackend(url))
+    return ResponseCache(MemoryBackend(int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match comparison: "*" or any listed tag equal to `etag`, ignoring
+    weakness (W/) as the weak comparison the header calls for.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+def bump_versions(*scopes: str):
+    """
+    Invalidates the cached responses that read `scopes`. Call after the
+    commit: a request racing the bump may then store fresh data under the
+    old version, never stale data under the new one.
+    """
+    cache = get_response_cache()
+    if cache:
+        cache.bump(*scopes)
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving GETs of `routes` ({path template: scopes}) from
+    the response cache. Only 200 responses are stored, with the route's
+    headers; a hit never reaches the route, so it opens no session and runs
+    no query.
+    """
+    def __init__(self, app, routes: Dict[str, Tuple[str, ...]], cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.routes = [(compile_path(path)[0], scopes) for path, scopes in routes.items()]
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        cache = self.cache or get_response_cache()
+        scopes = self._scopes(scope) if cache else None
+        key = cache.key(scope["path"], scope.get("query_string", b""), scopes) if scopes else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        cached = cache.get(key)
+        if cached is None:
+            start, chunks = {}, []
+
+            async def capture(message):
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            body = b"".join(chunks)
+            if start.get("status") != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            headers = _replayable(start.get("headers", []))
+            cached = (cache.put(key, headers, body), headers, body)
+            state = b"MISS"
+        else:
+            state = b"HIT"
+
+        etag, stored_headers, body = cached
+        headers = [(b"etag", etag.encode("latin-1")), (b"cache-control", b"no-cache"), (b"x-cache", state)]
+        if _etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            cache.count_not_modified()
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += stored_headers + [(b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def _scopes(self, scope) -> Optional[Tuple[str, ...]]:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return None
+        for pattern, scopes in self.routes:
+            if pattern.match(scope["path"]):
+                return scopes
+        return None
@@ -1,31 +1,20 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.database import SessionLocal
-from app.ingestion.rss import fetch_rss_feeds
-from app.ingestion.reddit import fetch_reddit_content
-from app.analysis.ranker import ContentRanker
-from app.analysis.enrichment import EnrichmentService
+from app.pipeline import INGESTION_STAGES, PipelineRunner
 import os
 
 def run_ingestion_cycle():
     print("Starting ingestion cycle...")
-    db = SessionLocal()
+    # Every cycle is a new run in the pipeline ledger; new data matters more
+    # than finishing a failed cycle. PIPELINE_PROFILE=cprofile|pyinstrument
+    # profiles each cycle (see RunReport).
     try:
-        fetch_rss_feeds(db)
-        fetch_reddit_content(db)
-        
-        print("Ranking items...")
-        ranker = ContentRanker(db)
-        ranker.calculate_final_scores()
-
-        print("Enriching items (Paywall & Summary pass)...")
-        enricher = EnrichmentService()
-        enricher.enrich_batch(db)
-        
+        PipelineRunner(SessionLocal, "ingestion_cycle", INGESTION_STAGES).run(
+            resume=False, profile=os.getenv("PIPELINE_PROFILE") or None
+        )
         print("Ingestion cycle completed.")
     except Exception as e:
         print(f"Error in ingestion cycle: {e}")
-    finally:
-        db.close()
 
 def start_scheduler():
     refresh_hours = int(os.getenv("REFRESH_INTERVAL_HOURS", 6))
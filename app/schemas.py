@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+from app.models import SourceType
+
+
+class ItemOut(BaseModel):
+    """
+    A content item as /items lists it. Every field is optional so one model
+    serves all `fields=` projections; the endpoint leaves unset fields out.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    external_id: Optional[str] = None
+    source_type: Optional[SourceType] = None
+    source_name: Optional[str] = None
+    country: Optional[str] = None
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    engagement_metrics: Optional[Dict[str, Any]] = None
+    controversy_score: Optional[float] = None
+    controversy_reason: Optional[str] = None
+    final_score: Optional[float] = None
+    cluster_id: Optional[str] = None
+    used_for_content: Optional[bool] = None
+    is_unavailable: Optional[bool] = None
+    enrichment_status: Optional[str] = None
+    ingested_at: Optional[datetime] = None
+    raw_json: Optional[str] = None
+    snippet: Optional[str] = None  # Highlighted match, only when searching
+
+
+class ItemPage(BaseModel):
+    items: List[ItemOut]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page; None on the last page
+
+
+# The default list view: what the dashboard cards need, without raw_json and
+# with the summary cut to SUMMARY_PREVIEW_CHARS. Use `fields=` for the rest.
+LIST_FIELDS = (
+    "id", "source_type", "source_name", "country", "title", "summary", "url", "timestamp",
+    "controversy_score", "final_score", "cluster_id", "used_for_content", "enrichment_status",
+)
+SUMMARY_PREVIEW_CHARS = 280
@@ -0,0 +1,136 @@
+import re
+from typing import List, Optional
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.orm import Query
+from app.models import ContentItem
+
+FTS_TABLE = "content_items_fts"
+SNIPPET_START, SNIPPET_END = "<mark>", "</mark>"
+
+_fts = table(FTS_TABLE, column("rowid"))
+
+# External-content FTS5 index over content_items(title, summary). The triggers
+# keep it in sync with every write path (ORM, bulk upserts, deletes); updates
+# only re-index when title or summary actually change, not on score updates.
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, summary, content='content_items', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_items_fts_insert AFTER INSERT ON content_items BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_items_fts_delete AFTER DELETE ON content_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_items_fts_update AFTER UPDATE OF title, summary ON content_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+        INSERT INTO {FTS_TABLE}(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """CREATE INDEX IF NOT EXISTS ix_content_items_search ON content_items USING GIN (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, ''))
+    )""",
+]
+
+
+def ensure_search_index(engine):
+    """
+    Creates the full-text index for the engine's dialect if it is missing,
+    building it from the existing rows the first time.
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+            ).first()
+            for statement in _SQLITE_DDL:
+                conn.exec_driver_sql(statement)
+            if not exists:
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif engine.dialect.name == "postgresql":
+            for statement in _POSTGRES_DDL:
+                conn.exec_driver_sql(statement)
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Words of a user query. A trailing `*` marks a prefix term, and the last
+    word is always a prefix so partially typed queries match.
+    """
+    tokens = re.findall(r"\w+\*?", q or "", re.UNICODE)
+    return [
+        token if token.endswith("*") or n < len(tokens) - 1 else token + "*"
+        for n, token in enumerate(tokens)
+    ]
+
+
+def fts5_query(terms: List[str]) -> str:
+    # Quoting every word keeps FTS5 operators (AND, NEAR, column filters) literal.
+    return " ".join(f'"{term.rstrip("*")}"' + ("*" if term.endswith("*") else "") for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    return " & ".join(term.rstrip("*") + (":*" if term.endswith("*") else "") for term in terms)
+
+
+def _document():
+    return func.to_tsvector(
+        "english", func.coalesce(ContentItem.title, "") + " " + func.coalesce(ContentItem.summary, "")
+    )
+
+
+def relevance(q: str, dialect: str):
+    """
+    Match quality of an item for `q` in a query filtered by apply_search,
+    lower is better, or None where the dialect has no ranking.
+    """
+    terms = search_terms(q)
+    if dialect == "sqlite":
+        # Title matches weigh more than summary matches; bm25() is lower for better matches.
+        return func.bm25(literal_column(FTS_TABLE), 5.0, 1.0)
+    if dialect == "postgresql":
+        return -func.ts_rank_cd(_document(), func.to_tsquery("english", tsquery(terms)))
+    return None
+
+
+def apply_search(query: Query, q: str, dialect: str, rank: bool = True, snippet_words: int = 16):
+    """
+    Filters an ORM query over ContentItem to items matching `q` and adds a
+    highlighted snippet column. With `rank` the results come best match first
+    (BM25 on SQLite, ts_rank_cd on Postgres). Other databases fall back to the
+    ILIKE scan, without ranking, and use the summary as the snippet.
+
+    Returns the new query, or None if `q` has no searchable words.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return None
+
+    if dialect == "sqlite":
+        fts = literal_column(FTS_TABLE)
+        snippet = func.snippet(fts, -1, SNIPPET_START, SNIPPET_END, "…", snippet_words)
+        query = query.add_columns(snippet.label("snippet")).join(
+            _fts, _fts.c.rowid == ContentItem.id
+        ).filter(text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=fts5_query(terms)))
+        if rank:
+            query = query.order_by(relevance(q, dialect))
+        return query
+
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery("english", tsquery(terms))
+        snippet = func.ts_headline(
+            "english", func.coalesce(ContentItem.summary, ContentItem.title), ts_query,
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords={snippet_words}, MinWords=5"
+        )
+        query = query.add_columns(snippet.label("snippet")).filter(_document().op("@@")(ts_query))
+        if rank:
+            query = query.order_by(relevance(q, dialect))
+        return query
+
+    search = f"%{q}%"
+    return query.add_columns(ContentItem.summary.label("snippet")).filter(
+        (ContentItem.title.ilike(search)) | (ContentItem.summary.ilike(search))
+    )
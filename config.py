@@ -42,3 +42,32 @@ STRONG_LANGUAGE = [
     "idiot", "traitor", "scum", "thug", "corrupt", "nazi", "fascist",
     "racist", "bigot", "hate"
 ]
+
+# Topic clusters used by TopicClusterer (matched on whole words)
+CLUSTER_KEYWORDS = {
+    "immigration": [
+        "immigration", "border", "migrant", "refugee", "asylum", "visa", 
+        "citizenship", "deportation", "undocumented", "h-1b", "pr cards", "citizens", "immigrants"
+    ],
+    "foreign interference": [
+        "interference", "foreign influence", "election meddling", "hacking",
+        "disinformation", "propaganda", "espionage", "spying", "cyberattack", "allegations"
+    ],
+    "religious conflict": [
+        "religion", "religious", "faith", "church", "mosque", "temple",
+        "sectarian", "blasphemy", "extremism", "fundamentalism", "hindu", "muslim", "sikh", "christian", "jewish", "catholic"
+    ],
+    "student visas": [
+        "student visa", "international student", "study permit", "education visa",
+        "university enrollment", "college intake", "study in canada", "student intake"
+    ],
+    "crime": [
+        "crime", "criminal", "violence", "theft", "murder", "assault",
+        "policing", "law enforcement", "jail", "prison", "safety", "arrest", "police", "guilty", "suspect"
+    ],
+    "geopolitics": [
+        "geopolitics", "foreign policy", "diplomacy", "international relations",
+        "summit", "treaty", "alliance", "sanctions", "conflict", "war",
+        "military", "strategic", "modi", "trudeau", "biden", "trump", "china", "russia", "india", "israel", "palestine", "gaza", "ukraine", "nato"
+    ]
+}
@@ -3,12 +3,25 @@ import json
 import requests
 from config import RSS_FEEDS
 from datetime import datetime
+from app.database import SessionLocal, init_db
+from app.ingestion.http_cache import ValidatorStore
 
 def fetch_feeds(feeds_dict):
+    """
+    Pulls the latest articles of every feed. Feeds that are unchanged since the
+    previous pull (304 or identical body) aren't parsed again; the articles
+    stored with their validators are reported instead.
+    """
     results = {}
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
+
+    init_db()
+    db = SessionLocal()
+    # Namespaced so the scheduler's polls don't mark feeds as already pulled here.
+    validators = ValidatorStore(db, namespace="pull:")
+    validators.load(url for sources in feeds_dict.values() for url in sources.values())
     
     for country, sources in feeds_dict.items():
         print(f"Fetching feeds for {country}...")
@@ -16,8 +29,16 @@ def fetch_feeds(feeds_dict):
         for source_name, url in sources.items():
             print(f"  - Pulling from: {source_name}")
             try:
-                response = requests.get(url, headers=headers, timeout=10)
+                previous = validators.snapshot(url)
+                # Without the previous articles an unchanged feed has to be parsed anyway
+                request_headers = validators.conditional_headers(url, headers) if previous is not None else headers
+                response = requests.get(url, headers=request_headers, timeout=10)
                 response.raise_for_status()
+                if validators.is_unchanged(url, response) and previous is not None:
+                    db.commit()
+                    print(f"    Unchanged since last pull, reusing its {len(previous)} articles.")
+                    results[country][source_name] = previous
+                    continue
                 feed = feedparser.parse(response.text)
                 
                 if not feed.entries:
@@ -39,9 +60,13 @@ def fetch_feeds(feeds_dict):
                     print(f"    Found {len(articles)} articles.")
                     
                 results[country][source_name] = articles
+                validators.remember(url, response, snapshot=articles)
+                db.commit()
             except Exception as e:
                 print(f"    Error fetching {source_name}: {e}")
                 results[country][source_name] = []
+                db.rollback()
+    db.close()
     return results
 
 def save_results(results):
@@ -0,0 +1,22 @@
+import argparse
+from app.database import SessionLocal, init_db
+from app.analysis.trending import backfill_trending
+
+def backfill(batch_size: int = 1000):
+    init_db()
+    db = SessionLocal()
+    try:
+        print("Rebuilding trending counters from all stored items...")
+        items, buckets = backfill_trending(db, batch_size=batch_size)
+        print(f"Counted {items} items into {buckets} category/country/hour buckets.")
+    except Exception as e:
+        print(f"Backfill failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the trending_counts rollup used by /trending.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    backfill(batch_size=args.batch_size)
@@ -0,0 +1,182 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+READ_PATHS = ["/items?limit=50", "/items?limit=50&sort_by=final_score", "/items/{id}", "/trending?hours=24"]
+SLOW_SECONDS = 1.0
+
+
+def _seed(path, rows):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.ingestion.writer import BulkItemWriter
+    from app.migrations import run_migrations
+    from app.models import Base, SourceType
+    from app.search import ensure_search_index
+
+    words = "budget tax election minister housing pipeline court protest inflation border trade energy".split()
+    rng = random.Random(9)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    now = datetime.now()
+    for first in range(0, rows, 2000):
+        BulkItemWriter(db).upsert([{
+            "external_id": f"e{n}", "source_type": SourceType.NEWS, "source_name": "Feed", "country": "Canada",
+            "title": " ".join(rng.choice(words) for _ in range(10)), "url": f"https://example.com/{n}",
+            "summary": " ".join(rng.choice(words) for _ in range(60)), "timestamp": now - timedelta(minutes=n),
+            "final_score": rng.random(), "controversy_score": rng.random(), "engagement_metrics": {},
+            "raw_json": json.dumps({"entry": " ".join(rng.choice(words) for _ in range(300))}),
+        } for n in range(first, min(rows, first + 2000))])
+        db.commit()
+    db.close()
+    engine.dispose()
+
+
+def serve(mode, port):
+    """
+    Server process: the read routes as async handlers (app.main) or as the
+    sync handlers they replaced, plus /slow, a sync handler that holds a
+    threadpool thread like the NDJSON generation stream does.
+    """
+    import uvicorn
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.orm import Session
+    from app.database import get_read_db
+
+    app = FastAPI()
+    if mode == "async":
+        from app import main
+        app.router.routes.extend(
+            route for route in main.app.router.routes
+            if getattr(route, "path", None) in ("/items", "/items/{item_id}", "/trending")
+        )
+    else:
+        from app.analysis.trending import trending_counts
+        from app.items import item_detail, list_items
+
+        @app.get("/items")
+        def get_items(limit: int = 20, sort_by: str = None, db: Session = Depends(get_read_db)):
+            return list_items(db, limit=limit, sort_by=sort_by).model_dump(exclude_unset=True)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int, db: Session = Depends(get_read_db)):
+            return item_detail(db, item_id)
+
+        @app.get("/trending")
+        def get_trending(hours: int = None, db: Session = Depends(get_read_db)):
+            return trending_counts(db, since=datetime.now() - timedelta(hours=hours or 24))
+
+    @app.get("/slow")
+    def slow():
+        time.sleep(SLOW_SECONDS)
+        return {}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+def _client(port, paths, stop, latencies, errors, rng):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while not stop.is_set():
+        path = rng.choice(paths).replace("{id}", str(rng.randrange(1, 1000)))
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            elif latencies is not None:
+                latencies.append((time.perf_counter() - started) * 1000)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.close()
+
+
+def load(port, readers, slow_clients, seconds):
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_client, args=(port, READ_PATHS, stop, latencies, errors, random.Random(n)))
+        for n in range(readers)
+    ] + [
+        threading.Thread(target=_client, args=(port, ["/slow"], stop, None, errors, random.Random(n)))
+        for n in range(slow_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    ordered = sorted(latencies) or [0.0]
+    return len(latencies) / seconds, statistics.median(ordered), ordered[int(0.99 * (len(ordered) - 1))], len(errors)
+
+
+def bench(rows, readers, slow_clients, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.db")
+        _seed(path, rows)
+        print(f"{readers} read clients on {', '.join(READ_PATHS)}; {rows:,} items; {seconds}s per run")
+        print(f"{'handlers':<9} {'slow clients':>12} {'reads/s':>8} {'p50 ms':>7} {'p99 ms':>8} {'errors':>7}")
+        for mode in ("sync", "async"):
+            port = _free_port()
+            env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}"}
+            server = subprocess.Popen([sys.executable, "-m", "scripts.bench_async_routes", "--serve", mode,
+                                       "--port", str(port)], env=env)
+            try:
+                _wait_for(port)
+                load(port, readers, 0, 2)  # Warm-up
+                for slow in (0, slow_clients):
+                    rps, p50, p99, errors = load(port, readers, slow, seconds)
+                    print(f"{mode:<9} {slow:>12} {rps:>8.0f} {p50:>7.1f} {p99:>8.1f} {errors:>7}")
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read throughput and p99 of the async read routes vs sync handlers.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--slow-clients", type=int, default=48,
+                        help="Concurrent requests holding a threadpool thread for 1s (Starlette's pool has 40)")
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--serve", choices=["sync", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port)
+    else:
+        bench(args.rows, args.readers, args.slow_clients, args.seconds)
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem
+from app.analysis.bulk import BulkItemUpdater, stream_items
+from app.analysis.clustering import TopicClusterer
+
+WORDS = ["border", "asylum", "police", "arrest", "summit", "trudeau", "modi", "church", "budget", "housing",
+         "city", "council", "report", "says", "new", "week", "local", "people", "plan", "vote"]
+
+
+def orm_path(db, clusterer, batch_size):
+    # The previous scripts: materialize every ORM object, dirty-track, commit.
+    items = db.query(ContentItem).all()
+    for item in items:
+        item.cluster_id = clusterer.categorize(item.title, item.summary)
+    db.commit()
+
+
+def bulk_path(db, clusterer, batch_size):
+    with BulkItemUpdater(db, chunk_size=batch_size) as updater:
+        for rows in stream_items(
+            db, ContentItem.id, ContentItem.title, ContentItem.summary, ContentItem.cluster_id, batch_size=batch_size
+        ):
+            clusterer.assign_clusters(db, rows, updater)
+    db.commit()
+
+
+def bench(count: int, batch_size: int):
+    rng = random.Random(count)
+    rows = [
+        {
+            "external_id": f"bench{n}", "title": " ".join(rng.choice(WORDS) for _ in range(8)),
+            "summary": " ".join(rng.choice(WORDS) for _ in range(30))
+        }
+        for n in range(count)
+    ]
+    clusterer = TopicClusterer()
+
+    results = {}
+    for name, path in [("orm .all()", orm_path), ("stream+bulk", bulk_path)]:
+        handle, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        db.execute(ContentItem.__table__.insert(), rows)
+        db.commit()
+
+        started = time.perf_counter()
+        path(db, clusterer, batch_size)
+        elapsed = time.perf_counter() - started
+
+        # Second pass under tracemalloc (too slow to time) for the peak Python heap
+        db.query(ContentItem).update({"cluster_id": None})
+        db.commit()
+        db.expunge_all()
+        tracemalloc.start()
+        path(db, clusterer, batch_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = elapsed
+        print(f"{name:>12}: {elapsed:6.2f}s, peak {peak / 2**20:7.1f} MiB")
+
+        db.close()
+        engine.dispose()
+        os.remove(db_path)
+
+    print(f"Speedup: {results['orm .all()'] / results['stream+bulk']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM re-clustering of the full history with streamed bulk updates.")
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    bench(args.items, args.batch_size)
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.analysis.ranker import ContentRanker
+from app.analysis.trending import TrendingCounter
+from app.database import create_engines
+from app.ingestion.writer import BulkItemWriter
+from app.items import list_items
+from app.migrations import run_migrations
+from app.models import Base, SourceType
+
+WORDS = "budget tax election minister housing pipeline court protest inflation border trade energy climate".split()
+
+
+def _rows(rng, first, count):
+    now = datetime.now()
+    return [{
+        "external_id": f"e{n}", "source_type": SourceType.NEWS, "source_name": "Feed", "country": "Canada",
+        "title": " ".join(rng.choice(WORDS) for _ in range(10)).capitalize(),
+        "summary": " ".join(rng.choice(WORDS) for _ in range(60)), "url": f"https://example.com/{n}",
+        "timestamp": now - timedelta(minutes=rng.randrange(1200)), "engagement_metrics": {},
+        "controversy_score": rng.random(), "raw_json": json.dumps({"entry": " ".join(rng.choice(WORDS) for _ in range(400))}),
+    } for n in range(first, first + count)]
+
+
+def _ingestion_cycle(factory, rng, first, feeds, rows_per_feed, errors):
+    """
+    What the scheduler's cycle does to the database: one bulk write and
+    commit per feed, then an incremental ranking pass.
+    """
+    db = factory()
+    try:
+        for feed in range(feeds):
+            try:
+                rows = _rows(rng, first + feed * rows_per_feed, rows_per_feed)
+                BulkItemWriter(db).upsert(rows)
+                trending = TrendingCounter(db)
+                trending.add_rows(rows)
+                trending.flush()
+                db.commit()
+            except Exception as e:
+                errors.append(str(e))
+                db.rollback()
+        try:
+            ContentRanker(db).calculate_final_scores(incremental=True)
+        except Exception as e:
+            errors.append(str(e))
+            db.rollback()
+    finally:
+        db.close()
+
+
+def _reader(factory, stop, latencies, errors):
+    sorts = [None, "final_score", "controversy_score"]
+    n = 0
+    while not stop.is_set():
+        db = factory()
+        started = time.perf_counter()
+        try:
+            list_items(db, sort_by=sorts[n % len(sorts)], limit=50)
+            latencies.append((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            errors.append(str(e))
+        finally:
+            db.close()
+        n += 1
+
+
+def run(name, write_factory, read_factory, readers, feeds, rows_per_feed, seed_rows):
+    rng = random.Random(11)
+    stop = threading.Event()
+    latencies, read_errors, write_errors = [], [], []
+    threads = [threading.Thread(target=_reader, args=(read_factory, stop, latencies, read_errors)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    _ingestion_cycle(write_factory, rng, seed_rows, feeds, rows_per_feed, write_errors)
+    cycle_s = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(latencies) or [0.0]
+    pct = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    print(f"{name:<9} {cycle_s:>8.2f} {len(write_errors):>7} {len(latencies) / cycle_s:>8.0f} "
+          f"{statistics.median(ordered):>7.1f} {pct(0.99):>7.1f} {ordered[-1]:>8.1f} {len(read_errors):>7}")
+    for error in (write_errors + read_errors)[:3]:
+        print(f"          {error.splitlines()[0][:100]}")
+
+
+def _seed(url, rows):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    rng = random.Random(3)
+    for first in range(0, rows, 2000):
+        BulkItemWriter(db).upsert(_rows(rng, first, min(2000, rows - first)))
+        db.commit()
+    db.close()
+    engine.dispose()
+
+
+def bench(readers, feeds, rows_per_feed, seed_rows):
+    print(f"{readers} reader threads on /items during an ingestion cycle of {feeds} feeds x {rows_per_feed} items "
+          f"({seed_rows:,} items stored)")
+    print(f"{'config':<9} {'cycle s':>8} {'w errs':>7} {'reads/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>8} {'r errs':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("default", "tuned"):
+            url = f"sqlite:///{os.path.join(tmp, name + '.db')}"
+            _seed(url, seed_rows)
+            if name == "default":
+                # The previous app/database.py: one default engine, rollback journal
+                engine = create_engine(url, connect_args={"check_same_thread": False})
+                write_engine = read_engine = engine
+            else:
+                write_engine, read_engine = create_engines(url)
+            run(name, sessionmaker(bind=write_engine, autoflush=False), sessionmaker(bind=read_engine, autoflush=False),
+                readers, feeds, rows_per_feed, seed_rows)
+            write_engine.dispose()
+            read_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API read latency while an ingestion cycle writes, before/after WAL and the engine split.")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--feeds", type=int, default=40)
+    parser.add_argument("--rows-per-feed", type=int, default=50)
+    parser.add_argument("--seed-rows", type=int, default=20_000)
+    args = parser.parse_args()
+    bench(args.readers, args.feeds, args.rows_per_feed, args.seed_rows)
@@ -0,0 +1,47 @@
+import argparse
+import os
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem
+from app.analysis.enrichment import EnrichmentService
+from scripts.fake_llm_server import start_fake_llm_server
+
+# Measure the LLM round trips, not the response cache.
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+
+def bench(items: int, latency: float, rate_limit: float, pool_sizes):
+    server, base_url = start_fake_llm_server(latency=latency, rate_limit=rate_limit)
+    print(f"{items} items, {latency * 1000:.0f} ms per request, server limit {rate_limit or 'none'} req/s")
+    try:
+        for workers in pool_sizes:
+            engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine, autoflush=False)()
+            db.execute(ContentItem.__table__.insert(), [
+                {"external_id": f"e{n}", "title": f"Headline {n}", "summary": "", "url": f"https://example.com/{n}"}
+                for n in range(items)
+            ])
+            db.commit()
+
+            service = EnrichmentService(api_key="bench", base_url=base_url, max_workers=workers)
+            service.llm.base_delay = 0.2
+            started = time.perf_counter()
+            service.enrich_batch(db, limit=items)
+            elapsed = time.perf_counter() - started
+            print(f"workers {workers:>3}: {items / elapsed:7.1f} items/s, {service.llm.stats()}")
+            db.close()
+            engine.dispose()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrichment throughput by pool size against a fake OpenAI server.")
+    parser.add_argument("--items", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--rate-limit", type=float, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    bench(args.items, args.latency, args.rate_limit, args.workers)
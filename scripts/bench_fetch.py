@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+import requests
+from app.ingestion.fetcher import FeedFetcher
+from scripts.stub_feed_server import start_stub_server
+
+
+def run_sequential(jobs):
+    for _, url, headers in jobs:
+        try:
+            requests.get(url, headers=headers, timeout=15).raise_for_status()
+        except Exception as e:
+            print(f"  - sequential error on {url}: {e}")
+
+
+def bench_fetch(feeds: int, max_delay: float, hosts: int, per_host: int):
+    server, base_url = start_stub_server()
+    port = server.server_address[1]
+    rng = random.Random(42)
+
+    # Spread feeds over 127.0.0.x aliases so per-host limits behave like real publishers.
+    jobs = []
+    delays = []
+    for n in range(feeds):
+        delay = round(rng.uniform(0, max_delay), 2)
+        delays.append(delay)
+        host = f"127.0.0.{(n % hosts) + 1}"
+        jobs.append((n, f"http://{host}:{port}/rss/feed{n}?delay={delay}", {"User-Agent": "bench"}))
+
+    print(f"{feeds} feeds over {hosts} hosts | slowest {max(delays):.2f}s | sum {sum(delays):.2f}s")
+
+    started = time.perf_counter()
+    run_sequential(jobs)
+    sequential = time.perf_counter() - started
+    print(f"Sequential requests.get loop : {sequential:6.2f}s")
+
+    fetcher = FeedFetcher(per_host_limit=per_host)
+    started = time.perf_counter()
+    results = fetcher.fetch_all(jobs)
+    concurrent = time.perf_counter() - started
+    failed = sum(1 for r in results.values() if not r.ok)
+    print(f"FeedFetcher (per-host={per_host})   : {concurrent:6.2f}s ({failed} failed)")
+    print(f"Speedup: {sequential / concurrent:.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the concurrent fetch stage against a local stub server.")
+    parser.add_argument("--feeds", type=int, default=13)
+    parser.add_argument("--max-delay", type=float, default=1.5)
+    parser.add_argument("--hosts", type=int, default=13)
+    parser.add_argument("--per-host", type=int, default=2)
+    args = parser.parse_args()
+    bench_fetch(args.feeds, args.max_delay, args.hosts, args.per_host)
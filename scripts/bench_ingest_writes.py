@@ -0,0 +1,84 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem, SourceType
+from app.ingestion.writer import BulkItemWriter
+
+
+def make_row(external_id: str, n: int):
+    return dict(
+        external_id=external_id, source_type=SourceType.REDDIT, source_name="r/bench", country="Canada",
+        title=f"Bench post {external_id}", summary="", url=f"https://reddit.com/{external_id}",
+        timestamp=datetime.now(), engagement_metrics={"score": n, "num_comments": n}, controversy_score=0.0
+    )
+
+
+def per_row_path(db, feeds):
+    # The previous ingestion loop: one SELECT per entry, ORM add / dirty tracking, commit per feed.
+    for feed in feeds:
+        for row in feed:
+            existing = db.query(ContentItem).filter(ContentItem.external_id == row["external_id"]).first()
+            if existing:
+                existing.engagement_metrics = row["engagement_metrics"]
+                continue
+            db.add(ContentItem(**row))
+        db.commit()
+
+
+def bulk_path(db, feeds):
+    writer = BulkItemWriter(db)
+    for feed in feeds:
+        writer.existing_ids(row["external_id"] for row in feed)
+        writer.upsert(feed, update_metrics=True)
+        db.commit()
+
+
+def bench(existing: int, feeds: int, entries: int, known_ratio: float):
+    results = {}
+    for name, path in [("per-row", per_row_path), ("bulk", bulk_path)]:
+        handle, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        db = Session()
+        db.execute(ContentItem.__table__.insert(), [make_row(f"old{n}", n) for n in range(existing)])
+        db.commit()
+
+        batches = []
+        for f in range(feeds):
+            batch = []
+            for n in range(entries):
+                known = n < entries * known_ratio
+                batch.append(make_row(f"old{f * entries + n}" if known else f"new{f}_{n}", n + 1000))
+            batches.append(batch)
+
+        statements = [0]
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+
+        started = time.perf_counter()
+        path(db, batches)
+        elapsed = time.perf_counter() - started
+        results[name] = (elapsed, statements[0])
+        db.close()
+        engine.dispose()
+        os.remove(db_path)
+
+    for name, (elapsed, count) in results.items():
+        print(f"{name:>8}: {elapsed * 1000:8.1f} ms, {count:5d} statements")
+    print(f"Speedup: {results['per-row'][0] / results['bulk'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-row ingestion writes with BulkItemWriter.")
+    parser.add_argument("--existing", type=int, default=20000)
+    parser.add_argument("--feeds", type=int, default=13)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--known-ratio", type=float, default=0.8)
+    args = parser.parse_args()
+    bench(args.existing, args.feeds, args.entries, args.known_ratio)
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.items import list_items
+from app.migrations import run_migrations
+from app.models import Base, ContentItem, SourceType
+from app.pagination import encode_cursor
+from app.payloads import store_payloads
+
+WORDS = "budget tax election minister housing pipeline court protest inflation border trade energy climate".split()
+
+
+def _seed(db, rows, rng, batch=5000):
+    now = datetime.now()
+    for start in range(0, rows, batch):
+        numbers = range(start, min(rows, start + batch))
+        # About the size of a serialized feedparser entry, kept in raw_payloads as ingestion does
+        hashes = store_payloads(db, [
+            json.dumps({"n": n, "entry": " ".join(rng.choice(WORDS) for _ in range(700))}) for n in numbers
+        ])
+        db.execute(ContentItem.__table__.insert(), [{
+            "external_id": f"e{n}", "source_type": rng.choice(list(SourceType)), "source_name": "Feed",
+            "country": rng.choice(["Canada", "India"]), "url": f"https://example.com/{n}",
+            "title": " ".join(rng.choice(WORDS) for _ in range(10)).capitalize(),
+            "summary": " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 400))),
+            "timestamp": now - timedelta(seconds=n * 7), "final_score": rng.random() * 100,
+            "controversy_score": rng.random() * 10, "engagement_metrics": {"score": n % 500},
+            "raw_hash": raw_hash,
+        } for n, raw_hash in zip(numbers, hashes)])
+        db.commit()
+
+
+def _time(run, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def bench(rows, depths, limit, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'items.db')}")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        _seed(db, rows, random.Random(3))
+        print(f"{rows:,} items, pages of {limit}, newest first")
+        print(f"{'depth':>8}  {'offset+ORM ms':>13} {'KB':>7}  {'cursor ms':>9} {'KB':>6}")
+        for depth in depths:
+            def full():
+                # The previous /items: whole ORM rows, reaching deep pages by skipping rows
+                items = db.query(ContentItem).order_by(ContentItem.timestamp.desc()).offset(depth).limit(limit).all()
+                body = json.dumps(jsonable_encoder(items))
+                db.expunge_all()
+                return body
+
+            # The cursor a client holds after paging down to `depth`
+            previous = db.query(ContentItem.timestamp, ContentItem.id).order_by(
+                ContentItem.timestamp.desc(), ContentItem.id.desc()
+            ).offset(depth - 1).first() if depth else None
+            cursor = encode_cursor("timestamp", *previous) if previous else None
+
+            def lean():
+                return list_items(db, limit=limit, cursor=cursor).model_dump_json(exclude_unset=True)
+
+            full_ms, full_body = _time(full, repeat)
+            lean_ms, lean_body = _time(lean, repeat)
+            print(f"{depth:>8,}  {full_ms:>13.1f} {len(full_body) / 1024:>7.0f}  {lean_ms:>9.1f} {len(lean_body) / 1024:>6.0f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/items page cost: offset over full rows vs keyset over the lean list view.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1_000, 50_000, 190_000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    bench(args.rows, args.depths, args.limit, args.repeat)
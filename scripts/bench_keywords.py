@@ -0,0 +1,72 @@
+import argparse
+import random
+import re
+import time
+from config import CONTROVERSIAL_TOPICS, STRONG_LANGUAGE, CLUSTER_KEYWORDS
+from app.analysis.keywords import get_keyword_matcher, CONTROVERSIAL_TOPICS as TOPICS, STRONG_LANGUAGE as STRONG, CLUSTER_PREFIX
+
+NOISE = ["government", "announced", "today", "report", "new", "plan", "minister", "city", "people", "said",
+         "after", "week", "local", "council", "budget", "says", "residents", "vote", "court", "about"]
+
+
+def make_items(count: int, rng: random.Random):
+    keywords = list(CONTROVERSIAL_TOPICS) + list(STRONG_LANGUAGE) + [k for ks in CLUSTER_KEYWORDS.values() for k in ks]
+    items = []
+    for _ in range(count):
+        words = [rng.choice(keywords) if rng.random() < 0.1 else rng.choice(NOISE) for _ in range(rng.randint(30, 60))]
+        items.append((" ".join(words[:12]).title(), " ".join(words[12:])))
+    return items
+
+
+def legacy(title, summary):
+    # The per-keyword loops of FilterService, ControversyAnalyzer, ContentRanker and TopicClusterer.
+    text = f"{title} {summary or ''}".lower()
+    blocked = any(re.search(rf'\b{re.escape(w)}\b', text) for w in STRONG_LANGUAGE)
+    strong = sum(1 for w in STRONG_LANGUAGE if re.search(rf'\b{re.escape(w)}\b', text))
+    topics = sum(1 for t in CONTROVERSIAL_TOPICS if t in text)
+    title_topics = [t for t in CONTROVERSIAL_TOPICS if t.lower() in title.lower()]
+    charged = [w for w in STRONG_LANGUAGE if re.search(rf'\b{w}\b', text)]
+    clusters = {
+        c: sum(1 for k in ks if re.search(rf'\b{re.escape(k)}\b', text)) for c, ks in CLUSTER_KEYWORDS.items()
+    }
+    return blocked, strong, topics, title_topics, charged, clusters
+
+
+def matched(title, summary):
+    # The same four call sites, answered from one scan per call site.
+    matcher = get_keyword_matcher()
+    text = f"{title} {summary or ''}".lower()
+    blocked = bool(matcher.match(text).get(STRONG))
+    hits = matcher.match(text)
+    strong = len(hits.get(STRONG, []))
+    topics = len(hits.get(TOPICS, []))
+    scanned = matcher.scan(text)
+    title_topics = matcher.terms(scanned, TOPICS, end=len(title))
+    charged = matcher.terms(scanned, STRONG)
+    hits = matcher.match(text)
+    clusters = {c: len(hits.get(f"{CLUSTER_PREFIX}{c}", [])) for c in CLUSTER_KEYWORDS}
+    return blocked, strong, topics, title_topics, charged, clusters
+
+
+def bench(count: int):
+    items = make_items(count, random.Random(count))
+    get_keyword_matcher()
+
+    results = {}
+    for name, fn in [("loops", legacy), ("matcher", matched)]:
+        started = time.perf_counter()
+        answers = [fn(title, summary) for title, summary in items]
+        elapsed = time.perf_counter() - started
+        results[name] = (elapsed, answers)
+
+    assert results["loops"][1] == results["matcher"][1], "matcher disagrees with the per-keyword loops"
+    for name, (elapsed, _) in results.items():
+        print(f"{name:>8}: {count / elapsed:10.0f} items/s")
+    print(f"Speedup: {results['loops'][0] / results['matcher'][0]:.1f}x (results identical)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-keyword regex loops with the compiled KeywordMatcher.")
+    parser.add_argument("--items", type=int, default=5000)
+    args = parser.parse_args()
+    bench(args.items)
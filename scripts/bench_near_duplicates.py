@@ -0,0 +1,87 @@
+import argparse
+import random
+import time
+from app.analysis.dedup import NearDuplicateIndex, jaccard, tokenize
+from app.analysis.filters import FilterService
+
+VOCABULARY_SIZE = 5000
+
+
+def make_titles(count: int, rng: random.Random):
+    vocabulary = [f"w{n}" for n in range(VOCABULARY_SIZE)]
+    return [" ".join(rng.sample(vocabulary, rng.randint(6, 14))) for _ in range(count)]
+
+
+def make_queries(titles, count: int, rng: random.Random):
+    """
+    Half near-duplicates of window titles (one word swapped or appended), half fresh titles.
+    """
+    queries = []
+    for n in range(count):
+        if n % 2 == 0:
+            words = rng.choice(titles).split()
+            if rng.random() < 0.5:
+                words[rng.randrange(len(words))] = f"new{n}"
+            else:
+                words.append(f"extra{n}")
+            queries.append(" ".join(words))
+        else:
+            queries.extend(make_titles(1, rng))
+    return queries
+
+
+def loop_is_duplicate(filter_service, title, recent_titles):
+    for recent in recent_titles:
+        if filter_service.jaccard_similarity(title, recent) > 0.7:
+            return True
+    return False
+
+
+def bench(window: int, queries: int, loop_queries: int):
+    rng = random.Random(window)
+    titles = make_titles(window, rng)
+    probes = make_queries(titles, queries, rng)
+
+    index = NearDuplicateIndex(threshold=0.7)
+    started = time.perf_counter()
+    for item_id, title in enumerate(titles, start=1):
+        index.add(item_id, index.signature(title))
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lsh_answers = [index.is_duplicate(q) for q in probes]
+    lsh_per_query = (time.perf_counter() - started) / len(probes)
+
+    filter_service = FilterService()
+    started = time.perf_counter()
+    for q in probes[:loop_queries]:
+        loop_is_duplicate(filter_service, q, titles)
+    loop_per_query = (time.perf_counter() - started) / loop_queries
+
+    # Exact ground truth on pre-tokenized sets (same answers as the loop, just faster).
+    window_tokens = [tokenize(t) for t in titles]
+    truth = []
+    for q in probes:
+        q_tokens = tokenize(q)
+        truth.append(any(jaccard(q_tokens, t) > 0.7 for t in window_tokens))
+
+    positives = sum(truth)
+    true_positives = sum(1 for a, t in zip(lsh_answers, truth) if a and t)
+    false_positives = sum(1 for a, t in zip(lsh_answers, truth) if a and not t)
+    recall = true_positives / positives if positives else 1.0
+
+    print(f"{window:>7} | build {build:7.2f}s (one-off, persisted) | loop {loop_per_query * 1000:9.2f} ms/q"
+          f" | lsh {lsh_per_query * 1000:6.3f} ms/q | speedup {loop_per_query / lsh_per_query:8.0f}x"
+          f" | recall {recall:.4f} | false+ {false_positives}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the LSH near-duplicate index with the Jaccard loop.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--loop-queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'window':>7} | {args.queries} probe titles, ~50% near-duplicates")
+    for size in args.sizes:
+        bench(size, args.queries, args.loop_queries)
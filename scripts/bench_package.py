@@ -0,0 +1,58 @@
+import argparse
+import os
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, ContentItem, TopicCommentary
+from app.analysis.commentary import ContentEngine
+from scripts.fake_llm_server import start_fake_llm_server, package_responder
+
+# Measure the LLM round trips, not the response cache.
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    db.add_all([
+        ContentItem(external_id=f"e{n}", title=f"Budget headline {n}", summary="Parliament debates the budget.",
+                    url=f"https://example.com/{n}", cluster_id="Budget", final_score=float(n))
+        for n in range(15)
+    ])
+    db.add(TopicCommentary(cluster_id="Budget", angles=[], strongest_angle_html="Who signed off on this?"))
+    db.commit()
+    return db
+
+
+def _measure(server, label, run):
+    requests, prompt, completion = server.completed, server.prompt_tokens, server.completion_tokens
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:6.2f}s  {server.completed - requests:>2} requests  "
+          f"{server.prompt_tokens - prompt:>6} prompt + {server.completion_tokens - completion:>5} completion tokens")
+
+
+def bench(latency: float, token_latency: float):
+    server, base_url = start_fake_llm_server(latency=latency, token_latency=token_latency, responder=package_responder)
+    print(f"Fake LLM: {latency * 1000:.0f} ms + {token_latency * 1000:.1f} ms per output token")
+    try:
+        db = _session()
+        engine = ContentEngine(api_key="bench", base_url=base_url)
+        _measure(server, "single completion", lambda: engine.generate_full_package(db, "Budget", parallel=False))
+        _measure(server, "one request per section", lambda: engine.generate_full_package(db, "Budget", parallel=True))
+        _measure(server, "retry x_post: full rerun", lambda: engine.generate_full_package(db, "Budget", parallel=False))
+        _measure(server, "retry x_post: section only", lambda: engine.regenerate_section(db, "Budget", "x_post"))
+        db.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Package generation latency and tokens: single prompt vs per section.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Seconds per output token")
+    args = parser.parse_args()
+    bench(args.latency, args.token_latency)
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem, SourceType
+from app.analysis.ranker import ContentRanker
+
+KEYWORDS = ["border", "abortion", "corrupt", "liar", "terrible", "khalistan", "awful", "hate", "police"]
+NOISE = ["great", "vote", "city", "plan", "love", "new", "report", "budget", "minister", "council", "housing",
+         "says", "after", "week", "local", "people", "government", "announced", "today", "residents"]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(KEYWORDS) if rng.random() < 0.1 else rng.choice(NOISE) for _ in range(words))
+
+
+def make_rows(count: int, rng: random.Random):
+    titles = [make_text(rng, rng.randint(5, 12)) for _ in range(count // 10 or 1)]
+    summaries = [make_text(rng, rng.randint(15, 40)) for _ in range(5)]
+    now = datetime.now()
+    return [
+        dict(
+            external_id=f"bench{n}", source_type=rng.choice([SourceType.REDDIT, SourceType.NEWS]),
+            source_name=f"source{rng.randrange(30)}", country="Canada", title=rng.choice(titles),
+            summary=rng.choice(summaries), url=f"https://example.com/{n}", timestamp=now - timedelta(minutes=n % 1200),
+            engagement_metrics={"score": rng.randrange(50000), "num_comments": rng.randrange(5000)},
+            controversy_score=0.0, final_score=0.0
+        )
+        for n in range(count)
+    ]
+
+
+def bench(count: int):
+    handle, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    db = Session()
+    db.execute(ContentItem.__table__.insert(), make_rows(count, random.Random(count)))
+    db.commit()
+
+    # Fill the sentiment cache first so both paths measure scoring, not TextBlob.
+    started = time.perf_counter()
+    ContentRanker(db).calculate_final_scores()
+    print(f"warm-up (sentiment cache fill): {time.perf_counter() - started:6.2f}s")
+
+    results = {}
+    for name, vectorized in [("per-item", False), ("columnar", True)]:
+        db.close()
+        db = Session()
+        started = time.perf_counter()
+        ContentRanker(db, vectorized=vectorized).calculate_final_scores()
+        results[name] = time.perf_counter() - started
+        print(f"{name:>9}: {results[name]:6.2f}s for {count} items")
+
+    print(f"Speedup: {results['per-item'] / results['columnar']:.1f}x")
+    db.close()
+    engine.dispose()
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-item and columnar full-window ranking.")
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+    bench(args.items)
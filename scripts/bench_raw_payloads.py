@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from app.migrations import run_migrations
+from app.models import Base, ContentItem
+
+WORDS = (
+    "budget tax election minister housing pipeline court protest inflation border trade energy climate "
+    "province federal senate vote scandal inquiry police tariff rebate pension union hospital school"
+).split()
+TAGS = ["Politics", "Canada", "India", "Economy", "World", "Opinion", "Business", "Elections"]
+
+
+def _entry(rng, n, title, summary, published):
+    # Shaped like json.dumps() of a feedparser entry, which is what the RSS ingester stored
+    link = f"https://news.example.com/{published:%Y/%m/%d}/story-{n}"
+    html = "".join(f"<p>{' '.join(rng.choice(WORDS) for _ in range(25))}</p>" for _ in range(rng.randint(2, 6)))
+    return json.dumps({
+        "title": title, "title_detail": {"type": "text/plain", "language": None, "base": "", "value": title},
+        "links": [{"rel": "alternate", "type": "text/html", "href": link}], "link": link,
+        "summary": summary, "summary_detail": {"type": "text/html", "language": None, "base": "", "value": summary},
+        "content": [{"type": "text/html", "language": None, "base": "", "value": html}],
+        "published": published.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+        "published_parsed": list(published.timetuple()), "id": link, "guidislink": False,
+        "authors": [{"name": "Staff Reporter"}], "author": "Staff Reporter", "author_detail": {"name": "Staff Reporter"},
+        "tags": [{"term": tag, "scheme": None, "label": None} for tag in rng.sample(TAGS, 3)],
+        "media_content": [{"url": f"https://cdn.example.com/img/{n}.jpg", "medium": "image", "width": "1024"}],
+    })
+
+
+def _seed_inline(engine, rows, batch=2000):
+    """
+    content_items as it was before raw_payloads, filled with `rows` items.
+    """
+    rng = random.Random(5)
+    now = datetime.now()
+    with engine.begin() as conn:
+        ContentItem.__table__.create(conn)
+        conn.exec_driver_sql("ALTER TABLE content_items ADD COLUMN raw_json TEXT")
+        conn.exec_driver_sql("ALTER TABLE content_items DROP COLUMN raw_hash")
+    columns = "external_id, source_name, country, title, summary, url, timestamp, controversy_score, final_score, raw_json"
+    for start in range(0, rows, batch):
+        values = []
+        for n in range(start, min(rows, start + batch)):
+            title = " ".join(rng.choice(WORDS) for _ in range(10)).capitalize()
+            summary = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 120)))
+            published = now - timedelta(minutes=n)
+            values.append((f"https://news.example.com/{n}", "Feed", "Canada", title, summary,
+                           f"https://news.example.com/{n}", published.isoformat(sep=" "), rng.random(), rng.random(),
+                           _entry(rng, n, title, summary, published)))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"INSERT INTO content_items ({columns}) VALUES ({', '.join('?' * 10)})", values)
+
+
+def _table_bytes(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = ?", (name,)).scalar()
+
+
+def _scan_ms(engine, sql, repeat):
+    timings = []
+    for _ in range(repeat):
+        with engine.connect() as conn:
+            started = time.perf_counter()
+            conn.exec_driver_sql(sql).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _measure(engine, repeat):
+    since = (datetime.now() - timedelta(hours=24)).isoformat(sep=" ")
+    return {
+        "content_items MB": _table_bytes(engine, "content_items") / 2**20,
+        "raw_payloads MB": _table_bytes(engine, "raw_payloads") / 2**20,
+        "file MB": os.path.getsize(engine.url.database) / 2**20,
+        "SELECT * ms": _scan_ms(engine, "SELECT * FROM content_items", repeat),
+        "24h window ms": _scan_ms(engine, f"SELECT * FROM content_items WHERE timestamp >= '{since}'", repeat),
+    }
+
+
+def report(rows, database, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "payloads.db")
+        if database:
+            shutil.copyfile(database, path)
+            engine = create_engine(f"sqlite:///{path}")
+        else:
+            engine = create_engine(f"sqlite:///{path}")
+            _seed_inline(engine, rows)
+            print(f"Seeded {rows:,} items with inline raw_json")
+        before = _measure(engine, repeat)
+
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        run_migrations(engine)
+        migrated_s = time.perf_counter() - started
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+            payloads, stored, compressed = conn.exec_driver_sql(
+                "SELECT count(*), sum(size), sum(length(data)) FROM raw_payloads"
+            ).one()
+        after = _measure(engine, repeat)
+        engine.dispose()
+
+    print(f"Migrated in {migrated_s:.1f}s: {payloads:,} payloads, "
+          f"{(stored or 0) / 2**20:.1f} MB -> {(compressed or 0) / 2**20:.1f} MB zlib")
+    print(f"{'':<18} {'before':>9} {'after':>9}")
+    for name in before:
+        print(f"{name:<18} {before[name]:>9.1f} {after[name]:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="content_items size and scan time before and after moving raw_json to raw_payloads."
+    )
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic items to seed")
+    parser.add_argument("--database", help="Report on a copy of this SQLite file (e.g. app.db) instead")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    report(args.rows, args.database, args.repeat)
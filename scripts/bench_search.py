@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem
+from app.search import apply_search, ensure_search_index
+
+WORDS = (
+    "budget tax carbon election parliament minister housing pipeline healthcare immigration "
+    "court ruling protest strike inflation deficit province federal senate vote scandal inquiry "
+    "police border tariff trade energy climate rebate pension union hospital school defence "
+    "modi trudeau poilievre delhi ottawa toronto mumbai monsoon farmers crop railway airport"
+).split()
+FILLER = "the a of in on for with after before over says report new plan amid calls".split()
+# Background vocabulary, so topical words are about as selective as in real headlines.
+_letters = random.Random(1)
+VOCABULARY = sorted({
+    "".join(_letters.choice("bcdfghklmnprstvz") + _letters.choice("aeiou") for _ in range(3)) for _ in range(6000)
+})
+
+QUERIES = ["carbon tax", "election scandal inquiry", "housing", "immig", "farmers protest delhi"]
+
+
+def _word(rng):
+    roll = rng.random()
+    if roll < 0.03:
+        return rng.choice(WORDS)
+    if roll < 0.4:
+        return rng.choice(FILLER)
+    return rng.choice(VOCABULARY)
+
+
+def _sentence(rng, words):
+    return " ".join(_word(rng) for _ in range(words)).capitalize()
+
+
+def _seed(db, first, rows, rng, batch=5000):
+    for start in range(first, rows, batch):
+        db.execute(ContentItem.__table__.insert(), [
+            {"external_id": f"e{n}", "title": _sentence(rng, 10), "summary": _sentence(rng, 40),
+             "url": f"https://example.com/{n}"}
+            for n in range(start, min(rows, start + batch))
+        ])
+        db.commit()
+
+
+def _time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bench(sizes, limit, repeat):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        seeded = 0
+        print(f"{'rows':>9}  {'query':<26} {'ILIKE ms':>9} {'FTS5 ms':>8} {'matches':>8}")
+        for size in sizes:
+            _seed(db, seeded, size, rng)
+            seeded = size
+            for q in QUERIES:
+                search = f"%{q}%"
+
+                def ilike():
+                    return db.query(ContentItem).filter(
+                        (ContentItem.title.ilike(search)) | (ContentItem.summary.ilike(search))
+                    ).order_by(ContentItem.timestamp.desc()).limit(limit).all()
+
+                def fts():
+                    return apply_search(db.query(ContentItem), q, "sqlite").limit(limit).all()
+
+                matches = apply_search(db.query(ContentItem.id), q, "sqlite", rank=False).count()
+                print(f"{size:>9,}  {q:<26} {_time(ilike, repeat):>9.1f} {_time(fts, repeat):>8.1f} {matches:>8,}")
+                db.expunge_all()
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search latency of ILIKE scans vs the FTS5 index as content_items grows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    bench(args.sizes, args.limit, args.repeat)
@@ -1,33 +1,49 @@
+import argparse
+from datetime import datetime, timedelta
 from app.database import SessionLocal
 from app.models import ContentItem
+from app.analysis.bulk import BulkItemUpdater, stream_items
 from app.analysis.clustering import TopicClusterer
+from app.response_cache import ITEMS, bump_versions
 
-def cluster_top_items():
+def cluster_top_items(full_history: bool = False, batch_size: int = 1000):
     db = SessionLocal()
     clusterer = TopicClusterer()
     
-    # Fetch items from the last 24 hours to ensure we can select the top ones
-    from datetime import datetime, timedelta
-    since = datetime.now() - timedelta(hours=24)
-    items = db.query(ContentItem).filter(ContentItem.timestamp >= since).all()
+    if full_history:
+        where = None
+    else:
+        # Items from the last 24 hours, plus the top 100 overall just in case
+        since = datetime.now() - timedelta(hours=24)
+        top_ids = [
+            item_id for (item_id,) in
+            db.query(ContentItem.id).order_by(ContentItem.controversy_score.desc()).limit(100)
+        ]
+        where = (ContentItem.timestamp >= since) | ContentItem.id.in_(top_ids)
     
-    # Also fetch top 100 overall just in case
-    top_items = db.query(ContentItem).order_by(ContentItem.controversy_score.desc()).limit(100).all()
+    print(f"Clustering {'all' if full_history else 'recent and top'} items...")
     
-    # Combine (unique)
-    all_to_process = {item.id: item for item in items + top_items}.values()
-    
-    print(f"Clustering {len(all_to_process)} items...")
-    
-    for item in list(all_to_process):
-        old_cluster = item.cluster_id
-        item.cluster_id = clusterer.categorize(item.title, item.summary)
-        if old_cluster != item.cluster_id:
-            print(f"Item: {item.title[:50]}... -> Cluster: {item.cluster_id}")
+    processed = 0
+    with BulkItemUpdater(db, chunk_size=batch_size) as updater:
+        for rows in stream_items(
+            db, ContentItem.id, ContentItem.title, ContentItem.summary, ContentItem.cluster_id,
+            where=where, batch_size=batch_size
+        ):
+            assignments = clusterer.assign_clusters(db, rows, updater)
+            processed += len(rows)
+            if not full_history:
+                for row in rows:
+                    if row.cluster_id != assignments[row.id]:
+                        print(f"Item: {row.title[:50]}... -> Cluster: {assignments[row.id]}")
     
     db.commit()
-    print("Clustering complete.")
+    bump_versions(ITEMS)
+    print(f"Clustering complete. {processed} items processed, {updater.updated} reassigned.")
     db.close()
 
 if __name__ == "__main__":
-    cluster_top_items()
+    parser = argparse.ArgumentParser(description="Assign topic clusters to content items.")
+    parser.add_argument("--all", action="store_true", help="Re-cluster the full history instead of the last 24h + top 100")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    cluster_top_items(full_history=args.all, batch_size=args.batch_size)
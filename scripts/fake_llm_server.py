@@ -0,0 +1,209 @@
+import argparse
+import collections
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def summary_responder(request: dict) -> str:
+    prompt = request["messages"][-1]["content"]
+    return f"Fake summary of: {prompt[-80:]}"
+
+
+def package_responder(request: dict) -> str:
+    """
+    Mock package JSON for ContentEngine prompts: the whole package, or just
+    the section a per-section prompt asks for.
+    """
+    from app.analysis.commentary import ContentEngine
+    data = ContentEngine(api_key=None)._get_mock_package_data("Test Topic")
+    section = re.search(r'single key "(\w+)"', request["messages"][-1]["content"])
+    if section:
+        data = {section.group(1): data[section.group(1)]}
+    return json.dumps(data)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """
+    Minimal OpenAI-compatible POST /v1/chat/completions.
+
+    The server's `latency` delays every answer, plus `token_latency` per
+    output token (about four characters), so long answers take longer like a
+    real model's. `rate_limit` (requests per second, sliding one-second
+    window) answers 429 with Retry-After once exceeded, and
+    `responder(request) -> str` produces the message content.
+    With "stream": true the content is sent as server-sent chunks and the
+    latency is spread evenly across them, as a token stream would be.
+    """
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+
+        retry_after = server.admit()
+        if retry_after is not None:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Retry-After", f"{retry_after:.3f}")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        with server.track():
+            self._answer(request)
+
+    def _answer(self, request: dict):
+        server = self.server
+        content = server.responder(request)
+        usage = server.record_usage(request, content)
+        if request.get("stream"):
+            self._stream(request, content)
+            return
+
+        time.sleep(server.generation_time(content))
+        body = json.dumps({
+            "id": f"chatcmpl-fake{server.completed}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.completed += 1
+
+    def _stream(self, request: dict, content: str):
+        server = self.server
+        pieces = [content[i:i + server.chunk_size] for i in range(0, len(content), server.chunk_size)] or [""]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def send(delta: dict, finish_reason=None):
+            chunk = {
+                "id": f"chatcmpl-fake{server.completed}", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        for piece in pieces:
+            time.sleep(server.generation_time(content) / len(pieces))
+            send({"content": piece})
+        send({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        with server.lock:
+            server.completed += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connects from larger worker
+    # pools, which then stall for a 1s SYN retry
+    request_queue_size = 128
+
+    def __init__(self, address, latency: float = 0.0, rate_limit: float = None, responder=summary_responder,
+                 chunk_size: int = 16, token_latency: float = 0.0):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chunk_size = chunk_size
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.rate_limit = rate_limit
+        self.responder = responder
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self._recent = collections.deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0  # Most requests answered at once (after admission)
+
+    def generation_time(self, content: str) -> float:
+        return self.latency + self.token_latency * _tokens(content)
+
+    def record_usage(self, request: dict, content: str) -> dict:
+        prompt = _tokens("".join(message.get("content") or "" for message in request.get("messages", [])))
+        completion = _tokens(content)
+        with self.lock:
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    @contextmanager
+    def track(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def admit(self):
+        """
+        Returns None if the request may proceed, else seconds until a slot frees up.
+        """
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            while self._recent and self._recent[0] <= now - 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.rejected += 1
+                return self._recent[0] + 1.0 - now
+            self._recent.append(now)
+            return None
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def start_fake_llm_server(port: int = 0, latency: float = 0.0, rate_limit: float = None, responder=summary_responder,
+                          token_latency: float = 0.0):
+    """
+    Starts the fake server on a background thread and returns (server, base_url),
+    where base_url is what OpenAI(base_url=...) expects.
+    """
+    server = FakeLLMServer(("127.0.0.1", port), latency=latency, rate_limit=rate_limit, responder=responder,
+                           token_latency=token_latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible chat completions server.")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before answering 429")
+    args = parser.parse_args()
+    server, base_url = start_fake_llm_server(args.port, args.latency, args.rate_limit)
+    print(f"Fake LLM server running at {base_url} (OPENAI_BASE_URL), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
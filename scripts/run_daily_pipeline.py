@@ -1,67 +1,40 @@
+import argparse
 import sys
 import os
-from sqlalchemy.orm import Session
 from app.database import SessionLocal, init_db
-from app.ingestion.rss import fetch_rss_feeds
-from app.ingestion.reddit import fetch_reddit_content
-from app.analysis.ranker import ContentRanker
-from app.analysis.clustering import TopicClusterer
-from app.analysis.commentary import ContentEngine
-from app.analysis.enrichment import EnrichmentService
-from app.models import ContentItem
+from app.pipeline import DAILY_STAGES, PipelineRunner
 
-def run_daily_pipeline():
+def run_daily_pipeline(profile: str = None, stages=None, resume: bool = True):
+    """
+    Runs the daily stages (ingest, rank, enrich, cluster, generate) through
+    the run ledger (app.pipeline): if the last run failed, only its failed
+    and remaining stages run. `stages` runs just those. Stage timings and
+    metrics go to a JSON run report (app.metrics.RunReport); `profile`
+    ("cprofile" or "pyinstrument") also captures a profile of the run.
+    """
     print("=== HANS SAYS DAILY PIPELINE STARTED ===")
     init_db()
-    db = SessionLocal()
-    
     try:
-        # STEP 1: Ingest
-        print("[1/4] Ingesting sources...")
-        fetch_rss_feeds(db)
-        fetch_reddit_content(db)
-        
-        # STEP 2 & 3: Score and Rank
-        print("[2/4] Scoring and ranking controversy/engagement...")
-        ranker = ContentRanker(db)
-        ranker.calculate_final_scores()
-
-        print("[2.5/4] Enriching items (Paywall & Summary pass)...")
-        enricher = EnrichmentService()
-        enricher.enrich_batch(db)
-        
-        # STEP 4: Cluster and Select
-        print("[3/4] Clustering and selecting top topics...")
-        clusterer = TopicClusterer()
-        # Fetch top items for clustering
-        items = db.query(ContentItem).order_by(ContentItem.final_score.desc()).limit(100).all()
-        clusterer.cluster_items(items)
-        db.commit()
-        
-        top_clusters = clusterer.select_top_clusters(items, n=2)
-        print(f"Selected topics: {', '.join(top_clusters)}")
-        
-        # STEP 5-16: Generate Full Packages
-        print("[4/4] Generating output packages...")
-        engine = ContentEngine()
-        for cluster_id in top_clusters:
-            print(f"  - Generating package for: {cluster_id}")
-            package = engine.generate_full_package(db, cluster_id)
-            if package:
-                print(f"    SUCCESS: Package created for {cluster_id}")
-            else:
-                print(f"    FAILED: Could not create package for {cluster_id}")
-                
-        print("=== PIPELINE COMPLETED SUCCESSFULLY ===")
-        
+        run = PipelineRunner(SessionLocal, "daily_pipeline", DAILY_STAGES).run(
+            only=stages, resume=resume, profile=profile
+        )
+        print(f"=== PIPELINE COMPLETED SUCCESSFULLY (run {run['id']}) ===")
+        return run
     except Exception as e:
         print(f"!!! PIPELINE FAILED: {e}")
+        print("Run it again to resume from the failed stage.")
         import traceback
         traceback.print_exc()
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     # Add project root to path
     sys.path.append(os.getcwd())
-    run_daily_pipeline()
+    parser = argparse.ArgumentParser(description="Run the daily ingestion-to-package pipeline once.")
+    parser.add_argument("--stage", action="append", choices=[name for name, _, _ in DAILY_STAGES],
+                        help="Run only this stage (repeatable), even if it is done")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Start a new run instead of resuming a failed one")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                        help="Capture a profile of the run next to its run report")
+    args = parser.parse_args()
+    run_daily_pipeline(profile=args.profile, stages=args.stage, resume=not args.fresh)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Stub Feed {feed}</title>
+{items}
+</channel></rss>"""
+
+RSS_ITEM = """<item><title>{title}</title><link>http://stub.local/{feed}/{n}</link>
+<description>Stub summary {n} for feed {feed} about the federal budget.</description>
+<pubDate>{pub}</pubDate></item>"""
+
+
+# Fixed per process so repeated polls return byte-identical bodies.
+PUBLISHED = time.gmtime()
+
+
+def render_rss(feed: str, entries: int = 20) -> str:
+    pub = time.strftime("%a, %d %b %Y %H:%M:%S +0000", PUBLISHED)
+    items = "\n".join(
+        RSS_ITEM.format(feed=feed, n=n, title=f"Feed {feed} story {n} on policy reform", pub=pub)
+        for n in range(entries)
+    )
+    return RSS_TEMPLATE.format(feed=feed, items=items)
+
+
+def render_reddit(sub: str, posts: int = 20) -> str:
+    children = [{
+        "data": {
+            "id": f"{sub}{n}", "title": f"r/{sub} thread {n} about the election",
+            "selftext": "", "is_self": False, "url": f"http://stub.local/{sub}/{n}",
+            "permalink": f"/r/{sub}/comments/{n}", "ups": 100 + n, "num_comments": n,
+            "upvote_ratio": 0.9, "created_utc": time.mktime(PUBLISHED),
+        }
+    } for n in range(posts)]
+    return json.dumps({"data": {"children": children}})
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+    """
+    Serves /rss/<name> and /r/<name>/hot.json. `?delay=<seconds>` simulates a
+    slow publisher so the fetch stage can be benchmarked without the internet.
+    Responses carry an ETag and honour If-None-Match unless `?etag=0`.
+    """
+    def do_GET(self):
+        with self.server.track():
+            self._get()
+
+    def _get(self):
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        delay = float(params.get("delay", ["0"])[0])
+        if delay:
+            time.sleep(delay)
+
+        parts = [p for p in parsed.path.split("/") if p]
+        if parts and parts[0] == "r":
+            body, content_type = render_reddit(parts[1]), "application/json"
+        else:
+            body, content_type = render_rss(parts[-1] if parts else "root"), "application/rss+xml"
+
+        payload = body.encode("utf-8")
+        send_etag = params.get("etag", ["1"])[0] != "0"
+        etag = '"' + hashlib.sha1(payload).hexdigest()[:16] + '"'
+        if send_etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if send_etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Counts the requests being served at once (peak_in_flight), so tests can
+    check fetch concurrency without timing it.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @contextmanager
+    def track(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline hang up mid-response; that's expected here.
+        pass
+
+
+def start_stub_server(port: int = 0, handler=StubFeedHandler):
+    """
+    Starts the stub server on a background thread and returns (server, base_url).
+    Binds all interfaces so 127.0.0.x aliases act as distinct hosts.
+    """
+    server = StubServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, base_url = start_stub_server(8081)
+    print(f"Stub feed server running at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,27 +1,41 @@
+import argparse
 from app.database import SessionLocal
 from app.models import ContentItem
+from app.analysis.bulk import BulkItemUpdater, stream_items
 from app.analysis.controversy import ControversyAnalyzer
-import json
+from app.analysis.sentiment import SentimentCache
+from app.response_cache import ITEMS, bump_versions
 
-def update_scores():
+def update_scores(batch_size: int = 1000):
     db = SessionLocal()
-    analyzer = ControversyAnalyzer()
+    sentiment = SentimentCache(db)
+    analyzer = ControversyAnalyzer(sentiment)
     
-    items = db.query(ContentItem).all()
-    print(f"Updating scores for {len(items)} items...")
+    print("Updating controversy scores for all items...")
     
-    updated_count = 0
-    for item in items:
-        # Re-analyze based on title and summary
-        new_score = analyzer.analyze(item.title, item.summary)
-        
-        if item.controversy_score != new_score:
-            item.controversy_score = new_score
-            updated_count += 1
+    processed = 0
+    with BulkItemUpdater(db, chunk_size=batch_size) as updater:
+        for rows in stream_items(
+            db, ContentItem.id, ContentItem.title, ContentItem.summary, ContentItem.controversy_score,
+            batch_size=batch_size
+        ):
+            sentiment.prefetch(f"{row.title} {row.summary or ''}".lower() for row in rows)
+            for row in rows:
+                # Re-analyze based on title and summary
+                new_score = analyzer.analyze(row.title, row.summary)
+                if row.controversy_score != new_score:
+                    updater.add(row.id, controversy_score=new_score)
+            sentiment.flush()
+            processed += len(rows)
             
     db.commit()
+    if updater.updated:
+        bump_versions(ITEMS)
     db.close()
-    print(f"Successfully updated {updated_count} items.")
+    print(f"Successfully updated {updater.updated} of {processed} items ({sentiment.misses} texts analyzed, {sentiment.hits} cached).")
 
 if __name__ == "__main__":
-    update_scores()
+    parser = argparse.ArgumentParser(description="Recompute controversy_score for every stored item.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    update_scores(batch_size=args.batch_size)
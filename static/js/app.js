@@ -24,7 +24,11 @@ document.addEventListener('DOMContentLoaded', () => {
         admin: () => renderAdmin()
     };
 
+    let currentView = null;
+
     async function navigate(view) {
+        currentView = view;
+        feed = null;
         navItems.forEach(item => {
             item.classList.remove('active');
             if (item.dataset.view === view) item.classList.add('active');
@@ -192,32 +196,40 @@ document.addEventListener('DOMContentLoaded', () => {
             search: document.getElementById('feed-search')?.value || query
         };
 
+        let url = `/items?limit=100`;
+        if (state.source !== 'all') url += `&source_type=${state.source}`;
+        if (state.used === 'unused') url += `&used=false`;
+        if (state.search) url += `&q=${encodeURIComponent(state.search)}`;
+
+        streamsContainer.innerHTML = '';
+        feed = { container: streamsContainer, state, cards: new Map() };
+        await loadFeedPage(streamsContainer, url, state);
+        if (streamsContainer.children.length === 0) {
+            streamsContainer.innerHTML = '<div class="placeholder-text">No items match your filters.</div>';
+        }
+    }
+
+    // Appends one page of the feed, plus a "Load more" button while the listing has more pages
+    async function loadFeedPage(streamsContainer, url, state, cursor = null) {
         try {
-            let url = `/items?limit=100`;
-            if (state.source !== 'all') url += `&source_type=${state.source}`;
-            if (state.used === 'unused') url += `&used=false`;
-            if (state.search) url += `&q=${encodeURIComponent(state.search)}`;
-
-            const res = await fetch(url);
-            let items = await res.json();
-
-            // Client-side filtering
-            items = items.filter(item => {
-                if (item.final_score < state.minScore) return false;
-                if (state.signal) {
-                    const signals = calculateSignals(item);
-                    if (!signals[state.signal]) return false;
-                }
-                return true;
-            });
+            const res = await fetch(cursor ? `${url}&cursor=${encodeURIComponent(cursor)}` : url);
+            const page = await res.json();
 
-            streamsContainer.innerHTML = '';
-            if (items.length === 0) {
-                streamsContainer.innerHTML = '<div class="placeholder-text">No items match your filters.</div>';
-            } else {
-                items.forEach(item => {
-                    streamsContainer.appendChild(createCard(item));
-                });
+            const items = page.items.filter(item => matchesFeed(item, state));
+
+            items.forEach(item => {
+                streamsContainer.appendChild(feedCard(item));
+            });
+            if (page.next_cursor) {
+                const more = document.createElement('button');
+                more.className = 'btn-secondary';
+                more.style = "width:100%; justify-content:center; margin-top:10px;";
+                more.innerHTML = '<i data-lucide="chevrons-down"></i><span>Load more</span>';
+                more.onclick = async () => {
+                    more.remove();
+                    await loadFeedPage(streamsContainer, url, state, page.next_cursor);
+                };
+                streamsContainer.appendChild(more);
             }
             if (typeof lucide !== 'undefined') lucide.createIcons();
         } catch (error) {
@@ -226,6 +238,22 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Client-side filtering
+    function matchesFeed(item, state) {
+        if (item.final_score < state.minScore) return false;
+        if (state.signal) {
+            const signals = calculateSignals(item);
+            if (!signals[state.signal]) return false;
+        }
+        return true;
+    }
+
+    function feedCard(item) {
+        const card = createCard(item);
+        if (feed) feed.cards.set(item.id, { item, card });
+        return card;
+    }
+
     async function handleAddStream() {
         const topic = prompt("Enter a topic to watch:");
         if (!topic) return;
@@ -246,12 +274,14 @@ document.addEventListener('DOMContentLoaded', () => {
             </div>
         `;
 
+        div.dataset.itemId = item.id;
         div.innerHTML = `
             <div class="card-tags">
                 <span class="card-tag ${item.source_type === 'news' ? 'tag-news' : 'tag-reddit'}">${item.source_type.toUpperCase()}</span>
                 ${item.used_for_content ? '<span class="status-chip active">USED</span>' : ''}
             </div>
             <div class="card-title">${item.title}</div>
+            ${item.snippet ? `<div class="card-snippet" style="font-size:12px; opacity:0.7; margin-top:6px;">${item.snippet}</div>` : ''}
             <div style="display:flex; gap:8px; margin-top:8px;">
                 ${UI.scoreBadge('hash', item.controversy_score.toFixed(1))}
                 ${UI.scoreBadge('final', item.final_score.toFixed(1))}
@@ -276,12 +306,21 @@ document.addEventListener('DOMContentLoaded', () => {
         };
     }
 
-    function openDetailDrawer(item) {
+    async function openDetailDrawer(item) {
         const drawer = document.getElementById('detail-drawer');
         const emptyMsg = document.getElementById('detail-empty');
         const content = document.getElementById('detail-content');
         if (!drawer || !content) return;
 
+        // List items carry a shortened summary; the drawer shows the full one
+        try {
+            const res = await fetch(`/items/${item.id}`);
+            const detail = await res.json();
+            if (!detail.error) item = { ...item, ...detail, snippet: item.snippet };
+        } catch (e) {
+            console.error('Error fetching item:', e);
+        }
+
         emptyMsg.style.display = 'none';
         content.style.display = 'block';
         drawer.classList.add('active');
@@ -327,12 +366,21 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Studio Logic
     async function renderStudio() {
+        await loadQueue();
+
+        if (window.preSelectedCluster) {
+            loadTopicPackage(window.preSelectedCluster);
+            window.preSelectedCluster = null;
+        }
+    }
+
+    async function loadQueue() {
         const queueList = document.getElementById('queue-list');
         if (!queueList) return;
 
         try {
-            const res = await fetch('/items?used=true&limit=10');
-            const items = await res.json();
+            const res = await fetch('/items?used=true&limit=10&fields=id,title,cluster_id');
+            const items = (await res.json()).items;
             queueList.innerHTML = '';
             if (items.length === 0) {
                 queueList.innerHTML = '<div class="placeholder-text">Queue is empty.</div>';
@@ -352,15 +400,14 @@ document.addEventListener('DOMContentLoaded', () => {
         } catch (e) {
             console.error('Failed to load queue:', e);
         }
-
-        if (window.preSelectedCluster) {
-            loadTopicPackage(window.preSelectedCluster);
-            window.preSelectedCluster = null;
-        }
     }
 
+    let currentCluster = null;
+    const generating = new Set();
+
     async function loadTopicPackage(clusterId) {
         if (!clusterId) return;
+        currentCluster = clusterId;
         const studioEmpty = document.getElementById('studio-empty');
         const cockpitContainer = document.getElementById('platform-rows-container');
         if (studioEmpty) studioEmpty.style.display = 'none';
@@ -397,16 +444,110 @@ document.addEventListener('DOMContentLoaded', () => {
         const cockpitContainer = document.getElementById('platform-rows-container');
         if (cockpitContainer) cockpitContainer.innerHTML = '<div class="loading-shimmer"></div>';
 
+        // Sections are rendered as the stream delivers them; the persisted package is loaded on "done".
+        const pkg = { cluster_id: clusterId, date: new Date().toISOString() };
+        const progress = document.createElement('div');
+        progress.className = 'placeholder-text';
+        progress.textContent = 'Generating...';
+        let tokens = 0;
+        let sections = 0;
+
+        const handleEvent = (event) => {
+            if (event.event === 'token') {
+                tokens++;
+                progress.textContent = `Generating... ${sections} sections, ${tokens} tokens`;
+            } else if (event.event === 'section') {
+                sections++;
+                Object.assign(pkg, event.fields);
+                if (event.section === 'canonical') {
+                    renderCockpitHeader(clusterId, pkg);
+                } else {
+                    renderPlatformRows(pkg);
+                    cockpitContainer.prepend(progress);
+                }
+            } else if (event.event === 'done') {
+                loadTopicPackage(clusterId);
+            } else if (event.event === 'error') {
+                throw new Error(event.message);
+            }
+        };
+
+        generating.add(clusterId);
         try {
-            await fetch(`/topics/${clusterId}/generate_full_package`, { method: 'POST' });
-            loadTopicPackage(clusterId);
+            const res = await fetch(`/topics/${clusterId}/generate_full_package/stream`, { method: 'POST' });
+            if (cockpitContainer) cockpitContainer.prepend(progress);
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+            }
+            if (buffer.trim()) handleEvent(JSON.parse(buffer));
         } catch (e) {
             console.error('Generation Error:', e);
             alert('An error occurred during generation.');
+        } finally {
+            generating.delete(clusterId);
         }
     }
     window.generateFullPackage = generateFullPackage;
 
+    // Generation endpoints answer with a job id; the job is fetched once /events reports it finished.
+    // The initial check covers a job that finished before we listened, the slow poll a dropped connection.
+    function waitForJob(jobId, fallbackMs = 15000) {
+        return new Promise((resolve, reject) => {
+            let timer = null;
+            const finish = (settle, value) => {
+                events.removeEventListener('job', onJob);
+                clearInterval(timer);
+                settle(value);
+            };
+            const check = async () => {
+                try {
+                    const res = await fetch(`/jobs/${jobId}`);
+                    const job = await res.json();
+                    if (job.error && !job.status) finish(reject, new Error(job.error));
+                    else if (job.status === 'done' || job.status === 'failed') finish(resolve, job);
+                } catch (e) {
+                    finish(reject, e);
+                }
+            };
+            const onJob = (e) => {
+                if (JSON.parse(e.data).job_id === jobId) check();
+            };
+            events.addEventListener('job', onJob);
+            timer = setInterval(check, fallbackMs);
+            check();
+        });
+    }
+
+    async function regenerateSection(clusterId, section) {
+        if (!clusterId || !section) return;
+        try {
+            const res = await fetch(`/topics/${clusterId}/package/sections/${section}/regenerate`, { method: 'POST' });
+            const submitted = await res.json();
+            if (submitted.error) {
+                alert(submitted.error);
+                return;
+            }
+            const job = await waitForJob(submitted.job_id);
+            if (job.status === 'failed') {
+                alert(job.error || 'Regeneration failed.');
+                return;
+            }
+            renderPlatformRows(job.result);
+        } catch (e) {
+            console.error('Section Regeneration Error:', e);
+            alert('An error occurred during regeneration.');
+        }
+    }
+    window.regenerateSection = regenerateSection;
+
     function renderCockpitHeader(clusterId, pkg) {
         const container = document.getElementById('studio-header-container');
         if (!container) return;
@@ -431,9 +572,9 @@ document.addEventListener('DOMContentLoaded', () => {
         container.innerHTML = '';
 
         const platforms = [
-            { id: 'facebook', name: 'Facebook Page', icon: 'facebook' },
-            { id: 'instagram', name: 'Instagram Reels', icon: 'instagram' },
-            { id: 'twitter', name: 'X (Twitter)', icon: 'twitter' }
+            { id: 'facebook', name: 'Facebook Page', icon: 'facebook', section: 'facebook_page_post' },
+            { id: 'instagram', name: 'Instagram Reels', icon: 'instagram', section: 'instagram_reel' },
+            { id: 'twitter', name: 'X (Twitter)', icon: 'twitter', section: 'x_post' }
         ];
 
         platforms.forEach(p => {
@@ -449,7 +590,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         <i data-lucide="${p.icon}"></i>
                         <strong>${p.name}</strong>
                     </div>
-                    <button class="btn-primitive" onclick="generateFullPackage('${pkg.cluster_id}')"><i data-lucide="refresh-cw"></i></button>
+                    <button class="btn-primitive" title="Regenerate ${p.name} only" onclick="regenerateSection('${pkg.cluster_id}', '${p.section}')"><i data-lucide="refresh-cw"></i></button>
                 </div>
                 <div class="platform-row-content">
                     <div class="validation-banner-container">${UI.validationBanner(res)}</div>
@@ -515,6 +656,52 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    /* --- Live Updates (/events) --- */
+    let feed = null;  // The dashboard listing on screen: { container, state, cards: Map(id -> { item, card }) }
+    const events = new EventSource('/events');
+
+    events.addEventListener('items', (e) => {
+        // New items belong at the top of the default newest-first listing only
+        if (currentView !== 'dashboard' || !feed || feed.state.search) return;
+        const items = JSON.parse(e.data).items
+            .filter(item => feed.state.source === 'all' || item.source_type === feed.state.source)
+            .filter(item => matchesFeed(item, feed.state) && !feed.cards.has(item.id))
+            .sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
+        if (items.length === 0) return;
+        feed.container.querySelector('.placeholder-text')?.remove();
+        items.forEach(item => feed.container.prepend(feedCard(item)));
+        if (typeof lucide !== 'undefined') lucide.createIcons();
+    });
+
+    events.addEventListener('scores', (e) => {
+        if (currentView !== 'dashboard' || !feed) return;
+        JSON.parse(e.data).scores.forEach(([id, finalScore, controversyScore]) => {
+            const entry = feed.cards.get(id);
+            if (!entry) return;
+            entry.item.final_score = finalScore;
+            entry.item.controversy_score = controversyScore;
+            entry.card.querySelector('.score-badge.final span').textContent = finalScore.toFixed(1);
+            entry.card.querySelector('.score-badge.hash span').textContent = controversyScore.toFixed(1);
+        });
+    });
+
+    events.addEventListener('package', (e) => {
+        if (currentView !== 'studio') return;
+        const { cluster_id } = JSON.parse(e.data);
+        loadQueue();
+        // A generation streamed from this tab reloads the package itself
+        if (cluster_id === currentCluster && !generating.has(cluster_id)) loadTopicPackage(cluster_id);
+    });
+
+    // Events were missed (reconnect after a restart, or this tab fell behind): reload what is on screen
+    events.addEventListener('resync', () => {
+        if (currentView === 'dashboard') renderDashboard();
+        else if (currentView === 'studio') {
+            loadQueue();
+            if (currentCluster) loadTopicPackage(currentCluster);
+        } else if (currentView === 'admin') renderAdmin();
+    });
+
     // Global Listeners
     document.addEventListener('click', (e) => {
         if (e.target.classList.contains('pill')) {
@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem
+from app.analysis.bulk import BulkItemUpdater, stream_items
+from app.analysis.clustering import TopicClusterer
+
+
+def test_streamed_cluster_assignment_matches_orm_path(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    titles = ["Border asylum claims rise", "Police arrest suspect", "Trudeau meets Modi at summit", "Local bakery opens"]
+    db.execute(ContentItem.__table__.insert(), [
+        {"external_id": f"e{n}", "title": titles[n % 4], "summary": "", "cluster_id": "crime" if n % 5 == 0 else None}
+        for n in range(250)
+    ])
+    db.commit()
+
+    clusterer = TopicClusterer()
+    expected = {item.id: clusterer.categorize(item.title, item.summary) for item in db.query(ContentItem)}
+    changed = sum(1 for item in db.query(ContentItem) if item.cluster_id != expected[item.id])
+
+    batches = 0
+    with BulkItemUpdater(db, chunk_size=40) as updater:
+        for rows in stream_items(db, ContentItem.id, ContentItem.title, ContentItem.summary, ContentItem.cluster_id, batch_size=64):
+            batches += 1
+            clusterer.assign_clusters(db, rows, updater)
+    db.commit()
+
+    assert batches == 4
+    assert 0 < changed < 250 and updater.updated == changed
+    assert {item.id: item.cluster_id for item in db.query(ContentItem)} == expected
+
+    with pytest.raises(ValueError):
+        updater.add(1, title="not allowed")
@@ -0,0 +1,42 @@
+import time
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database import create_engines
+from app.models import Base, ContentItem
+
+
+def test_sqlite_engines_use_wal_and_a_read_only_pool(tmp_path):
+    write_engine, read_engine = create_engines(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=write_engine)
+    with write_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+    reader = sessionmaker(bind=read_engine)()
+    with pytest.raises(OperationalError):
+        reader.execute(text("DELETE FROM content_items"))
+    reader.close()
+
+    # A writer commits while a reader holds an open read transaction
+    # (a rollback journal would make it wait out busy_timeout and fail)
+    reading = read_engine.raw_connection()
+    cursor = reading.cursor()
+    cursor.execute("BEGIN")
+    cursor.execute("SELECT count(*) FROM content_items").fetchall()
+    writer = sessionmaker(bind=write_engine)()
+    writer.add(ContentItem(external_id="a", title="Budget", url="u"))
+    started = time.perf_counter()
+    writer.commit()
+    assert time.perf_counter() - started < 1
+    assert cursor.execute("SELECT count(*) FROM content_items").fetchone()[0] == 0  # Its snapshot is unchanged
+    reading.rollback()
+    reading.close()
+    writer.close()
+
+
+def test_in_memory_database_shares_one_engine():
+    write_engine, read_engine = create_engines("sqlite://")
+    assert write_engine is read_engine
@@ -0,0 +1,92 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from app.analysis.dedup import NearDuplicateIndex
+from app.analysis.filters import FilterService
+
+
+def test_index_matches_exact_jaccard_loop():
+    rng = random.Random(7)
+    vocabulary = [f"w{n}" for n in range(300)]
+    window = [" ".join(rng.sample(vocabulary, rng.randint(5, 12))) for _ in range(300)]
+    probes = []
+    for title in window[:60]:
+        words = title.split()
+        words[0] = "changed"
+        probes.append(" ".join(words))
+    probes += [" ".join(rng.sample(vocabulary, 8)) for _ in range(60)]
+
+    index = NearDuplicateIndex(threshold=0.7)
+    for item_id, title in enumerate(window, start=1):
+        index.add(item_id, index.signature(title))
+
+    filter_service = FilterService()
+    for probe in probes:
+        expected = any(filter_service.jaccard_similarity(probe, t) > 0.7 for t in window)
+        assert index.is_duplicate(probe) == expected
+
+
+def test_expire_slides_the_window():
+    index = NearDuplicateIndex()
+    now = datetime.now()
+    index.add(1, index.signature("Trudeau announces new housing budget"), now - timedelta(hours=30))
+    index.add(2, index.signature("Modi visits Ottawa for trade summit"), now - timedelta(hours=2))
+
+    assert index.is_duplicate("Trudeau announces new housing budget today")
+    assert index.expire(now - timedelta(hours=24)) == 1
+    assert not index.is_duplicate("Trudeau announces new housing budget today")
+    assert index.is_duplicate("Modi visits Ottawa for trade summit talks")
+
+
+def test_refresh_persists_and_reuses_signatures():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import Base, ContentItem, TitleSignature
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(ContentItem(external_id="a", title="Poilievre questions carbon tax rebate", timestamp=datetime.now()))
+    db.add(ContentItem(external_id="b", title="Old story", timestamp=datetime.now() - timedelta(days=3)))
+    db.commit()
+
+    index = NearDuplicateIndex()
+    assert index.refresh(db) == 1
+    assert db.query(TitleSignature).count() == 1
+    assert index.is_duplicate("Poilievre questions the carbon tax rebate")
+
+    fresh = NearDuplicateIndex()
+    fresh.refresh(db)
+    assert fresh.is_duplicate("Poilievre questions the carbon tax rebate")
+
+    # The backfill was flushed into the caller's transaction, not committed
+    db.rollback()
+    assert db.query(TitleSignature).count() == 0
+    db.close()
+
+
+def test_lookups_are_safe_while_another_thread_updates_the_index():
+    index = NearDuplicateIndex()
+    now = datetime.now()
+    signatures = [index.signature(f"Carbon tax rebate vote number {n} in parliament") for n in range(200)]
+    probe = index.signature("Carbon tax rebate vote in the House of Commons")
+    stop, errors = threading.Event(), []
+
+    def churn():
+        try:
+            while not stop.is_set():
+                for item_id, signature in enumerate(signatures, start=1):
+                    index.add(item_id, signature, now - timedelta(hours=item_id % 2 * 30))
+                index.expire(now - timedelta(hours=24))
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(2000):
+            index.find_similar(probe)
+    finally:
+        stop.set()
+        writer.join()
+    assert not errors
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, ContentItem
+from app.analysis.enrichment import EnrichmentService
+from app.analysis.llm import LLMResponseCache
+from scripts.fake_llm_server import start_fake_llm_server
+
+
+def _session_with_items(count):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    db = factory()
+    db.execute(ContentItem.__table__.insert(), [
+        {"external_id": f"e{n}", "title": f"Headline {n}", "summary": "", "url": f"https://example.com/{n}"}
+        for n in range(count)
+    ] + [{"external_id": "fine", "title": "Complete", "summary": "x" * 80, "url": "https://example.com/fine"}])
+    db.commit()
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    return db, commits, LLMResponseCache(factory)
+
+
+def test_enrich_batch_runs_requests_concurrently_and_commits_once():
+    server, base_url = start_fake_llm_server(latency=0.2)
+    try:
+        db, commits, cache = _session_with_items(16)
+        service = EnrichmentService(api_key="test", base_url=base_url, max_workers=8, cache=cache)
+
+        assert service.enrich_batch(db) == 16
+        # Every worker had a request open at once, and never more than the pool
+        assert server.peak_in_flight == 8
+        assert len(commits) == 1
+        generated = db.query(ContentItem).filter(ContentItem.enrichment_status == "generated").all()
+        assert len(generated) == 16
+        assert all(item.summary.startswith("Fake summary of:") for item in generated)
+    finally:
+        server.shutdown()
+
+
+def test_rate_limited_requests_back_off_and_succeed():
+    server, base_url = start_fake_llm_server(latency=0.01, rate_limit=5)
+    try:
+        db, _, cache = _session_with_items(12)
+        service = EnrichmentService(api_key="test", base_url=base_url, max_workers=6, cache=cache)
+        service.llm.base_delay = 0.1
+
+        assert service.enrich_batch(db) == 12
+        assert db.query(ContentItem).filter(ContentItem.enrichment_status == "generated").count() == 12
+        assert server.rejected > 0 and service.llm.stats()["rate_limited"] == server.rejected
+    finally:
+        server.shutdown()
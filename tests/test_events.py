@@ -0,0 +1,82 @@
+import asyncio
+import json
+import threading
+from app.events import ITEMS, RESYNC, SCORES, EventBus, get_event_bus, publish_new_items
+from app.models import SourceType
+
+
+async def _frames(stream, count, timeout=2.0):
+    frames = []
+    while len(frames) < count:
+        frame = await asyncio.wait_for(stream.__anext__(), timeout)
+        if frame.startswith("id:"):
+            lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+            frames.append((int(lines["id"]), lines["event"], json.loads(lines["data"])))
+    return frames
+
+
+def test_events_published_from_other_threads_reach_each_subscriber():
+    async def run():
+        bus = EventBus(history=10, queue_size=10)
+        first, second = bus.subscribe(), bus.subscribe()
+        streams = [first.stream(keepalive_seconds=5), second.stream(keepalive_seconds=5)]
+        publisher = threading.Thread(target=lambda: [bus.publish(SCORES, {"scores": [[n, 1.0, 2.0]]}) for n in range(3)])
+        publisher.start()
+        publisher.join()
+        for stream in streams:
+            assert [(event_id, data["scores"][0][0]) for event_id, _, data in await _frames(stream, 3)] == [
+                (1, 0), (2, 1), (3, 2)
+            ]
+        assert bus.stats() == {"subscribers": 2, "last_event_id": 3}
+        for stream in streams:
+            await stream.aclose()
+        assert bus.stats()["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_reconnects_replay_missed_events_or_resync():
+    async def run():
+        bus = EventBus(history=3, queue_size=2)
+        for n in range(5):
+            bus.publish(ITEMS, {"n": n})
+        # Events 4 and 5 are still in the history
+        replay = bus.subscribe(last_event_id=3).stream(keepalive_seconds=5)
+        assert [(event_id, data["n"]) for event_id, _, data in await _frames(replay, 2)] == [(4, 3), (5, 4)]
+        # Event 2 has left the history; ids from before a restart are unknown
+        for last_event_id in (1, 99):
+            stale = bus.subscribe(last_event_id=last_event_id).stream(keepalive_seconds=5)
+            assert (await _frames(stale, 1))[0][1] == RESYNC
+            await stale.aclose()
+
+        # A subscriber that falls behind its queue gets one resync instead of the backlog
+        slow = bus.subscribe()
+        for n in range(3):
+            bus.publish(ITEMS, {"n": n})
+        await asyncio.sleep(0.05)
+        assert [kind for _, kind, _ in await _frames(slow.stream(keepalive_seconds=5), 1)] == [RESYNC]
+        await replay.aclose()
+
+    asyncio.run(run())
+
+
+def test_new_item_events_use_the_list_view():
+    async def run():
+        get_event_bus.cache_clear()
+        stream = get_event_bus().subscribe().stream(keepalive_seconds=5)
+        rows = [
+            {"external_id": f"e{n}", "source_type": SourceType.NEWS, "source_name": "Feed", "country": "Canada",
+             "title": f"Title {n}", "summary": "x" * 1000, "url": f"https://example.com/{n}",
+             "timestamp": "2026-03-01T12:00:00", "controversy_score": 3.0, "raw_json": "{}"}
+            for n in range(3)
+        ]
+        publish_new_items(rows, {"e0": 10, "e2": 12})
+        (_, kind, data), = await _frames(stream, 1)
+        assert kind == ITEMS and [item["id"] for item in data["items"]] == [10, 12]
+        item = data["items"][0]
+        assert item["source_type"] == "news" and len(item["summary"]) == 280 and "raw_json" not in item
+        assert item["final_score"] == 0.0 and item["used_for_content"] is False
+        await stream.aclose()
+        get_event_bus.cache_clear()
+
+    asyncio.run(run())
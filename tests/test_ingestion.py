@@ -0,0 +1,131 @@
+import pytest
+from app.ingestion.fetcher import FeedFetcher
+from scripts.stub_feed_server import start_stub_server
+
+
+def test_fetch_all_runs_feeds_concurrently():
+    server, base_url = start_stub_server()
+    port = server.server_address[1]
+    try:
+        jobs = [(n, f"http://127.0.0.{n + 1}:{port}/rss/f{n}?delay=0.4", {}) for n in range(5)]
+        results = FeedFetcher().fetch_all(jobs)
+
+        assert all(results[n].ok for n in range(5))
+        assert "<rss" in results[0].response.text
+        # One host each, so all five were downloading at once
+        assert server.peak_in_flight == 5
+    finally:
+        server.shutdown()
+
+
+def test_fetch_all_enforces_per_host_limit_and_deadline():
+    server, base_url = start_stub_server()
+    try:
+        jobs = [(n, f"{base_url}/rss/f{n}?delay=0.5", {}) for n in range(4)]
+        results = FeedFetcher(per_host_limit=1, deadline=1.2).fetch_all(jobs)
+
+        ok = [r for r in results.values() if r.ok]
+        failed = [r for r in results.values() if r.error is not None]
+        # One request at a time on a single host: only two fit inside the deadline.
+        assert server.peak_in_flight == 1
+        assert len(ok) == 2
+        assert len(failed) == 2 and all(isinstance(r.error, TimeoutError) for r in failed)
+    finally:
+        server.shutdown()
+
+
+def _memory_session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _poll(validators, url):
+    import requests
+    response = requests.get(url, headers=validators.conditional_headers(url), timeout=5)
+    if validators.is_unchanged(url, response):
+        return response, True
+    validators.remember(url, response)
+    return response, False
+
+
+def test_validator_store_skips_not_modified_and_identical_bodies():
+    from app.ingestion.http_cache import ValidatorStore
+
+    server, base_url = start_stub_server()
+    db = _memory_session()
+    try:
+        validators = ValidatorStore(db)
+        etag_url = f"{base_url}/rss/cached"
+        plain_url = f"{base_url}/rss/plain?etag=0"
+
+        first, skipped = _poll(validators, etag_url)
+        assert first.status_code == 200 and not skipped
+        second, skipped = _poll(validators, etag_url)
+        assert second.status_code == 304 and skipped
+
+        _, skipped = _poll(validators, plain_url)
+        assert not skipped
+        response, skipped = _poll(validators, plain_url)
+        # No validators from the server, but the body hash still matches.
+        assert response.status_code == 200 and skipped
+        db.commit()
+
+        stats = {s["url"]: s for s in ValidatorStore(db).stats()}
+        assert (stats[etag_url]["hits"], stats[etag_url]["misses"]) == (1, 1)
+        assert (stats[plain_url]["hits"], stats[plain_url]["misses"]) == (1, 1)
+
+        # Kept for callers that report an unchanged feed's entries (pull_feeds.py)
+        validators.remember(etag_url, first, snapshot=[{"title": "First"}])
+        db.commit()
+        assert ValidatorStore(db).snapshot(etag_url) == [{"title": "First"}]
+        assert ValidatorStore(db).snapshot(plain_url) is None
+    finally:
+        db.close()
+        server.shutdown()
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_writer_inserts_new_rows_and_refreshes_metrics(returning):
+    from datetime import datetime
+    from app.ingestion.writer import BulkItemWriter
+    from app.models import ContentItem, SourceType
+
+    db = _memory_session()
+    # Without executemany RETURNING (e.g. SQLite before 3.35) the writer falls back
+    db.get_bind().dialect.insert_executemany_returning = returning
+
+    def row(external_id, score):
+        return dict(
+            external_id=external_id, source_type=SourceType.REDDIT, source_name="r/test",
+            country="Canada", title=f"Post {external_id}", summary="", url=f"https://reddit.com/{external_id}",
+            timestamp=datetime.now(), engagement_metrics={"score": score, "num_comments": 1},
+            controversy_score=0.5, raw_json="{}"
+        )
+
+    writer = BulkItemWriter(db)
+    written = writer.upsert([row("a", 10), row("b", 20)], update_metrics=True)
+    db.commit()
+    assert set(written) == {"a", "b"}
+
+    existing = writer.existing_ids(["a", "b", "c"])
+    assert set(existing) == {"a", "b"}
+
+    rescored = row("a", 99)
+    rescored["controversy_score"] = 0.0
+    written = writer.upsert([rescored, row("c", 5)], update_metrics=True)
+    db.commit()
+    assert written["a"] == existing["a"] and "c" in written
+
+    item = db.query(ContentItem).filter(ContentItem.external_id == "a").one()
+    assert item.engagement_metrics["score"] == 99
+    # Only metrics are overwritten on conflict.
+    assert item.controversy_score == 0.5
+
+    # News rows are insert-only: conflicts are skipped and not returned.
+    assert writer.upsert([row("b", 1)]) == {}
+    db.close()
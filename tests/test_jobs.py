@@ -0,0 +1,95 @@
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, GenerationJob
+from app.jobs import JobQueue
+
+
+def _factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+class _SlowHandler:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, db, cluster_id, **params):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        if cluster_id == "broken":
+            raise ValueError("No items found for this topic")
+        return 42
+
+
+def _wait(queue, job_ids, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        jobs = [queue.get(job_id) for job_id in job_ids]
+        if all(job["status"] in ("done", "failed") for job in jobs):
+            return jobs
+        time.sleep(0.02)
+    raise AssertionError(f"jobs still pending: {jobs}")
+
+
+def test_identical_in_flight_jobs_are_deduplicated(tmp_path):
+    queue = JobQueue(_factory(tmp_path), handlers={"package": _SlowHandler(0.05)}, workers=1, poll_interval=0.05)
+
+    first, created = queue.submit("package", "Budget", use_cache=True)
+    again, created_again = queue.submit("package", "Budget", use_cache=True)
+    fresh, created_fresh = queue.submit("package", "Budget", use_cache=False)
+    assert created and not created_again and created_fresh
+    assert again["id"] == first["id"] and fresh["id"] != first["id"]
+
+    queue.start()
+    try:
+        _wait(queue, [first["id"], fresh["id"]])
+        # Finished jobs no longer absorb new submissions.
+        later, created_later = queue.submit("package", "Budget", use_cache=True)
+        assert created_later and later["id"] != first["id"]
+        _wait(queue, [later["id"]])
+    finally:
+        queue.stop()
+
+
+def test_workers_bound_concurrency_and_record_results(tmp_path):
+    handler = _SlowHandler(0.2)
+    queue = JobQueue(_factory(tmp_path), handlers={"package": handler}, workers=2, poll_interval=0.05)
+    queue.start()
+    try:
+        ids = [queue.submit("package", cluster)[0]["id"] for cluster in ("A", "B", "C", "D", "broken")]
+        jobs = _wait(queue, ids)
+    finally:
+        queue.stop()
+
+    assert handler.peak == 2
+    assert [job["status"] for job in jobs] == ["done"] * 4 + ["failed"]
+    assert all(job["result_id"] == 42 for job in jobs[:4])
+    assert jobs[-1]["error"] == "No items found for this topic"
+
+
+def test_jobs_interrupted_by_a_restart_are_requeued(tmp_path):
+    factory = _factory(tmp_path)
+    queue = JobQueue(factory, handlers={"package": _SlowHandler(0.01)}, workers=1, poll_interval=0.05)
+    job, _ = queue.submit("package", "Budget")
+    db = factory()
+    db.query(GenerationJob).update({"status": "running"})  # claimed by a process that then died
+    db.commit()
+    db.close()
+
+    restarted = JobQueue(factory, handlers={"package": _SlowHandler(0.01)}, workers=1, poll_interval=0.05)
+    restarted.start()
+    try:
+        [done] = _wait(restarted, [job["id"]])
+    finally:
+        restarted.stop()
+    assert done["status"] == "done" and done["attempts"] == 1
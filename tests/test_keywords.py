@@ -0,0 +1,44 @@
+import random
+import re
+from config import CONTROVERSIAL_TOPICS, STRONG_LANGUAGE, CLUSTER_KEYWORDS, POLITICAL_KEYWORDS
+from app.analysis.keywords import KeywordMatcher, get_keyword_matcher, CONTROVERSIAL_TOPICS as TOPICS, STRONG_LANGUAGE as STRONG
+
+
+def _random_texts(terms, count=300, seed=3):
+    rng = random.Random(seed)
+    noise = ["the", "a", "new", "report", "x", "foo-bar", "re", "ion", "s", ",", ".", "'s", "-", "2024"]
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(terms) if rng.random() < 0.3 else rng.choice(noise) for _ in range(rng.randint(3, 25))]
+        joiners = [rng.choice([" ", "", "-", ", "]) for _ in parts]
+        texts.append("".join(p + j for p, j in zip(parts, joiners)))
+    return texts
+
+
+def test_matcher_agrees_with_per_keyword_searches():
+    categories = {STRONG: STRONG_LANGUAGE, TOPICS: CONTROVERSIAL_TOPICS}
+    categories.update({f"cluster:{c}": ks for c, ks in CLUSTER_KEYWORDS.items()})
+    categories.update({f"political:{c}": ks for c, ks in POLITICAL_KEYWORDS.items()})
+    terms = [t for ts in categories.values() for t in ts] + ["election", "election meddling", "foreign", "foreign policy"]
+
+    matcher = get_keyword_matcher()
+    for text in _random_texts(terms):
+        text = text.lower()
+        hits = matcher.match(text)
+        for category, words in categories.items():
+            if category == TOPICS:
+                expected = [w for w in words if w.lower() in text]
+            else:
+                expected = [w.lower() for w in words if re.search(rf'\b{re.escape(w.lower())}\b', text)]
+            assert hits.get(category, []) == expected, (category, text)
+
+
+def test_overlapping_terms_and_title_restriction():
+    matcher = KeywordMatcher({"a": ["election", "election meddling", "meddling"], "b": ["elect"]}, substring_categories=["b"])
+    assert matcher.match("Election Meddling claims") == {"a": ["election", "election meddling", "meddling"], "b": ["elect"]}
+    assert matcher.match("elections") == {"b": ["elect"]}
+
+    title = "re-election"
+    hits = matcher.scan(title + " " + "meddling alleged")
+    assert matcher.terms(hits, "a", end=len(title)) == ["election"]
+    assert matcher.terms(hits, "a") == ["election", "election meddling", "meddling"]
@@ -0,0 +1,157 @@
+import json
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, ContentItem, LLMResponse, TopicPackage
+from app.analysis.commentary import PACKAGE_SECTIONS, ContentEngine
+from app.analysis.llm import LLMResponseCache
+from app.metrics import metrics
+from scripts.fake_llm_server import start_fake_llm_server, package_responder
+
+
+def _factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def test_repeated_package_generation_is_served_from_cache():
+    server, base_url = start_fake_llm_server(latency=0.5, responder=package_responder)
+    try:
+        factory = _factory()
+        db = factory()
+        db.add(ContentItem(external_id="a", title="Budget vote", summary="Parliament votes on the budget",
+                           url="https://example.com/a", cluster_id="Budget", final_score=1.0))
+        db.commit()
+        cache = LLMResponseCache(factory)
+        engine = ContentEngine(api_key="test", base_url=base_url, cache=cache)
+        before = metrics.snapshot()
+
+        first = engine.generate_full_package(db, "Budget")
+        calls = server.completed
+        second = engine.generate_full_package(db, "Budget")
+
+        assert calls >= 1
+        assert server.completed == calls
+        assert second.core_thesis == first.core_thesis
+        assert cache.stats()["hits"] == 1  # the stored angle is reused, the package is cached
+
+        engine.generate_full_package(db, "Budget", use_cache=False)
+        assert server.completed == calls + 1
+
+        grew = lambda series: metrics.snapshot().get(series, 0) - before.get(series, 0)
+        assert grew('llm_request_seconds_count{mode="complete",model="gpt-4o"}') == calls + 1
+        assert grew('llm_cache_hits_total{model="gpt-4o"}') == 1
+        assert grew('llm_tokens_total{kind="completion",model="gpt-4o"}') > 0
+    finally:
+        server.shutdown()
+
+
+def test_cache_expires_and_evicts_least_recently_used():
+    factory = _factory()
+    cache = LLMResponseCache(factory, ttl_hours=1, max_entries=2)
+
+    for key in ("a", "b"):
+        cache.put(key, "gpt-4o", key.upper(), latency_ms=100.0)
+    assert cache.get("a") == "A"
+    cache.put("c", "gpt-4o", "C", latency_ms=100.0)
+    assert cache.get("b") is None  # least recently used
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+    db = factory()
+    db.query(LLMResponse).filter(LLMResponse.cache_key == "a").update(
+        {"created_at": datetime.now() - timedelta(hours=2)}
+    )
+    db.commit()
+    db.close()
+    assert cache.get("a") is None
+    assert cache.stats()["latency_saved_ms"] == 300.0
+
+
+def test_section_parser_emits_members_as_they_close():
+    from app.analysis.json_stream import JSONSectionParser
+    document = json.dumps({
+        "canonical": {"core_thesis": "Braces } and \"quotes\" in strings {"},
+        "x_post": {"thread_replies": ["a", "b]"]},
+        "count": 3,
+    })
+    parser = JSONSectionParser()
+    split = document.index('"x_post"')
+    seen = []
+    for i in range(0, split, 7):
+        seen.extend(parser.feed(document[i:min(i + 7, split)]))
+    assert [key for key, _ in seen] == ["canonical"]
+    for i in range(split, len(document), 7):
+        seen.extend(parser.feed(document[i:i + 7]))
+    assert dict(seen) == json.loads(document)
+    assert parser.done
+
+
+def test_streamed_package_emits_sections_before_generation_finishes():
+    server, base_url = start_fake_llm_server(latency=1.0, responder=package_responder)
+    server.chunk_size = 64
+    try:
+        factory = _factory()
+        db = factory()
+        db.add(ContentItem(external_id="a", title="Budget vote", summary="Parliament votes on the budget",
+                           url="https://example.com/a", cluster_id="Budget", final_score=1.0))
+        db.commit()
+        engine = ContentEngine(api_key="test", base_url=base_url, cache=LLMResponseCache(factory))
+
+        started = time.perf_counter()
+        first_section_at = None
+        events = []
+        for event in engine.stream_full_package(db, "Budget"):
+            if event["event"] == "section" and first_section_at is None:
+                first_section_at = time.perf_counter() - started
+            events.append(event)
+        total = time.perf_counter() - started
+
+        sections = [event["section"] for event in events if event["event"] == "section"]
+        assert sections[0] == "canonical" and "x_post" in sections and len(sections) == 8
+        assert first_section_at < total / 3
+        assert events[-1]["event"] == "done"
+
+        package = db.get(TopicPackage, events[-1]["package_id"])
+        expected = ContentEngine(api_key=None)._get_mock_package_data("Test Topic")
+        assert package.x_primary_post == expected["x_post"]["primary_post"]
+        assert package.ig_hashtags == expected["instagram_reel"]["hashtags"]
+    finally:
+        server.shutdown()
+
+
+def test_parallel_sections_and_single_section_regeneration():
+    server, base_url = start_fake_llm_server(latency=0.3, responder=package_responder)
+    try:
+        factory = _factory()
+        db = factory()
+        db.add(ContentItem(external_id="a", title="Budget vote", summary="Parliament votes on the budget",
+                           url="https://example.com/a", cluster_id="Budget", final_score=1.0))
+        db.commit()
+        engine = ContentEngine(api_key="test", base_url=base_url, cache=LLMResponseCache(factory))
+
+        package = engine.generate_full_package(db, "Budget", parallel=True)
+        # One concurrent request per section
+        assert server.peak_in_flight == len(PACKAGE_SECTIONS)
+        expected = ContentEngine(api_key=None)._get_mock_package_data("Test Topic")
+        assert package.core_thesis == expected["canonical"]["core_thesis"]
+        assert package.carousel_caption == expected["carousel_asset"]["caption"]
+
+        package.facebook_cta = "Edited by hand"
+        package.x_primary_post = "Stale post"
+        db.commit()
+        calls = server.completed
+        package = engine.regenerate_section(db, "Budget", "x_post")
+        assert server.completed == calls + 1
+        assert package.x_primary_post == expected["x_post"]["primary_post"]
+        assert package.facebook_cta == "Edited by hand"
+    finally:
+        server.shutdown()
+
+
+def test_explicit_none_disables_the_shared_cache():
+    from app.analysis.llm import create_llm_client, get_response_cache
+    assert create_llm_client(api_key="test", base_url="http://127.0.0.1:9/v1", cache=None).cache is None
+    assert create_llm_client(api_key="test", base_url="http://127.0.0.1:9/v1").cache is get_response_cache()
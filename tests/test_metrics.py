@@ -0,0 +1,62 @@
+import json
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.metrics import Metrics, RunReport, instrument_engine, metrics, stage
+
+
+def test_prometheus_exposition():
+    registry = Metrics()
+    registry.inc("source_bytes_fetched_total", 1500, source='CBC "Top"')
+    registry.inc("source_bytes_fetched_total", 500, source='CBC "Top"')
+    for seconds in (0.003, 0.2, 0.2, 99):
+        registry.observe("pipeline_stage_seconds", seconds, stage="rank")
+    with pytest.raises(KeyError):
+        registry.inc("no_such_metric")
+
+    lines = registry.prometheus().splitlines()
+    assert "# TYPE source_bytes_fetched_total counter" in lines
+    assert 'source_bytes_fetched_total{source="CBC \\"Top\\""} 2000' in lines
+    assert 'pipeline_stage_seconds_bucket{stage="rank",le="0.005"} 1' in lines
+    assert 'pipeline_stage_seconds_bucket{stage="rank",le="0.25"} 3' in lines
+    assert 'pipeline_stage_seconds_bucket{stage="rank",le="60"} 3' in lines
+    assert 'pipeline_stage_seconds_bucket{stage="rank",le="+Inf"} 4' in lines
+    assert 'pipeline_stage_seconds_count{stage="rank"} 4' in lines
+    assert registry.snapshot()['pipeline_stage_seconds_sum{stage="rank"}'] == pytest.approx(99.403)
+
+
+def test_run_report_records_stages_metric_deltas_and_profile(tmp_path):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    metrics.inc("source_items_inserted_total", 5, source="Feed")
+
+    with RunReport("test_run", profile="cprofile", report_dir=str(tmp_path)) as report:
+        with stage("ingest_rss"):
+            metrics.inc("source_items_inserted_total", 2, source="Feed")
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+        with pytest.raises(ValueError):
+            with stage("generate"):
+                raise ValueError("LLM unavailable")
+
+    with open(report.path) as f:
+        data = json.load(f)
+    assert data["run"] == "test_run" and data["status"] == "failed"
+    assert [(entry["stage"], entry["status"]) for entry in data["stages"]] == [("ingest_rss", "ok"), ("generate", "failed")]
+    assert data["stages"][1]["error"] == "LLM unavailable"
+    # Only what happened during the run
+    assert data["metrics"]['source_items_inserted_total{source="Feed"}'] == 2
+    assert data["metrics"]['db_statements_total{stage="ingest_rss"}'] == 3
+    assert data["metrics"]['pipeline_stage_failures_total{stage="generate"}'] == 1
+    assert data["profile"]["top_cumulative"] and os.path.exists(data["profile"]["path"])
+
+
+def test_metrics_endpoint():
+    from app.main import app
+    with stage("cluster"):
+        pass
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert 'pipeline_stage_seconds_count{stage="cluster"}' in response.text
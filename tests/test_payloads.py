@@ -0,0 +1,61 @@
+import json
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from app.items import item_detail
+from app.migrations import run_migrations
+from app.models import Base, ContentItem, RawPayload
+from app.ingestion.writer import BulkItemWriter
+from app.payloads import load_payload
+from app.search import ensure_search_index
+
+
+def test_writer_stores_each_payload_once_for_the_detail_view():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    entry = json.dumps({"title": "Budget vote", "links": [{"href": "https://example.com/a"}]})
+    written = BulkItemWriter(db).upsert([
+        {"external_id": "a", "title": "Budget vote", "url": "u1", "raw_json": entry},
+        {"external_id": "b", "title": "Budget vote (syndicated)", "url": "u2", "raw_json": entry},
+        {"external_id": "c", "title": "No payload", "url": "u3", "raw_json": None},
+    ])
+    db.commit()
+
+    assert db.query(RawPayload).count() == 1
+    assert db.query(RawPayload).one().size == len(entry)
+    assert item_detail(db, written["a"])["raw_json"] == entry
+    assert item_detail(db, written["c"])["raw_json"] is None
+
+
+@pytest.mark.parametrize("sqlite_version", [sqlite3.sqlite_version_info, (3, 31, 1)])
+def test_migration_moves_inline_payloads_out_of_content_items(tmp_path, monkeypatch, sqlite_version):
+    monkeypatch.setattr("app.migrations.sqlite3.sqlite_version_info", sqlite_version)
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # content_items as created while raw_json was stored inline, with the search triggers
+        ContentItem.__table__.create(conn)
+        conn.exec_driver_sql("ALTER TABLE content_items ADD COLUMN raw_json TEXT")
+        conn.exec_driver_sql("ALTER TABLE content_items DROP COLUMN raw_hash")
+        conn.exec_driver_sql("INSERT INTO content_items (external_id, title, summary, url, raw_json) VALUES "
+                             "('a', 'Budget vote', '', 'u1', '{\"n\": 1}'), ('b', 'Tax cut', '', 'u2', '{\"n\": 1}'), "
+                             "('c', 'Election', '', 'u3', '{\"n\": 2}'), ('d', 'Border', '', 'u4', NULL)")
+    ensure_search_index(engine)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    if sqlite_version >= (3, 35, 0):
+        assert "raw_json" not in {column["name"] for column in inspect(engine).get_columns("content_items")}
+    else:
+        # Left in place, emptied
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM content_items WHERE raw_json IS NOT NULL").scalar() == 0
+    db = sessionmaker(bind=engine, autoflush=False)()
+    payloads = {item.external_id: load_payload(db, item.raw_hash) for item in db.query(ContentItem)}
+    assert payloads == {"a": '{"n": 1}', "b": '{"n": 1}', "c": '{"n": 2}', "d": None}
+    assert db.query(RawPayload).count() == 2
+
+    # The search triggers survive the column drop
+    db.add(ContentItem(external_id="e", title="Pipeline", url="u5"))
+    db.commit()
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, ContentItem, PipelineRun
+from app.pipeline import PipelineRunner, _items_watermark
+
+
+def _factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def _stages(calls, failing):
+    def fetch(db, ctx):
+        calls.append("fetch")
+        return {"fetched": 3}
+
+    def generate(db, ctx):
+        done = dict(ctx.outputs.get("done") or {})
+        for cluster in ["a", "b"]:
+            if cluster in done:
+                continue
+            if cluster in failing:
+                raise RuntimeError(f"LLM unavailable for {cluster}")
+            calls.append(f"generate {cluster}")
+            done[cluster] = len(calls)
+            ctx.checkpoint(done=done)
+        return {"clusters": len(done)}
+
+    return [
+        ("fetch", fetch, lambda db, ctx: {"max_item_id": 7}),
+        ("generate", generate, lambda db, ctx: {"fetched": ctx.inputs("fetch").get("fetched")}),
+    ]
+
+
+def test_rerun_skips_done_stages_and_resumes_the_failed_one(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_REPORT_DIR", str(tmp_path))
+    factory, calls, failing = _factory(), [], {"b"}
+    runner = PipelineRunner(factory, "daily_pipeline", _stages(calls, failing))
+
+    with pytest.raises(RuntimeError):
+        runner.run()
+    assert calls == ["fetch", "generate a"]
+
+    failing.clear()
+    run = runner.run()
+    # fetch is not repeated, and generate keeps the cluster it checkpointed
+    assert calls == ["fetch", "generate a", "generate b"]
+    assert run["status"] == "done" and run["attempts"] == 2 and run["report_path"].startswith(str(tmp_path))
+    fetch, generate = run["stages"]
+    assert fetch["watermark"] == {"max_item_id": 7} and fetch["outputs"] == {"fetched": 3} and fetch["attempts"] == 1
+    assert generate["attempts"] == 2 and generate["watermark"] == {"fetched": 3}
+    assert generate["outputs"] == {"done": {"a": 2, "b": 3}, "clusters": 2}
+
+    # A finished run is not resumed
+    runner.run()
+    assert calls[-3:] == ["fetch", "generate a", "generate b"]
+    db = factory()
+    assert [run.status for run in db.query(PipelineRun).order_by(PipelineRun.id)] == ["done", "done"]
+    db.close()
+
+
+def test_single_stage_runs_on_the_last_finished_outputs(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_REPORT_DIR", str(tmp_path))
+    factory, calls = _factory(), []
+    runner = PipelineRunner(factory, "daily_pipeline", _stages(calls, set()))
+    runner.run()
+
+    run = runner.run(only=["generate"])
+    assert calls == ["fetch", "generate a", "generate b", "generate a", "generate b"]
+    assert [entry["stage"] for entry in run["stages"]] == ["generate"]
+    assert run["stages"][0]["watermark"] == {"fetched": 3}
+    with pytest.raises(ValueError):
+        runner.run(only=["publish"])
+
+
+def test_only_runs_the_named_stages_of_a_resumed_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_REPORT_DIR", str(tmp_path))
+    factory, calls, failing = _factory(), [], {"a"}
+
+    def check(db, ctx):
+        calls.append("check")
+        return {}
+
+    runner = PipelineRunner(factory, "daily_pipeline", _stages(calls, failing) + [("check", check, lambda db, ctx: {})])
+    with pytest.raises(RuntimeError):
+        runner.run()
+    assert calls == ["fetch"]
+
+    run = runner.run(only=["check"])
+    # generate failed and stays failed; only check ran, inside the resumed run
+    assert calls == ["fetch", "check"]
+    assert run["attempts"] == 2 and run["status"] == "failed"
+    assert [(entry["stage"], entry["status"]) for entry in run["stages"]] == [
+        ("fetch", "done"), ("generate", "failed"), ("check", "done")
+    ]
+
+    failing.clear()
+    run = runner.run()
+    assert calls == ["fetch", "check", "generate a", "generate b"] and run["status"] == "done"
+
+
+def test_resume_reruns_stages_whose_inputs_changed(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_REPORT_DIR", str(tmp_path))
+    factory, calls, failing = _factory(), [], {"b"}
+
+    def ingest(db, ctx):
+        calls.append("ingest")
+        return {}
+
+    def rank(db, ctx):
+        calls.append("rank")
+        return {}
+
+    generate_stage = _stages(calls, failing)[1]
+    runner = PipelineRunner(factory, "daily_pipeline", [
+        ("ingest", ingest, lambda db, ctx: _items_watermark(db)),
+        ("rank", rank, lambda db, ctx: _items_watermark(db)),
+        generate_stage,
+    ])
+    with pytest.raises(RuntimeError):
+        runner.run()
+    assert calls == ["ingest", "rank", "generate a"]
+
+    db = factory()
+    db.add(ContentItem(external_id="late", title="Arrived after the failure"))
+    db.commit()
+    db.close()
+    failing.clear()
+    run = runner.run()
+    assert calls[3:] == ["ingest", "rank", "generate b"]
+    assert run["attempts"] == 2 and [entry["attempts"] for entry in run["stages"]] == [2, 2, 2]
+
+    # Unchanged inputs are still skipped
+    db = factory()
+    run = db.query(PipelineRun).one()
+    run.status = "failed"
+    db.commit()
+    db.close()
+    runner.run()
+    assert calls[6:] == []
+
+
+def test_stale_failed_run_is_not_resumed(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_REPORT_DIR", str(tmp_path))
+    factory, calls, failing = _factory(), [], {"b"}
+    runner = PipelineRunner(factory, "daily_pipeline", _stages(calls, failing), resume_max_hours=6)
+    with pytest.raises(RuntimeError):
+        runner.run()
+
+    db = factory()
+    db.query(PipelineRun).one().started_at = datetime.now() - timedelta(hours=7)
+    db.commit()
+    db.close()
+    failing.clear()
+    run = runner.run()
+    assert calls == ["fetch", "generate a", "fetch", "generate a", "generate b"]
+    assert run["id"] == 2 and run["attempts"] == 1 and run["status"] == "done"
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem, SourceType
+from app.items import list_items
+from app.migrations import MIGRATIONS, run_migrations
+from app.analysis.commentary import ContentEngine
+from app.analysis.dedup import NearDuplicateIndex
+from app.analysis.enrichment import EnrichmentService
+from app.analysis.ranker import ContentRanker
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    db.add_all([
+        ContentItem(
+            external_id=f"item{n}", source_type=SourceType.NEWS if n % 2 else SourceType.REDDIT,
+            country="Canada" if n % 3 else "India", title=f"Budget vote number {n}", summary="A long enough summary " * 4,
+            url=f"https://example.com/{n}", timestamp=datetime.now() - timedelta(hours=n), cluster_id="budget",
+            engagement_metrics={"score": n, "num_comments": n}
+        ) for n in range(30)
+    ])
+    db.commit()
+    return engine, db
+
+
+def _captured(engine, run):
+    """
+    Runs `run` and returns the SELECTs on content_items it issued, with their parameters.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM content_items" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements
+    return statements
+
+
+def _plan(engine, statement, parameters):
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+HOT_PATHS = {
+    "ranker window": lambda db: ContentRanker(db).calculate_final_scores(),
+    "ranker incremental": lambda db: ContentRanker(db).calculate_final_scores(incremental=True),
+    "near-duplicate window": lambda db: NearDuplicateIndex().refresh(db),
+    "enrichment backlog": lambda db: EnrichmentService().enrich_batch(db),
+    "cluster items": lambda db: ContentEngine()._package_items(db, "budget"),
+    "pipeline top 100": lambda db: db.query(ContentItem.id).order_by(ContentItem.final_score.desc()).limit(100).all(),
+    "top controversy": lambda db: db.query(ContentItem).order_by(ContentItem.controversy_score.desc()).limit(10).all(),
+    "/items": lambda db: list_items(db),
+    "/items by score": lambda db: list_items(db, sort_by="final_score"),
+    "/items by controversy": lambda db: list_items(db, sort_by="controversy_score"),
+    "/items country": lambda db: list_items(db, country="Canada"),
+    "/items source": lambda db: list_items(db, source_type="reddit"),
+    "/items unused": lambda db: list_items(db, used=False),
+    "/items next page": lambda db: list_items(db, cursor=list_items(db, limit=5).next_cursor),
+    "/items next page by score": lambda db: list_items(
+        db, sort_by="final_score", cursor=list_items(db, sort_by="final_score", limit=5).next_cursor
+    ),
+}
+
+
+@pytest.mark.parametrize("path", HOT_PATHS)
+def test_hot_queries_use_an_index(path):
+    engine, db = _session()
+    for statement, parameters in _captured(engine, lambda: HOT_PATHS[path](db)):
+        plan = _plan(engine, statement, parameters)
+        scans = [step for step in plan if "content_items" in step and "USING" not in step]
+        assert not scans, f"{path}: {statement}\n{plan}"
+
+
+def test_migrations_upgrade_an_old_database_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # content_items as created before the query indexes existed
+        conn.exec_driver_sql("CREATE TABLE content_items (id INTEGER PRIMARY KEY, external_id VARCHAR UNIQUE, "
+                             "source_type VARCHAR, country VARCHAR, timestamp DATETIME, final_score FLOAT, "
+                             "controversy_score FLOAT, cluster_id VARCHAR, used_for_content BOOLEAN, "
+                             "enrichment_status VARCHAR)")
+        conn.exec_driver_sql("CREATE INDEX ix_content_items_cluster_id ON content_items (cluster_id)")
+    Base.metadata.create_all(bind=engine)
+
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+    indexes = {index["name"] for index in inspect(engine).get_indexes("content_items")}
+    assert {index.name for index in ContentItem.__table__.indexes} <= indexes
+    assert "ix_content_items_cluster_id" not in indexes
+    assert run_migrations(engine) == []
@@ -0,0 +1,147 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem, SentimentResult, SourceType
+from app.analysis import sentiment as sentiment_module
+from app.analysis.ranker import ContentRanker, queue_for_ranking
+
+
+def _session_with_items(count=5):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    for n in range(count):
+        db.add(ContentItem(
+            external_id=f"item{n}", source_type=SourceType.REDDIT, source_name=f"r/sub{n % 2}", country="Canada",
+            title=f"Terrible corrupt scandal number {n}", summary="An awful, shocking outcome.",
+            url=f"https://example.com/{n}", timestamp=datetime.now(),
+            engagement_metrics={"score": n * 10, "num_comments": n}
+        ))
+    db.commit()
+    return db
+
+
+def test_ranker_reuses_stored_sentiment():
+    db = _session_with_items()
+    sentiment_module._lru.clear()
+    real_textblob = sentiment_module.TextBlob
+
+    with mock.patch.object(sentiment_module, "TextBlob", side_effect=real_textblob) as textblob:
+        ContentRanker(db).calculate_final_scores()
+        first_scores = {i.id: (i.controversy_score, i.final_score) for i in db.query(ContentItem)}
+        assert textblob.call_count == 10  # title and title+summary of each item
+        assert db.query(SentimentResult).count() == 10
+
+        # A fresh process: the LRU is empty but the side table answers every lookup.
+        sentiment_module._lru.clear()
+        ContentRanker(db).calculate_final_scores()
+        assert textblob.call_count == 10
+
+    assert first_scores == {i.id: (i.controversy_score, i.final_score) for i in db.query(ContentItem)}
+
+
+def test_ingested_items_are_not_analyzed_again_by_the_ranker():
+    from app.ingestion.rss import fetch_rss_feeds
+    from app.models import Source
+    from scripts.stub_feed_server import start_stub_server
+
+    server, base_url = start_stub_server()
+    db = _session_with_items(count=0)
+    sentiment_module._lru.clear()
+    real_textblob = sentiment_module.TextBlob
+    try:
+        db.add(Source(name="Stub", type=SourceType.NEWS, url=f"{base_url}/rss/sentiment", country="Canada"))
+        db.commit()
+        with mock.patch.object(sentiment_module, "TextBlob", side_effect=real_textblob) as textblob:
+            fetch_rss_feeds(db)
+            items = db.query(ContentItem).count()
+            assert items and textblob.call_count == items
+
+            # The ranker finds every title + summary stored by ingestion; only titles are new
+            sentiment_module._lru.clear()
+            ContentRanker(db).calculate_final_scores()
+            assert textblob.call_count == 2 * items
+    finally:
+        db.close()
+        server.shutdown()
+
+
+def _add(db, external_id, title, source_name, hours_ago=1, ups=0, comments=0):
+    item = ContentItem(
+        external_id=external_id, source_type=SourceType.REDDIT, source_name=source_name, country="Canada",
+        title=title, summary="", url=f"https://example.com/{external_id}",
+        timestamp=datetime.now() - timedelta(hours=hours_ago),
+        engagement_metrics={"score": ups, "num_comments": comments}
+    )
+    db.add(item)
+    db.commit()
+    return item
+
+
+def _scores(db):
+    return {i.id: (i.controversy_score, i.final_score) for i in db.query(ContentItem).order_by(ContentItem.id)}
+
+
+def test_incremental_ranking_matches_full_recompute():
+    db = _session_with_items(0)
+    for n in range(20):
+        _add(db, f"a{n}", f"Story {n} about the border fight", f"r/sub{n % 3}", hours_ago=n, ups=n * 10, comments=n)
+    _add(db, "old", "Story 5 about the border fight", "r/other", hours_ago=23.99, ups=1, comments=1)
+
+    ranker = ContentRanker(db)
+    assert ranker.calculate_final_scores(incremental=True) == 21  # No state yet: full window
+
+    # New coverage for an existing fingerprint, a new story and a metrics update below the maxima.
+    _add(db, "b0", "Story 3 about the border fight!", "r/new", ups=5)
+    _add(db, "b1", "A brand new story nobody else covered", "r/sub0", ups=7)
+    updated = db.query(ContentItem).filter(ContentItem.external_id == "a4").one()
+    updated.engagement_metrics = {"score": 41, "num_comments": 4}
+    queue_for_ranking(db, [updated.id])
+    db.commit()
+
+    rescored = ranker.calculate_final_scores(incremental=True)
+    assert rescored == 4  # b0, b1, a4 and a3 whose fingerprint gained a source
+    incremental = _scores(db)
+    ContentRanker(db).calculate_final_scores()
+    assert _scores(db) == incremental
+
+    # A new maximum forces a full rescore.
+    _add(db, "c0", "Huge story", "r/sub1", ups=10000)
+    assert ranker.calculate_final_scores(incremental=True) == 24
+    incremental = _scores(db)
+    ContentRanker(db).calculate_final_scores()
+    assert _scores(db) == incremental
+
+
+def test_columnar_scores_match_per_item_scorer():
+    rng = random.Random(11)
+    words = ["border", "abortion", "corrupt", "liar", "great", "terrible", "vote", "khalistan", "city", "plan",
+             "awful", "love", "hate", "new", "report", "budget"]
+    db = _session_with_items(0)
+    for n in range(300):
+        item = ContentItem(
+            external_id=f"x{n}", source_type=rng.choice([SourceType.REDDIT, SourceType.NEWS]),
+            source_name=f"source{rng.randrange(6)}", country="Canada",
+            title=" ".join(rng.choice(words) for _ in range(rng.randint(2, 8))),
+            summary=" ".join(rng.choice(words) for _ in range(rng.randint(0, 12))) or None,
+            url=f"https://example.com/x{n}", timestamp=datetime.now() - timedelta(hours=rng.random() * 30),
+            engagement_metrics={"score": rng.randrange(5000), "num_comments": rng.randrange(800)}
+        )
+        db.add(item)
+    db.commit()
+
+    ContentRanker(db, vectorized=False).calculate_final_scores()
+    expected = {i.id: (i.controversy_score, i.controversy_reason, i.final_score) for i in db.query(ContentItem)}
+    db.query(ContentItem).update({"controversy_score": 0.0, "controversy_reason": None, "final_score": 0.0})
+    db.commit()
+
+    ContentRanker(db, vectorized=True).calculate_final_scores()
+    actual = {i.id: (i.controversy_score, i.controversy_reason, i.final_score) for i in db.query(ContentItem)}
+    assert actual.keys() == expected.keys()
+    for item_id, (c_score, reason, f_score) in expected.items():
+        assert actual[item_id][0] == pytest.approx(c_score, abs=1e-9)
+        assert actual[item_id][1] == reason
+        assert actual[item_id][2] == pytest.approx(f_score, abs=0.01 + 1e-9)
@@ -0,0 +1,88 @@
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from app.response_cache import ITEMS, PACKAGES, MemoryBackend, ResponseCache, ResponseCacheMiddleware
+
+
+def _app(cache):
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, routes={"/items": (ITEMS,), "/topics/{cluster_id}": (PACKAGES,)},
+                       cache=cache)
+    calls = []
+
+    @app.get("/items")
+    def items(response: Response, limit: int = 20, sort_by: str = None):
+        calls.append("items")
+        response.headers["X-Total-Count"] = "42"
+        response.headers["Cache-Control"] = "max-age=600"
+        return {"limit": limit, "sort_by": sort_by, "call": len(calls)}
+
+    @app.get("/topics/{cluster_id}")
+    def topic(cluster_id: str):
+        calls.append(cluster_id)
+        if cluster_id == "missing":
+            return JSONResponse({"error": "No package"}, status_code=404)
+        return {"cluster_id": cluster_id}
+
+    return TestClient(app), calls
+
+
+def test_repeat_requests_are_served_from_cache_until_a_scope_is_bumped():
+    cache = ResponseCache(MemoryBackend(max_entries=10), ttl_seconds=60)
+    client, calls = _app(cache)
+
+    first = client.get("/items?limit=5&sort_by=final_score")
+    assert first.headers["x-cache"] == "MISS" and first.headers["etag"]
+    # Same parameters in another order
+    again = client.get("/items?sort_by=final_score&limit=5")
+    assert again.headers["x-cache"] == "HIT" and again.json() == first.json()
+    assert again.headers["etag"] == first.headers["etag"]
+    # The route's own headers are replayed; ours replace its cache-control
+    assert again.headers["x-total-count"] == "42" and again.headers["content-type"] == first.headers["content-type"]
+    assert again.headers.get_list("cache-control") == ["no-cache"]
+    assert int(again.headers["content-length"]) == len(again.content)
+    assert calls == ["items"]
+
+    revalidated = client.get("/items?limit=5&sort_by=final_score", headers={"If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+
+    client.get("/topics/budget")
+    cache.bump(PACKAGES)
+    # Other scopes stay cached
+    assert client.get("/items?limit=5&sort_by=final_score").headers["x-cache"] == "HIT"
+    assert client.get("/topics/budget").headers["x-cache"] == "MISS"
+
+    cache.bump(ITEMS)
+    fresh = client.get("/items?limit=5&sort_by=final_score", headers={"If-None-Match": first.headers["etag"]})
+    # The body changed, so the old ETag no longer matches
+    assert fresh.status_code == 200 and fresh.json()["call"] == 4
+    assert calls == ["items", "budget", "budget", "items"]
+    assert cache.stats()["hits"] == 3 and cache.stats()["not_modified"] == 1
+
+
+def test_errors_and_other_methods_are_not_cached():
+    cache = ResponseCache(MemoryBackend(max_entries=1), ttl_seconds=60)
+    client, calls = _app(cache)
+    assert client.get("/topics/missing").status_code == 404
+    assert client.get("/topics/missing").status_code == 404
+    assert client.post("/items").status_code == 405
+    assert calls == ["missing", "missing"]
+
+    # Bounded: the oldest entry is evicted
+    client.get("/topics/a")
+    client.get("/topics/b")
+    assert client.get("/topics/a").headers["x-cache"] == "MISS"
+
+
+def test_if_none_match_compares_whole_entity_tags():
+    client, _ = _app(ResponseCache(MemoryBackend(max_entries=10), ttl_seconds=60))
+    etag = client.get("/items").headers["etag"]
+
+    for header, status in [
+        (f'"other", W/{etag}', 304),
+        ("*", 304),
+        (etag[:-1] + 'x"', 200),
+        (f'"prefix{etag[1:]}', 200),
+        (f"{etag}x", 200),
+    ]:
+        assert client.get("/items", headers={"If-None-Match": header}).status_code == status, header
@@ -0,0 +1,64 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem
+from app.ingestion.writer import BulkItemWriter
+from app.search import apply_search, ensure_search_index, fts5_query, search_terms
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def _search(db, q, **filters):
+    query = db.query(ContentItem).filter_by(**filters)
+    return [(item.external_id, snippet) for item, snippet in apply_search(query, q, "sqlite").all()]
+
+
+def test_search_ranks_title_matches_and_highlights():
+    db = _session()
+    db.add_all([
+        ContentItem(external_id="summary", title="Weekly roundup", summary="Notes on the carbon tax and more.",
+                    url="u1", country="Canada"),
+        ContentItem(external_id="title", title="Carbon tax rebate cut", summary="Ottawa changes the rebate.",
+                    url="u2", country="Canada"),
+        ContentItem(external_id="india", title="Carbon tax debate in Delhi", summary="", url="u3", country="India"),
+        ContentItem(external_id="other", title="Pipeline approval", summary="Nothing relevant.", url="u4"),
+    ])
+    db.commit()
+
+    results = _search(db, "carbon tax", country="Canada")
+    assert [external_id for external_id, _ in results] == ["title", "summary"]
+    assert "<mark>Carbon</mark> <mark>tax</mark>" in results[0][1]
+
+    # The last word is a prefix; stemming matches other forms.
+    assert {external_id for external_id, _ in _search(db, "pipe")} == {"other"}
+    assert {external_id for external_id, _ in _search(db, "debates delhi")} == {"india"}
+
+
+def test_index_follows_inserts_updates_bulk_writes_and_deletes():
+    db = _session()
+    item = ContentItem(external_id="a", title="Budget vote tonight", summary="", url="u")
+    db.add(item)
+    db.commit()
+    assert _search(db, "budget")
+
+    item.title = "Housing plan unveiled"
+    db.commit()
+    assert not _search(db, "budget") and _search(db, "housing")
+
+    BulkItemWriter(db).upsert([{"external_id": "b", "title": "Election called", "summary": "", "url": "u2"}])
+    db.commit()
+    assert [external_id for external_id, _ in _search(db, "election")] == ["b"]
+
+    db.delete(item)
+    db.commit()
+    assert not _search(db, "housing")
+
+
+def test_query_syntax_is_treated_as_plain_words():
+    assert search_terms('budget "NEAR(x y)" tax*') == ["budget", "NEAR", "x", "y", "tax*"]
+    assert fts5_query(["AND", "budg*"]) == '"AND" "budg"*'
+    assert apply_search(_session().query(ContentItem), "  ?? ", "sqlite") is None
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, ContentItem, TrendingCount
+from app.analysis.trending import TrendingCounter, backfill_trending, trending_counts
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+NOW = datetime.now().replace(minute=30, second=0, microsecond=0)
+ROWS = [
+    {"title": "Trudeau unveils budget", "summary": "Tax changes for housing", "country": "Canada", "timestamp": NOW},
+    {"title": "Election campaign opens", "summary": "", "country": "Canada", "timestamp": NOW - timedelta(hours=30)},
+    {"title": "Modi at the border", "summary": "Visa rules change", "country": "India", "timestamp": NOW},
+    {"title": "Weather update", "summary": "Rain all week", "country": "India", "timestamp": NOW},
+]
+
+
+def test_counters_accumulate_across_flushes_and_windows():
+    db = _session()
+    counter = TrendingCounter(db)
+    counter.add_rows(ROWS[:2])
+    counter.flush()
+    counter.add_rows(ROWS[2:])
+    counter.flush()
+    db.commit()
+
+    totals = trending_counts(db)
+    assert totals["leaders"] == 2 and totals["economy"] == 1 and totals["elections"] == 1
+    assert totals["immigration"] == 1 and totals["international"] == 0
+
+    recent = trending_counts(db, since=NOW - timedelta(hours=24))
+    assert recent["elections"] == 0 and recent["leaders"] == 2
+    assert trending_counts(db, country="India")["leaders"] == 1
+    assert trending_counts(db, until=NOW - timedelta(hours=24))["elections"] == 1
+    # Whole hours: the bucket holding `until` is left out even when `until` is past its start
+    assert trending_counts(db, until=NOW)["leaders"] == 0
+    assert trending_counts(db, since=NOW - timedelta(hours=30), until=NOW - timedelta(hours=29))["elections"] == 1
+
+
+def test_backfill_matches_ingestion_time_counts():
+    db = _session()
+    counter = TrendingCounter(db)
+    counter.add_rows(ROWS)
+    counter.flush()
+    db.commit()
+    incremental = {(r.category, r.country, r.hour): r.count for r in db.query(TrendingCount)}
+
+    db.execute(ContentItem.__table__.insert(), [
+        {**row, "external_id": f"e{n}", "url": f"https://example.com/{n}"} for n, row in enumerate(ROWS)
+    ])
+    db.commit()
+    items, _ = backfill_trending(db, batch_size=2)
+
+    assert items == len(ROWS)
+    assert {(r.category, r.country, r.hour): r.count for r in db.query(TrendingCount)} == incremental